@@ -0,0 +1,126 @@
+from typing import Dict, Any, Optional, Iterable, Iterator, Union, Set
+from collections.abc import Mapping
+from pathlib import Path
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from config import AppConfig
+from policy_table import PolicyTable, policy_json_default
+
+# 태스크 결과에는 행 목록 대신 아래 형태의 핸들만 저장
+#   {"id": <sha256>, "rows": <행 수>, "schema": [<컬럼명>, ...]}
+ArtifactHandle = Dict[str, Any]
+
+def is_artifact_handle(value: Any) -> bool:
+    return isinstance(value, Mapping) and isinstance(value.get('id'), str) and 'rows' in value
+
+def iter_artifact_ids(value: Any) -> Iterator[str]:
+    """결과 data 등에 포함된 아티팩트 핸들의 ID (중첩된 dict/list 포함)"""
+    if is_artifact_handle(value):
+        yield value['id']
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            yield from iter_artifact_ids(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from iter_artifact_ids(item)
+
+class ArtifactStore:
+    """행 목록을 내용 해시(sha256)로 주소화하여 저장하는 저장소
+
+    행은 한 줄에 하나씩 JSON 으로 직렬화(gzip)하며, 같은 내용은 한 번만 저장된다.
+    파일은 임시 파일에 기록한 뒤 rename 하므로 부분적으로 쓰인 아티팩트는 보이지 않는다.
+    어떤 결과도 가리키지 않는 아티팩트는 sweep 으로 삭제한다.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = Path(base_dir or AppConfig.ARTIFACT_DIR)
+
+    def path(self, artifact_id: str) -> Path:
+        return self.base_dir / artifact_id[:2] / f"{artifact_id}.ndjson.gz"
+
+    def exists(self, artifact_id: str) -> bool:
+        return self.path(artifact_id).exists()
+
+    def put(self, rows: Iterable[Mapping]) -> ArtifactHandle:
+        """행 목록을 저장하고 핸들을 반환"""
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        schema: Dict[str, None] = {}
+        count = 0
+
+        fd, temp_path = tempfile.mkstemp(dir=self.base_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                for row in rows:
+                    line = json.dumps(row, ensure_ascii=False, separators=(',', ':'), default=policy_json_default).encode('utf-8') + b'\n'
+                    digest.update(line)
+                    f.write(line)
+                    schema.update(dict.fromkeys(row))
+                    count += 1
+
+            artifact_id = digest.hexdigest()
+            target = self.path(artifact_id)
+            if target.exists():
+                # 동일한 내용이 이미 저장되어 있음 (수정 시각을 갱신하여 sweep 유예 시간을 다시 적용)
+                os.unlink(temp_path)
+                os.utime(target)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp_path, target)
+                logging.info(f"Stored artifact {artifact_id[:12]} ({count} rows)")
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        return {"id": artifact_id, "rows": count, "schema": list(schema)}
+
+    def iter_rows(self, handle: Union[ArtifactHandle, str]) -> Iterator[Dict[str, Any]]:
+        artifact_id = handle if isinstance(handle, str) else handle['id']
+        path = self.path(artifact_id)
+        if not path.exists():
+            raise ValueError(f"Artifact not found: {artifact_id}")
+        with gzip.open(path, 'rb') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def sweep(self, referenced: Set[str], grace: float = 0.0) -> int:
+        """referenced 에 없는 아티팩트와 남은 임시 파일을 삭제하고 삭제한 파일 수를 반환
+
+        저장(또는 재사용)한 지 grace 초가 지나지 않은 파일은 아직 결과에 기록되기 전일 수 있으므로 남긴다.
+        """
+        if not self.base_dir.exists():
+            return 0
+        cutoff = time.time() - grace
+        removed = 0
+        for path in [*self.base_dir.glob("*/*.ndjson.gz"), *self.base_dir.glob("*.tmp")]:
+            try:
+                if path.name.split('.', 1)[0] in referenced or path.stat().st_mtime > cutoff:
+                    continue
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logging.info(f"Removed {removed} unreferenced artifact files")
+        return removed
+
+    def load(self, handle: Union[ArtifactHandle, str]):
+        """아티팩트 전체를 로드 (POLICY_STORE 설정에 따라 PolicyTable 또는 dict 목록)"""
+        if AppConfig.POLICY_STORE == 'columnar':
+            return PolicyTable.from_policies(self.iter_rows(handle))
+        return list(self.iter_rows(handle))
+
+_artifact_store = None
+
+def get_artifact_store() -> ArtifactStore:
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore()
+    return _artifact_store
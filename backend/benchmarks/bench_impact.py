@@ -0,0 +1,65 @@
+# 차단 영향 분석 벤치마크 (인덱스 엔진과 전체 비교 방식)
+#   python benchmarks/bench_impact.py --count 50000 --targets 500
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.firewall_utils import generate_random_policies, build_mock_policy
+from utils.range_utils import ranges_overlap
+from shadow_analyzer import RuleRanges
+from impact_analyzer import find_block_impacts, is_enabled, is_allow
+
+def full_scan(policies, targets):
+    """대상 정책마다 같은 vsys 의 모든 정책과 직접 비교"""
+    rules = [RuleRanges.from_policy(policy) for policy in policies]
+    target_set = set(targets)
+    found = {}
+    for target in targets:
+        rule = rules[target]
+        found[target] = [
+            position for position, policy in enumerate(policies)
+            if position not in target_set and is_enabled(policy) and policy.get('vsys') == policies[target].get('vsys')
+            and (position > target or is_allow(policy))
+            and ranges_overlap(rule.source, rules[position].source)
+            and ranges_overlap(rule.destination, rules[position].destination)
+            and ranges_overlap(rule.service, rules[position].service)
+        ]
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark block impact analysis")
+    parser.add_argument("--count", type=int, default=50000, help="number of generated policies")
+    parser.add_argument("--targets", type=int, default=500, help="number of rules to block")
+    parser.add_argument("--policies", choices=["mock", "random"], default="mock",
+                        help="mock: 모의 방화벽 정책 (정책마다 다른 대역), random: 소수 대역을 공유하는 임의 정책")
+    parser.add_argument("--skip-scan", action="store_true", help="skip the full scan comparison")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if args.policies == "mock":
+        policies = [build_mock_policy(i) for i in range(args.count)]
+    else:
+        policies = generate_random_policies(args.count)
+    targets = random.sample(range(len(policies)), args.targets)
+
+    started = time.perf_counter()
+    impacts = find_block_impacts(policies, targets)
+    elapsed = time.perf_counter() - started
+    affected = sum(len(found) for found in impacts.values())
+    print(f"   index: {args.targets} targets x {len(policies)} rules, {affected} affected rules in {elapsed:.2f}s")
+
+    if not args.skip_scan:
+        started = time.perf_counter()
+        reference = full_scan(policies, targets)
+        print(f"    scan: {time.perf_counter() - started:.2f}s")
+        if any([position for position, _, _ in impacts[target]] != reference[target] for target in targets):
+            print("    scan: results differ from index")
+
+if __name__ == "__main__":
+    main()
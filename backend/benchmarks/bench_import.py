@@ -0,0 +1,90 @@
+# 모의 방화벽에서 정책 가져오기(페이지 조회 + 스냅샷 저장) 처리량 측정
+#   python benchmarks/bench_import.py --rules 100000 --page-size 1000 --latency 0.02 --clients 4
+#   python benchmarks/bench_import.py --url http://127.0.0.1:8443   (이미 실행 중인 mock_firewall.py 사용)
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from firewall_client import HttpFirewallClient
+from mock_firewall import MockFirewall, MockFirewallSettings, create_app
+from policy_store import PolicySnapshotStore
+
+async def import_once(url: str, index: int, args, store: PolicySnapshotStore) -> int:
+    client = HttpFirewallClient(f"10.0.0.{index + 1}", args.user, args.password, url, retries=10)
+    await client.get_api_key()
+    try:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=args.prefetch + 1)
+
+        async def produce():
+            async for page in client.iter_policy_pages(args.page_size, args.prefetch):
+                await queue.put(page)
+            await queue.put(None)
+
+        def rows():
+            while True:
+                page = asyncio.run_coroutine_threadsafe(queue.get(), loop).result()
+                if page is None:
+                    return
+                yield from page
+
+        producer = asyncio.create_task(produce())
+        snapshot_id = await asyncio.to_thread(store.save_snapshot, rows(), None, client.ip)
+        await producer
+        return store.snapshot_info(snapshot_id)["rule_count"]
+    finally:
+        await client.disconnect()
+
+async def run(args) -> None:
+    server = None
+    url = args.url
+    if url is None:
+        import uvicorn
+        firewall = MockFirewall(MockFirewallSettings(
+            rules=args.rules, page_size=args.page_size, latency=args.latency, jitter=args.jitter,
+            error_rate=args.error_rate, rate_limit=args.rate_limit, user=args.user, password=args.password, seed=42
+        ))
+        server = uvicorn.Server(uvicorn.Config(create_app(firewall), host="127.0.0.1", port=args.port, log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        url = f"http://127.0.0.1:{args.port}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = PolicySnapshotStore(f"sqlite:///{directory}/bench.db")
+        started = time.perf_counter()
+        counts = await asyncio.gather(*(import_once(url, index, args, store) for index in range(args.clients)))
+        elapsed = time.perf_counter() - started
+    total = sum(counts)
+    print(f"imported {total} rules from {args.clients} firewall(s) in {elapsed:.2f}s ({total / elapsed:,.0f} rules/s)")
+
+    if server is not None:
+        print(f"mock firewall stats: {firewall.stats}")
+        server.should_exit = True
+        await serving
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paged policy import against the mock firewall")
+    parser.add_argument("--url", default=None, help="running mock firewall URL (default: start one in-process)")
+    parser.add_argument("--port", type=int, default=18443)
+    parser.add_argument("--rules", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--prefetch", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--clients", type=int, default=1, help="concurrent imports")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="1234")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
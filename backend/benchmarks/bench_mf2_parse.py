@@ -0,0 +1,65 @@
+# MF2 CLI 덤프 파서 처리량 측정 (덤프가 없으면 모의 방화벽 출력으로 생성)
+#   python benchmarks/bench_mf2_parse.py --size-mb 300
+#   python benchmarks/bench_mf2_parse.py --file /path/to/show_policy.txt
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mf2_parser import iter_mf2_file, MF2_PROMPT
+from mock_firewall import format_mf2_block
+from utils.firewall_utils import build_mock_policy
+
+def peak_rss_mb() -> float:
+    # Linux 는 KB 단위
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def generate_dump(path: str, size_mb: int) -> int:
+    """size_mb 이상이 될 때까지 모의 방화벽 "show policy" 출력을 파일로 기록"""
+    target = size_mb * 1024 * 1024
+    written = 0
+    rules = 0
+    with open(path, "w", encoding="utf-8") as dump:
+        dump.write("MF2> show policy\n")
+        while written < target:
+            block = format_mf2_block(build_mock_policy(rules))
+            dump.write(block)
+            written += len(block)
+            rules += 1
+        dump.write(MF2_PROMPT)
+    return rules
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MF2 CLI dump parser")
+    parser.add_argument("--file", default=None, help="existing MF2 dump (default: generate one)")
+    parser.add_argument("--size-mb", type=int, default=300, help="size of the generated dump")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.file
+        if path is None:
+            path = os.path.join(directory, "show_policy.txt")
+            started = time.perf_counter()
+            rules = generate_dump(path, args.size_mb)
+            print(f"generated {rules} rules ({os.path.getsize(path) / 1048576:.0f} MB) "
+                  f"in {time.perf_counter() - started:.2f}s")
+
+        size_mb = os.path.getsize(path) / 1048576
+        baseline = peak_rss_mb()
+        started = time.perf_counter()
+        count = 0
+        for _ in iter_mf2_file(path):
+            count += 1
+        elapsed = time.perf_counter() - started
+        print(f"parsed {count} rules from {size_mb:.0f} MB in {elapsed:.2f}s "
+              f"({size_mb / elapsed:.1f} MB/s, {count / elapsed:,.0f} rules/s)")
+        print(f"peak RSS {peak_rss_mb():.0f} MB (before parsing {baseline:.0f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# Shadow 정책 분석 엔진 벤치마크
+#   python benchmarks/bench_shadow.py --count 300000 --engines index bitmap
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.firewall_utils import generate_random_policies
+from shadow_analyzer import SHADOW_ENGINES, find_shadow_pairs
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shadow policy analysis engines")
+    parser.add_argument("--count", type=int, default=300000, help="number of generated policies")
+    parser.add_argument("--engines", nargs="+", default=["index", "bitmap"], choices=sorted(SHADOW_ENGINES))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    started = time.perf_counter()
+    policies = generate_random_policies(args.count)
+    print(f"generated {len(policies)} policies in {time.perf_counter() - started:.2f}s")
+
+    reference = None
+    for engine in args.engines:
+        started = time.perf_counter()
+        pairs = find_shadow_pairs(policies, engine)
+        elapsed = time.perf_counter() - started
+        print(f"{engine:>8}: {len(pairs)} shadow pairs in {elapsed:.2f}s ({len(policies) / elapsed:,.0f} rules/s)")
+
+        if reference is None:
+            reference = pairs
+        elif pairs != reference:
+            print(f"{engine:>8}: results differ from {args.engines[0]}")
+
+if __name__ == "__main__":
+    main()
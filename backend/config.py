@@ -1,5 +1,6 @@
 from pathlib import Path
 import logging
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import traceback
@@ -15,8 +16,79 @@ class AppConfig:
     # 하위 디렉토리 구조
     STORAGE_DIR = APP_DIR / 'storage'
     RESULT_DIR = STORAGE_DIR / 'results'
+    SHADOW_STATE_DIR = STORAGE_DIR / 'shadow_state'
+    ARTIFACT_DIR = STORAGE_DIR / 'artifacts'
+    UPLOAD_DIR = STORAGE_DIR / 'uploads'
     DB_DIR = APP_DIR / 'database'
     LOG_DIR = APP_DIR / 'logs'
+
+    # 메모리 내 정책 저장 방식 ("columnar" 또는 "dict")
+    POLICY_STORE = 'columnar'
+
+    # Shadow 정책 분석 엔진 ("index", "bitmap" 또는 "naive")
+    SHADOW_ANALYSIS_ENGINE = 'index'
+
+    # CPU 분석 실행기 ("process" 또는 "inline") 및 워커 프로세스 수
+    ANALYSIS_EXECUTOR = 'process'
+    ANALYSIS_WORKERS = os.cpu_count() or 1
+    # 이보다 작은 샤드로는 나누지 않음 (프로세스 간 전송 비용 고려)
+    SHADOW_SHARD_MIN_RULES = 5000
+    # 체크포인트 단위로 나눌 최소 샤드 수 (재시작 시 끝난 샤드는 다시 계산하지 않음)
+    SHADOW_CHECKPOINT_SHARDS = 8
+    # 같은 방화벽의 이전 분석 결과를 기준으로 변경된 정책만 재분석
+    SHADOW_INCREMENTAL = True
+    # 차단 영향 분석: 차단 방식 ("deny" 또는 "remove"), 대상 정책마다 결과에 포함할 최대 영향 정책 수
+    IMPACT_BLOCK_MODE = 'deny'
+    IMPACT_MAX_AFFECTED_RULES = 1000
+    # 결과 파일(NDJSON) gzip 압축 여부
+    RESULT_COMPRESSION = True
+    # 참조되지 않는 아티팩트 정리: 확인 간격(초), 저장 후 삭제하지 않고 두는 유예 시간(초)
+    ARTIFACT_SWEEP_INTERVAL = 3600.0
+    ARTIFACT_SWEEP_GRACE = 3600.0
+    # 결과 페이지 조회: 한 페이지 최대 행 수, 필터/정렬 캐시를 유지할 결과 수
+    RESULT_PAGE_MAX = 1000
+    RESULT_VIEW_CACHE_SIZE = 8
+    # 백그라운드 작업: 동시 실행 작업 수, 방화벽별 동시 실행 한도
+    JOB_WORKERS = 4
+    JOB_PER_FIREWALL_LIMIT = 1
+    # 입력이 필요 없는 다음 태스크들을 같은 작업에서 이어서 실행
+    PIPELINE_AUTO_RUN = True
+    # 실행 중인 태스크의 체크포인트 기록 최소 간격(초), 재시작 시 중단된 태스크 이어서 실행
+    CHECKPOINT_INTERVAL = 5.0
+    RESUME_INTERRUPTED_TASKS = True
+    # 방화벽 로그인 세션 풀: 최대 세션 수, 유휴 세션 종료 시간(초), 세션 유지 확인 간격(초)
+    FIREWALL_SESSION_MAX = 64
+    FIREWALL_SESSION_IDLE_TTL = 1800.0
+    FIREWALL_SESSION_KEEPALIVE = 300.0
+    # 방화벽 API 주소 (예: "http://127.0.0.1:8443", "{ip}" 는 방화벽 IP), None 이면 임시 클라이언트 사용
+    FIREWALL_API_URL = None
+    FIREWALL_API_TIMEOUT = 30.0
+    FIREWALL_API_RETRIES = 3
+    # 정책 가져오기: 페이지 크기, 미리 조회할 페이지 수
+    FIREWALL_PAGE_SIZE = 1000
+    FIREWALL_PAGE_PREFETCH = 2
+    # vsys 가 여러 개인 Paloalto 는 vsys 별로 동시에 조회하여 seq 순서로 병합, 동시 페이지 요청 수
+    FIREWALL_VSYS_IMPORT = True
+    FIREWALL_VSYS_CONCURRENCY = 4
+    # 같은 방화벽을 다시 가져오면 이전 스냅샷 대비 변경된 정책만 저장 (델타 스냅샷),
+    # 이 횟수마다 전체 스냅샷을 새로 저장
+    SNAPSHOT_DELTA_IMPORT = True
+    SNAPSHOT_FULL_INTERVAL = 7
+    # 설정 파일 업로드: 최대 크기(바이트), 보관 시간(초)
+    UPLOAD_MAX_BYTES = 2 * 1024 ** 3
+    UPLOAD_TTL = 7 * 24 * 3600.0
+    # 정책명/seq 조회용 정책 캐시 유지 시간(초)
+    FIREWALL_POLICY_CACHE_TTL = 300.0
+    # 여러 방화벽 일괄 실행: 동시에 실행할 방화벽 수
+    FLEET_CONCURRENCY = 16
+    # 방화벽 종류별 동시 접속 수와 접속 시작 최소 간격(초)
+    FLEET_VENDOR_LIMITS = {"paloalto": 8, "mf2": 4, "ngf": 4}
+    FLEET_VENDOR_INTERVALS = {"paloalto": 0.0, "mf2": 0.5, "ngf": 0.2}
+    # 스케줄 실행: 확인 간격(초), 시작 시각 임의 지연 최대값(초), 대상 방화벽 간 시작 간격(초)
+    SCHEDULER_ENABLED = True
+    SCHEDULER_INTERVAL = 30.0
+    SCHEDULE_JITTER_SECONDS = 60.0
+    SCHEDULE_TARGET_STAGGER = 2.0
     
     @classmethod
     def init_directories(cls):
@@ -25,6 +97,9 @@ class AppConfig:
             cls.APP_DIR,
             cls.STORAGE_DIR,
             cls.RESULT_DIR,
+            cls.SHADOW_STATE_DIR,
+            cls.ARTIFACT_DIR,
+            cls.UPLOAD_DIR,
             cls.DB_DIR,
             cls.LOG_DIR
         ]
@@ -0,0 +1,35 @@
+# 저장된 방화벽 대상의 비밀번호 참조
+#
+# 비밀번호는 DB 에 저장하지 않고 참조만 저장한 뒤 스케줄이 실행될 때 값을 읽는다.
+#   env:FW_EDGE_PW     환경 변수 FW_EDGE_PW
+#   keyring:fpat-edge  OS keyring 의 (fpat-edge, 대상 사용자명) 항목 (keyring 패키지 필요)
+from typing import Optional
+import os
+import re
+
+try:
+    import keyring
+except ImportError:  # keyring: 참조에서만 필요
+    keyring = None
+
+SECRET_REF = re.compile(r"(env|keyring):([A-Za-z0-9_.\-/]+)")
+
+def validate_secret_ref(ref: str) -> str:
+    """비밀번호 참조 형식 확인 (잘못되면 ValueError)"""
+    ref = (ref or "").strip()
+    if not SECRET_REF.fullmatch(ref):
+        raise ValueError(f"Invalid password reference '{ref}': use env:<VARIABLE> or keyring:<SERVICE>")
+    if ref.startswith("keyring:") and keyring is None:
+        raise ValueError("The keyring package is required for keyring: password references")
+    return ref
+
+def resolve_secret(ref: str, username: Optional[str] = None) -> str:
+    """비밀번호 참조를 실제 값으로 변환 (값이 없으면 ValueError)"""
+    scheme, name = SECRET_REF.fullmatch(validate_secret_ref(ref)).groups()
+    if scheme == "env":
+        value = os.environ.get(name)
+    else:
+        value = keyring.get_password(name, username or "")
+    if not value:
+        raise ValueError(f"Password reference '{ref}' is not set")
+    return value
@@ -0,0 +1,75 @@
+from typing import Any, Callable, Optional
+import asyncio
+import contextvars
+import logging
+
+class DbWriter:
+    """동기 DB 기록 함수를 이벤트 루프 밖(스레드)에서 요청 순서대로 하나씩 실행
+
+    작업 상태, 체크포인트, 단계 결과 기록이 이벤트 루프(SSE, HTTP 처리)를 막지 않도록 하고,
+    SQLite 쓰기는 한 번에 하나씩만 실행하여 같은 행에 대한 기록 순서를 유지한다.
+    call 은 결과를 기다리지 않고(오류는 로그만 남김), run 은 기록이 끝날 때까지 기다린다.
+    시작하기 전(또는 종료 후)에는 call 은 바로 실행하고 run 은 스레드에서 실행한다.
+    기록 함수는 요청한 쪽의 컨텍스트(current_job_id 등)에서 실행한다.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """남은 기록을 모두 실행한 뒤 종료"""
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._queue = None
+
+    def call(self, func: Callable, *args) -> None:
+        if self._task is None:
+            try:
+                func(*args)
+            except Exception as e:
+                logging.error(f"Database write {func.__name__} failed: {str(e)}")
+            return
+        self._queue.put_nowait((contextvars.copy_context(), func, args, None))
+
+    async def run(self, func: Callable, *args) -> Any:
+        if self._task is None:
+            return await asyncio.to_thread(func, *args)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((contextvars.copy_context(), func, args, future))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            context, func, args, future = await self._queue.get()
+            try:
+                result = await asyncio.to_thread(context.run, func, *args)
+                if future is not None and not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if future is None:
+                    logging.error(f"Database write {func.__name__} failed: {str(e)}")
+                elif not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+_db_writer: Optional[DbWriter] = None
+
+def get_db_writer() -> DbWriter:
+    global _db_writer
+    if _db_writer is None:
+        _db_writer = DbWriter()
+    return _db_writer
@@ -0,0 +1,75 @@
+from typing import Any, List, Callable, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import logging
+
+from config import AppConfig
+
+class InlineExecutor:
+    """현재 프로세스에서 바로 실행하는 분석 실행기 (디버깅/소규모 데이터용)"""
+
+    def __init__(self, workers: int = 1):
+        # 실행은 순차적이지만 샤드 분할 기준으로 설정한 워커 수를 그대로 사용
+        self.workers = max(1, workers)
+
+    async def run(self, func: Callable, *args) -> Any:
+        return func(*args)
+
+    async def map(self, func: Callable, args_list: Sequence[Tuple]) -> List[Any]:
+        return [func(*args) for args in args_list]
+
+    def shutdown(self) -> None:
+        pass
+
+class ProcessPoolAnalysisExecutor:
+    """ProcessPoolExecutor 기반 분석 실행기
+
+    CPU 연산을 별도 프로세스에서 수행하여 이벤트 루프가 다른 요청을
+    계속 처리할 수 있도록 한다. 풀은 처음 사용할 때 생성한다.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            logging.info(f"Started analysis process pool with {self.workers} workers")
+        return self._pool
+
+    async def run(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), func, *args)
+
+    async def map(self, func: Callable, args_list: Sequence[Tuple]) -> List[Any]:
+        return await asyncio.gather(*(self.run(func, *args) for args in args_list))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+# 실행기 종류 등록
+ANALYSIS_EXECUTORS = {
+    "inline": InlineExecutor,
+    "process": ProcessPoolAnalysisExecutor
+}
+
+_analysis_executor = None
+
+def get_analysis_executor():
+    """AppConfig 설정에 따른 분석 실행기 (싱글톤)"""
+    global _analysis_executor
+    if _analysis_executor is None:
+        executor_class = ANALYSIS_EXECUTORS.get(AppConfig.ANALYSIS_EXECUTOR)
+        if executor_class is None:
+            raise ValueError(f"Unknown analysis executor: {AppConfig.ANALYSIS_EXECUTOR}")
+        _analysis_executor = executor_class(AppConfig.ANALYSIS_WORKERS)
+    return _analysis_executor
+
+def shutdown_analysis_executor() -> None:
+    global _analysis_executor
+    if _analysis_executor is not None:
+        _analysis_executor.shutdown()
+        _analysis_executor = None
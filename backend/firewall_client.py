@@ -1,13 +1,58 @@
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterable, Tuple
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice
+import asyncio
+import heapq
+import logging
+import time
+
+try:
+    import httpx
+except ImportError:  # HTTP API 로 접속하는 HttpFirewallClient 에서만 필요
+    httpx = None
+
+from config import AppConfig
+from utils.firewall_utils import build_mock_policy
+
+class PolicyIndex:
+    """조회한 정책 목록과 정책명/seq/vsys 해시 인덱스 (같은 키가 여럿이면 정책명/seq 는 첫 정책)"""
+
+    def __init__(self, policies: List[Dict], loaded_at: float):
+        self.policies = policies
+        self.loaded_at = loaded_at
+        self.by_name: Dict[str, Dict] = {}
+        self.by_seq: Dict[str, Dict] = {}
+        self.by_vsys: Dict[str, List[Dict]] = {}
+        for policy in policies:
+            self.by_name.setdefault(policy.get("rulename"), policy)
+            self.by_seq.setdefault(str(policy.get("seq")), policy)
+            self.by_vsys.setdefault(policy.get("vsys"), []).append(policy)
+
+def seq_key(policy: Dict) -> Tuple[int, Any]:
+    """seq 정렬 키 (숫자 seq 는 숫자 순서, 그 외는 문자열 순서로 뒤에)"""
+    seq = policy.get("seq")
+    try:
+        return (0, int(seq))
+    except (TypeError, ValueError):
+        return (1, str(seq))
 
 class FirewallClient:
-    def __init__(self, ip: str, id: str, pw: str):
+    # 임시 구현에서 만들어 내는 정책 수 (i 번째 정책의 vsys 는 vsys{i % 3 + 1})
+    mock_policy_count = 300
+    mock_vsys_count = 3
+
+    def __init__(self, ip: str, id: str, pw: str, cache_ttl: Optional[float] = None):
         self.ip = ip
         self.id = id
         self.pw = pw
         self.api_key = None
         self.connected = False
+        # 정책 조회 캐시 유지 시간(초), 0 이면 캐시하지 않음
+        self.cache_ttl = AppConfig.FIREWALL_POLICY_CACHE_TTL if cache_ttl is None else cache_ttl
+        self._policy_index: Optional[PolicyIndex] = None
+        self._index_loading: Optional[asyncio.Future] = None
 
     async def get_api_key(self) -> str:
         """방화벽 API 키 획득 (임시 구현)"""
@@ -16,74 +61,185 @@ class FirewallClient:
         self.connected = True
         return self.api_key
 
-    async def get_policies(self) -> List[Dict]:
-        """방화벽 정책 조회 (임시 구현)"""
+    def _mock_indices(self, vsys: Optional[str]) -> range:
+        if vsys is None:
+            return range(self.mock_policy_count)
+        if vsys not in [f"vsys{k + 1}" for k in range(self.mock_vsys_count)]:
+            return range(0)
+        return range(int(vsys[4:]) - 1, self.mock_policy_count, self.mock_vsys_count)
+
+    async def list_vsys(self) -> List[str]:
+        """방화벽의 vsys 목록 (임시 구현)"""
         if not self.connected:
             raise Exception("Not connected to firewall")
+        return [f"vsys{k + 1}" for k in range(min(self.mock_vsys_count, self.mock_policy_count))]
+
+    async def count_policies(self, vsys: Optional[str] = None) -> int:
+        """방화벽의 전체 정책 수, vsys 를 주면 해당 vsys 의 정책 수 (임시 구현)"""
+        if not self.connected:
+            raise Exception("Not connected to firewall")
+        return len(self._mock_indices(vsys))
+
+    async def fetch_policy_page(self, offset: int, limit: int, vsys: Optional[str] = None) -> List[Dict]:
+        """정책 한 페이지 조회 (임시 구현, 실제 구현에서는 방화벽 API 의 페이지 조회)"""
+        if not self.connected:
+            raise Exception("Not connected to firewall")
+        await asyncio.sleep(0)
+        return [build_mock_policy(i) for i in self._mock_indices(vsys)[offset:offset + limit]]
+
+    async def iter_policy_pages(self, page_size: int = 1000, prefetch: int = 2,
+                                vsys: Optional[str] = None) -> AsyncIterator[List[Dict]]:
+        """정책을 페이지 단위로 순서대로 반환 (다음 prefetch 개 페이지는 미리 동시에 조회)"""
+        total = await self.count_policies(vsys)
+        offsets = iter(range(0, total, page_size))
+
+        def fetch(offset: int) -> asyncio.Future:
+            if vsys is None:
+                return asyncio.ensure_future(self.fetch_policy_page(offset, page_size))
+            return asyncio.ensure_future(self.fetch_policy_page(offset, page_size, vsys))
 
-        # 임시 정책 데이터 생성 (더 긴 데이터)
-        mock_policies = [
-            {
-                "vsys": f"vsys{i%3 + 1}",
-                "seq": f"{i+1}",
-                "rulename": f"Rule_{i+1:05d}_{'ALLOW' if i % 2 == 0 else 'DENY'}_{'HIGH' if i % 3 == 0 else 'LOW'}_RISK",
-                "action": "allow" if i % 2 == 0 else "deny",
-                "source": [
-                    f"10.{i%256}.{(i//256)%256}.0/24",
-                    f"10.{i%256}.{(i//256)%256}.1/24",
-                    f"10.{i%256}.{(i//256)%256}.2/24",
-                    f"172.16.{i%256}.0/24"
-                ],
-                "destination": [
-                    f"192.168.{i%256}.0/24",
-                    f"192.168.{i%256}.1/24",
-                    f"192.168.{i%256}.2/24",
-                    f"203.0.{i%256}.0/24",
-                    f"203.0.{i%256}.1/24"
-                ],
-                "service": [
-                    "tcp/80",
-                    "tcp/443",
-                    "tcp/8080",
-                    "tcp/8443",
-                    f"tcp/{1000 + i%1000}",
-                    "udp/53",
-                    "udp/123",
-                    f"udp/{2000 + i%1000}"
-                ],
-                "risk_level": "high" if i % 3 == 0 else ("medium" if i % 3 == 1 else "low"),
-                "description": f"This is a very long description for rule number {i+1}. "
-                             f"This rule is created for testing purposes and includes multiple lines of text. "
-                             f"The rule is {'allowing' if i % 2 == 0 else 'denying'} traffic from multiple source networks "
-                             f"to multiple destination networks using various services. "
-                             f"Risk level is {'HIGH' if i % 3 == 0 else ('MEDIUM' if i % 3 == 1 else 'LOW')}.",
-                "last_hit": f"2024-{(i%12)+1:02d}-{(i%28)+1:02d} {(i%24):02d}:{(i%60):02d}:{(i%60):02d}",
-                "hit_count": i * 100,
-                "created_by": f"admin_{i%5 + 1}",
-                "created_date": f"2023-{(i%12)+1:02d}-{(i%28)+1:02d}",
-                "modified_by": f"admin_{i%3 + 1}",
-                "modified_date": f"2024-{(i%12)+1:02d}-{(i%28)+1:02d}",
-                "tags": [
-                    f"tag_{i%10 + 1}",
-                    f"department_{i%5 + 1}",
-                    f"project_{i%8 + 1}",
-                    f"environment_{i%3 + 1}"
-                ]
-            }
-            for i in range(300)  # 300개의 임시 정책 생성
-        ]
-        
-        return mock_policies
+        pending = deque(fetch(offset) for offset in islice(offsets, prefetch + 1))
+        try:
+            while pending:
+                page = await pending.popleft()
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append(fetch(offset))
+                yield page
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def iter_vsys_policy_pages(self, page_size: int = 1000, concurrency: int = 4, prefetch: int = 2,
+                                     timings: Optional[Dict[str, Dict[str, Any]]] = None) -> AsyncIterator[List[Dict]]:
+        """vsys 별로 동시에 조회하여 seq 순서로 병합한 페이지를 반환
+
+        vsys 마다 조회 태스크를 두고, 방화벽에 동시에 보내는 페이지 요청 수는 concurrency 로 제한한다.
+        (vsys 단위가 아니라 요청 단위로 제한해야 병합이 아직 조회 순서가 오지 않은 vsys 를 기다려도
+        멈추지 않는다.) 각 vsys 의 정책은 seq 순서로 온다고 가정하고 k-way 병합한다.
+        timings 를 주면 vsys 별 정책 수, 요청 수, 요청 시간 합계, 완료까지 걸린 시간(초)을 기록한다.
+        """
+        vsys_list = await self.list_vsys()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        queues = [asyncio.Queue(maxsize=prefetch + 1) for _ in vsys_list]
+        timings = timings if timings is not None else {}
+        started = time.monotonic()
+
+        async def produce(vsys: str, queue: asyncio.Queue) -> None:
+            timing = timings[vsys] = {"rules": 0, "pages": 0, "fetch_seconds": 0.0, "seconds": 0.0}
+            total = await self.count_policies(vsys)
+            for offset in range(0, total, page_size):
+                async with semaphore:
+                    requested = time.monotonic()
+                    page = await self.fetch_policy_page(offset, page_size, vsys)
+                    timing["fetch_seconds"] += time.monotonic() - requested
+                timing["rules"] += len(page)
+                timing["pages"] += 1
+                if not page:
+                    break
+                await queue.put(page)
+            timing["seconds"] = time.monotonic() - started
+            await queue.put(None)
+
+        producers = [asyncio.ensure_future(produce(vsys, queue)) for vsys, queue in zip(vsys_list, queues)]
+
+        async def next_page(index: int) -> Optional[List[Dict]]:
+            getter = asyncio.ensure_future(queues[index].get())
+            # 조회 태스크가 실패하면 기다리지 않고 예외를 전달
+            done, _ = await asyncio.wait({getter, producers[index]}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                producers[index].result()
+                return await queues[index].get()
+            return getter.result()
+
+        try:
+            heads: List[Optional[List[Dict]]] = [None] * len(vsys_list)
+            heap: List[Tuple] = []
+            for index in range(len(vsys_list)):
+                heads[index] = await next_page(index)
+                if heads[index]:
+                    heapq.heappush(heap, (seq_key(heads[index][0]), index, 0))
+
+            merged: List[Dict] = []
+            while heap:
+                _, index, position = heapq.heappop(heap)
+                merged.append(heads[index][position])
+                position += 1
+                if position == len(heads[index]):
+                    heads[index] = await next_page(index)
+                    position = 0
+                if heads[index]:
+                    heapq.heappush(heap, (seq_key(heads[index][position]), index, position))
+                if len(merged) >= page_size:
+                    yield merged
+                    merged = []
+            if merged:
+                yield merged
+        finally:
+            for producer in producers:
+                producer.cancel()
+
+    async def iter_policies(self, page_size: int = 1000, prefetch: int = 2) -> AsyncIterator[Dict]:
+        """정책을 한 건씩 반환 (전체 목록을 메모리에 올리지 않음)"""
+        async for page in self.iter_policy_pages(page_size, prefetch):
+            for policy in page:
+                yield policy
+
+    async def policy_index(self) -> PolicyIndex:
+        """캐시된 정책 인덱스 (유지 시간이 지났으면 다시 조회, 동시 호출은 한 번만 조회)"""
+        index = self._policy_index
+        if index is not None and time.monotonic() - index.loaded_at < self.cache_ttl:
+            return index
+        if self._index_loading is not None:
+            return await asyncio.shield(self._index_loading)
+
+        self._index_loading = asyncio.get_running_loop().create_future()
+        loading = self._index_loading
+        try:
+            policies = [policy async for policy in self.iter_policies()]
+            index = PolicyIndex(policies, time.monotonic())
+            self._policy_index = index
+            loading.set_result(index)
+            return index
+        except asyncio.CancelledError:
+            loading.cancel()
+            raise
+        except Exception as e:
+            loading.set_exception(e)
+            loading.exception()
+            raise
+        finally:
+            self._index_loading = None
+
+    def invalidate_policy_cache(self) -> None:
+        """정책이 바뀐 경우 다음 조회에서 다시 가져오도록 캐시를 비움"""
+        self._policy_index = None
+
+    async def get_policies(self) -> List[Dict]:
+        """방화벽 정책 전체 조회"""
+        return list((await self.policy_index()).policies)
 
     async def get_policy_by_name(self, rulename: str) -> Optional[Dict]:
-        """특정 정책 조회 (임시 구현)"""
-        policies = await self.get_policies()
-        return next((p for p in policies if p["rulename"] == rulename), None)
+        """정책명으로 정책 조회"""
+        return (await self.policy_index()).by_name.get(rulename)
 
     async def get_policy_by_id(self, rule_id: str) -> Optional[Dict]:
-        """ID로 정책 조회 (임시 구현)"""
-        policies = await self.get_policies()
-        return next((p for p in policies if p["seq"] == rule_id), None)
+        """ID(seq)로 정책 조회"""
+        return (await self.policy_index()).by_seq.get(str(rule_id))
+
+    async def get_policies_by_names(self, rulenames: Iterable[str]) -> Dict[str, Dict]:
+        """여러 정책명을 한 번에 조회 (찾은 정책만 정책명 -> 정책으로 반환)"""
+        by_name = (await self.policy_index()).by_name
+        return {name: by_name[name] for name in rulenames if name in by_name}
+
+    async def get_policies_by_vsys(self, vsys: str) -> List[Dict]:
+        """vsys 의 정책 목록"""
+        return list((await self.policy_index()).by_vsys.get(vsys, []))
+
+    async def keepalive(self) -> bool:
+        """세션 유지 확인 (임시 구현, 세션이 만료되었으면 False)"""
+        return self.connected
 
     def is_connected(self) -> bool:
         """연결 상태 확인"""
@@ -92,4 +248,127 @@ class FirewallClient:
     async def disconnect(self) -> None:
         """연결 해제 (임시 구현)"""
         self.api_key = None
-        self.connected = False 
\ No newline at end of file
+        self.connected = False
+        self.invalidate_policy_cache()
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP-date)를 대기 시간(초)으로 변환 (해석할 수 없으면 None)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class HttpFirewallClient(FirewallClient):
+    """방화벽 REST API(NGF 형태, 토큰 인증 + offset/limit 페이지)로 정책을 조회하는 클라이언트
+
+    base_url 의 {ip} 는 방화벽 IP 로 바뀐다. 429/503 응답과 연결 오류는 Retry-After
+    (없으면 지수 백오프) 만큼 기다린 뒤 retries 번까지 다시 시도한다.
+    """
+
+    # 지수 백오프 첫 대기 시간(초)
+    retry_backoff = 0.5
+
+    def __init__(self, ip: str, id: str, pw: str, base_url: str, cache_ttl: Optional[float] = None,
+                 retries: Optional[int] = None, timeout: Optional[float] = None, transport=None):
+        if httpx is None:
+            raise RuntimeError("httpx is required to connect to a firewall API")
+        super().__init__(ip, id, pw, cache_ttl)
+        self.base_url = base_url.format(ip=ip).rstrip("/")
+        self.retries = AppConfig.FIREWALL_API_RETRIES if retries is None else retries
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=AppConfig.FIREWALL_API_TIMEOUT if timeout is None else timeout,
+            transport=transport
+        )
+
+    async def _request(self, method: str, path: str, **kwargs) -> "httpx.Response":
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._http.request(method, path, headers=headers, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise
+                wait = self.retry_backoff * 2 ** attempt
+                logging.warning(f"Firewall API {self.ip} request failed ({str(e)}), retrying in {wait:g}s")
+            else:
+                if response.status_code not in (429, 503) or attempt == self.retries:
+                    return response
+                wait = retry_after_seconds(response.headers.get("Retry-After"))
+                if wait is None:
+                    wait = self.retry_backoff * 2 ** attempt
+                logging.warning(f"Firewall API {self.ip} returned {response.status_code}, retrying in {wait:g}s")
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    def _check(response: "httpx.Response") -> Dict:
+        if response.status_code == 401:
+            raise Exception("Authentication failed")
+        if response.status_code >= 400:
+            raise Exception(f"Firewall API error {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def get_api_key(self) -> str:
+        # 다시 로그인하다 실패하면 연결되지 않은 상태로 남김
+        self.api_key = None
+        self.connected = False
+        body = self._check(await self._request("POST", "/api/v1/auth", json={"user": self.id, "password": self.pw}))
+        self.api_key = body["token"]
+        self.connected = True
+        return self.api_key
+
+    async def list_vsys(self) -> List[str]:
+        if not self.connected:
+            raise Exception("Not connected to firewall")
+        return self._check(await self._request("GET", "/api/v1/vsys"))["items"]
+
+    async def count_policies(self, vsys: Optional[str] = None) -> int:
+        if not self.connected:
+            raise Exception("Not connected to firewall")
+        params = {"offset": 0, "limit": 0, **({"vsys": vsys} if vsys is not None else {})}
+        return self._check(await self._request("GET", "/api/v1/policies", params=params))["total"]
+
+    async def fetch_policy_page(self, offset: int, limit: int, vsys: Optional[str] = None) -> List[Dict]:
+        """offset 부터 limit 개 조회 (서버의 최대 페이지 크기가 더 작으면 나누어 조회)"""
+        if not self.connected:
+            raise Exception("Not connected to firewall")
+        policies: List[Dict] = []
+        while len(policies) < limit:
+            params = {"offset": offset + len(policies), "limit": limit - len(policies)}
+            if vsys is not None:
+                params["vsys"] = vsys
+            body = self._check(await self._request("GET", "/api/v1/policies", params=params))
+            if not body["items"]:
+                break
+            policies.extend(body["items"])
+        return policies
+
+    async def keepalive(self) -> bool:
+        if not self.connected:
+            return False
+        response = await self._request("GET", "/api/v1/session")
+        return response.status_code == 200
+
+    async def disconnect(self) -> None:
+        if self.connected:
+            try:
+                await self._request("POST", "/api/v1/logout")
+            except Exception as e:
+                logging.warning(f"Failed to log out from firewall {self.ip}: {str(e)}")
+        await super().disconnect()
+        await self._http.aclose()
+
+def create_firewall_client(ip: str, id: str, pw: str) -> FirewallClient:
+    """설정에 따라 방화벽 API 클라이언트(FIREWALL_API_URL 지정 시) 또는 임시 클라이언트 생성"""
+    if AppConfig.FIREWALL_API_URL:
+        return HttpFirewallClient(ip, id, pw, AppConfig.FIREWALL_API_URL)
+    return FirewallClient(ip, id, pw)
@@ -0,0 +1,192 @@
+from typing import Dict, Any, Optional, Tuple, Callable
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+
+from config import AppConfig
+from firewall_client import FirewallClient, create_firewall_client
+
+# 세션 키: (방화벽 IP, 사용자, 방화벽 종류)
+SessionKey = Tuple[str, str, Optional[str]]
+
+def _digest(pw: Optional[str]) -> bytes:
+    return hashlib.sha256((pw or "").encode("utf-8")).digest()
+
+class FirewallSession:
+    """로그인된 FirewallClient 와 사용 기록"""
+
+    def __init__(self, key: SessionKey, client: FirewallClient, pw: Optional[str], now: float):
+        self.key = key
+        self.client = client
+        self.digest = _digest(pw)
+        self.created_at = now
+        self.last_used = now
+        self.in_use = 0
+        # 사용 중에 다시 로그인한 세션으로 교체됨 (마지막 lease 가 끝나면 연결 종료)
+        self.retired = False
+
+    def matches(self, pw: Optional[str]) -> bool:
+        return hmac.compare_digest(self.digest, _digest(pw))
+
+class FirewallSessionPool:
+    """(IP, 사용자, 방화벽 종류) 별로 로그인된 세션을 여러 프로젝트가 공유하는 풀
+
+    같은 세션에 대한 동시 로그인은 한 번만 수행하고(single-flight) 나머지는 그 결과를 기다린다.
+    idle_ttl 초 동안 쓰지 않은 세션과 max_size 를 넘는 가장 오래된 세션은 연결을 끊고 제거한다.
+    사용 중인(lease) 세션은 제거하지 않는다.
+    """
+
+    def __init__(self, max_size: int = 64, idle_ttl: float = 1800.0, keepalive_interval: float = 300.0,
+                 client_factory: Callable[[str, str, str], FirewallClient] = create_firewall_client,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.keepalive_interval = keepalive_interval
+        self.client_factory = client_factory
+        self.clock = clock
+        self._sessions: "OrderedDict[SessionKey, FirewallSession]" = OrderedDict()
+        self._logins: Dict[Tuple[SessionKey, bytes], asyncio.Future] = {}
+        self.logins = 0
+
+    @staticmethod
+    def make_key(ip: str, user: Optional[str], vendor: Optional[str] = None) -> SessionKey:
+        return (ip, user or "", vendor)
+
+    def _touch(self, session: FirewallSession) -> FirewallClient:
+        session.last_used = self.clock()
+        if self._sessions.get(session.key) is session:
+            self._sessions.move_to_end(session.key)
+        return session.client
+
+    async def acquire(self, ip: str, user: Optional[str], pw: Optional[str], vendor: Optional[str] = None) -> FirewallClient:
+        """로그인된 세션을 반환 (없거나 비밀번호가 다르면 새로 로그인)"""
+        key = self.make_key(ip, user, vendor)
+        session = self._sessions.get(key)
+        if session is not None and session.matches(pw) and session.client.is_connected():
+            return self._touch(session)
+
+        login_key = (key, _digest(pw))
+        pending = self._logins.get(login_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._logins[login_key] = future
+        try:
+            client = self.client_factory(ip, user, pw)
+            await client.get_api_key()
+            self.logins += 1
+            previous = self._sessions.pop(key, None)
+            self._sessions[key] = FirewallSession(key, client, pw, self.clock())
+            if previous is not None and previous.client is not client:
+                if previous.in_use:
+                    previous.retired = True
+                else:
+                    await self._disconnect(previous)
+            await self._evict_overflow()
+            future.set_result(client)
+            return client
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 쪽이 없어도 예외가 기록되지 않도록 결과를 소비
+            future.exception()
+            raise
+        finally:
+            self._logins.pop(login_key, None)
+
+    def get(self, ip: str, user: Optional[str], vendor: Optional[str] = None) -> Optional[FirewallClient]:
+        """이미 로그인된 세션 (없으면 None)"""
+        session = self._sessions.get(self.make_key(ip, user, vendor))
+        if session is None or not session.client.is_connected():
+            return None
+        return self._touch(session)
+
+    @asynccontextmanager
+    async def lease(self, ip: str, user: Optional[str], vendor: Optional[str] = None):
+        """블록 안에서 사용하는 동안 제거되지 않도록 세션을 빌림 (없으면 None)"""
+        session = self._sessions.get(self.make_key(ip, user, vendor))
+        if session is None or not session.client.is_connected():
+            yield None
+            return
+        session.in_use += 1
+        try:
+            yield self._touch(session)
+        finally:
+            await self._release(session)
+
+    async def _release(self, session: FirewallSession) -> None:
+        session.in_use -= 1
+        session.last_used = self.clock()
+        if session.retired and session.in_use == 0:
+            await self._disconnect(session)
+
+    async def _disconnect(self, session: FirewallSession) -> None:
+        try:
+            await session.client.disconnect()
+        except Exception as e:
+            logging.warning(f"Failed to disconnect firewall session {session.key[0]}: {str(e)}")
+
+    async def _remove(self, session: FirewallSession) -> None:
+        if self._sessions.get(session.key) is session:
+            self._sessions.pop(session.key)
+        await self._disconnect(session)
+
+    async def _evict_overflow(self) -> None:
+        idle = [session for session in self._sessions.values() if session.in_use == 0]
+        for session in idle[:max(0, len(self._sessions) - self.max_size)]:
+            logging.info(f"Evicting least recently used firewall session {session.key[0]} ({session.key[1]})")
+            await self._remove(session)
+
+    async def maintain(self) -> int:
+        """유휴 시간이 지난 세션을 제거하고, 오래 쓰지 않은 세션은 연결을 확인 (끊겼으면 다시 로그인)
+
+        제거한 세션 수를 반환한다.
+        """
+        now = self.clock()
+        evicted = 0
+        for session in list(self._sessions.values()):
+            if session.in_use:
+                continue
+            idle = now - session.last_used
+            if idle >= self.idle_ttl:
+                logging.info(f"Closing idle firewall session {session.key[0]} ({session.key[1]})")
+                await self._remove(session)
+                evicted += 1
+            elif idle >= self.keepalive_interval:
+                try:
+                    if not await session.client.keepalive():
+                        await session.client.get_api_key()
+                        self.logins += 1
+                except Exception as e:
+                    logging.warning(f"Firewall session {session.key[0]} keepalive failed: {str(e)}")
+                    await self._remove(session)
+                    evicted += 1
+        return evicted
+
+    async def close(self) -> None:
+        for session in list(self._sessions.values()):
+            await self._remove(session)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "in_use": sum(1 for session in self._sessions.values() if session.in_use),
+            "logins": self.logins
+        }
+
+_session_pool: Optional[FirewallSessionPool] = None
+
+def get_session_pool() -> FirewallSessionPool:
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = FirewallSessionPool(
+            AppConfig.FIREWALL_SESSION_MAX, AppConfig.FIREWALL_SESSION_IDLE_TTL, AppConfig.FIREWALL_SESSION_KEEPALIVE
+        )
+    return _session_pool
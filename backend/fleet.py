@@ -0,0 +1,129 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterable, Iterator, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+import csv
+import io
+import logging
+import time
+
+from task_manager import TaskType
+from job_engine import TaskCancelled
+from utils.firewall_utils import FIREWALL_TYPES
+
+# 대상 목록에서 사용하는 필드 (type, ip 는 필수)
+TARGET_FIELDS = ("name", "type", "ip", "id", "pw", "text")
+
+# 방화벽에 접속하는 태스크 (종류별 접속 제한 안에서 실행)
+VENDOR_BOUND_TASK_TYPES = (TaskType.FIREWALL_TYPE_SELECTION, TaskType.FIREWALL_CONNECTION, TaskType.CONFIG_IMPORT)
+
+def parse_targets_csv(text: str) -> List[Dict[str, Any]]:
+    """CSV(헤더: name,type,ip,id,pw,text) 를 대상 목록으로 변환"""
+    reader = csv.DictReader(io.StringIO(text.strip()))
+    columns = {(name or "").strip().lower() for name in reader.fieldnames or []}
+    if not {"type", "ip"} <= columns:
+        raise ValueError("CSV must have a header row with at least 'type' and 'ip' columns")
+
+    targets = []
+    for row in reader:
+        values = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items() if isinstance(value, str)}
+        if not any(values.values()):
+            continue
+        targets.append({field: values[field] for field in TARGET_FIELDS if values.get(field)})
+    return targets
+
+def normalize_targets(targets: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """대상 목록 검증 (방화벽 종류, IP 필수, 같은 IP 중복 불가)"""
+    normalized = []
+    seen = set()
+    for index, target in enumerate(targets, start=1):
+        fw_type = (target.get("type") or "").strip().lower()
+        ip = (target.get("ip") or "").strip()
+        if fw_type not in FIREWALL_TYPES:
+            raise ValueError(f"Target {index}: invalid firewall type '{target.get('type')}'")
+        if not ip:
+            raise ValueError(f"Target {index}: ip is required")
+        if ip in seen:
+            raise ValueError(f"Target {index}: duplicate ip {ip}")
+        seen.add(ip)
+        normalized.append({
+            **{field: target[field] for field in TARGET_FIELDS if target.get(field) not in (None, "")},
+            "type": fw_type,
+            "ip": ip
+        })
+    if not normalized:
+        raise ValueError("At least one target is required")
+    return normalized
+
+def split_vendor_steps(steps: List[Dict[str, Any]]) -> int:
+    """방화벽 접속이 필요한 앞쪽 단계 수 (마지막 접속 태스크까지)"""
+    count = 0
+    for index, step in enumerate(steps):
+        if step.get("type") in VENDOR_BOUND_TASK_TYPES:
+            count = index + 1
+    return count
+
+class VendorRateLimiter:
+    """방화벽 종류별 동시 접속 수와 접속 시작 간격 제한"""
+
+    def __init__(self, limits: Dict[str, int], intervals: Optional[Dict[str, float]] = None, default_limit: int = 1):
+        self.limits = limits
+        self.intervals = intervals or {}
+        self.default_limit = default_limit
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, vendor: str):
+        semaphore = self._semaphores.get(vendor)
+        if semaphore is None:
+            semaphore = self._semaphores[vendor] = asyncio.Semaphore(max(1, self.limits.get(vendor, self.default_limit)))
+        async with semaphore:
+            interval = self.intervals.get(vendor, 0.0)
+            if interval > 0:
+                lock = self._locks.setdefault(vendor, asyncio.Lock())
+                async with lock:
+                    wait = self._last_start.get(vendor, float("-inf")) + interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    self._last_start[vendor] = time.monotonic()
+            yield
+
+async def run_fleet(targets: List[Dict[str, Any]], run_target: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                    concurrency: int, on_done: Optional[Callable[[int, Dict[str, Any], Dict[str, Any]], None]] = None,
+                    stagger: float = 0.0) -> List[Dict[str, Any]]:
+    """대상별 run_target 을 최대 concurrency 개씩 동시에 실행
+
+    한 대상의 예외는 그 대상의 실패 결과로 기록하고 다른 대상의 실행은 계속한다.
+    stagger 를 지정하면 대상의 시작 시각을 최소 stagger 초 간격으로 벌린다.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    start_lock = asyncio.Lock()
+    next_start = [0.0]
+
+    async def run(index: int, target: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            if stagger > 0:
+                async with start_lock:
+                    wait = next_start[0] - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    next_start[0] = time.monotonic() + stagger
+            try:
+                outcome = await run_target(target)
+            except TaskCancelled:
+                raise
+            except Exception as e:
+                logging.error(f"Fleet target {target.get('ip')} failed: {str(e)}")
+                outcome = {"success": False, "message": str(e)}
+        if on_done is not None:
+            on_done(index, target, outcome)
+        return outcome
+
+    return list(await asyncio.gather(*(run(index, target) for index, target in enumerate(targets))))
+
+def iter_fleet_rows(sources: Iterable[Tuple[Dict[str, Any], Iterable[Dict[str, Any]]]]) -> Iterator[Dict[str, Any]]:
+    """대상별 정책 행에 방화벽 정보를 붙여 하나의 행 목록으로 연결"""
+    for target, rows in sources:
+        for row in rows:
+            yield {"firewall": target["ip"], "firewall_type": target["type"], **row}
@@ -0,0 +1,142 @@
+# 정책 차단 영향 분석
+#
+# 차단 대상 정책(T)을 deny 로 바꾸거나(mode="deny") 삭제할 때(mode="remove") 같은 vsys 의 다른 활성
+# 정책 중 영향을 받는 정책을 찾는다. 트래픽은 위에서부터 처음 일치하는 정책이 처리한다.
+#   - T 앞의 allow 정책이 T 와 겹치면 겹치는 트래픽은 계속 허용된다          -> Bypasses Block
+#   - deny  : T 뒤의 정책이 T 에 완전히 포함되면 더 이상 일치하는 트래픽이 없다 -> Shadowed
+#             일부만 겹치면 겹치는 트래픽은 T 에서 차단된다                   -> Partially Shadowed
+#   - remove: T 뒤에서 T 와 겹치는 정책이 T 의 트래픽을 넘겨받는다
+#             allow 정책이면 트래픽이 계속 허용되고                          -> Bypasses Block
+#             deny 정책이면 그 정책에서 차단된다                             -> Receives Traffic
+# 함께 차단하는 다른 대상 정책은 영향 정책으로 보지 않는다. 겹치는 정책은 shadow 분석과 같은
+# 출발지/목적지 주소 구간과 서비스 포트 구간의 접두사 인덱스(RuleRangeIndex)로 후보만 골라 검증한다.
+from typing import Dict, Any, List, Optional, Tuple
+from collections import Counter, defaultdict
+import logging
+
+from shadow_analyzer import RuleRanges, RuleRangeIndex, overlap_details, is_enabled
+from utils.range_utils import ranges_cover
+
+BLOCK_MODES = ("deny", "remove")
+ALLOW_ACTIONS = frozenset({"allow", "accept", "permit"})
+
+IMPACT_BYPASS = "Bypasses Block"
+IMPACT_SHADOWED = "Shadowed"
+IMPACT_PARTIAL = "Partially Shadowed"
+IMPACT_RECEIVES = "Receives Traffic"
+
+# find_block_impacts 에 필요한 정책 필드 (워커 프로세스로 보낼 때 나머지 필드는 제외)
+IMPACT_FIELDS = ("vsys", "enable", "action", "source", "destination", "service", "negate_source", "negate_destination")
+
+# 영향 정책 한 건: (정책 위치, 영향 유형, 완전 포함 여부)
+#   완전 포함: 앞 정책은 T 전체를 포함, 뒤 정책은 T 에 전체가 포함됨
+Impact = Tuple[int, str, bool]
+
+def is_allow(policy: Dict[str, Any]) -> bool:
+    return str(policy.get('action') or '').lower() in ALLOW_ACTIONS
+
+def _covers(outer: RuleRanges, inner: RuleRanges) -> bool:
+    return (ranges_cover(outer.source, inner.source) and
+            ranges_cover(outer.destination, inner.destination) and
+            ranges_cover(outer.service, inner.service))
+
+def find_block_impacts(policies: List[Dict[str, Any]], targets: List[int], mode: str = "deny") -> Dict[int, List[Impact]]:
+    """차단 대상 정책 위치별로 영향을 받는 정책 목록 계산 (정책 위치 오름차순)"""
+    if mode not in BLOCK_MODES:
+        raise ValueError(f"Unknown block mode: {mode}")
+
+    target_set = set(targets)
+    target_vsys = {policies[target].get('vsys') for target in target_set}
+    groups: Dict[Any, List[int]] = defaultdict(list)
+    for position, policy in enumerate(policies):
+        if position not in target_set and policy.get('vsys') in target_vsys and is_enabled(policy):
+            groups[policy.get('vsys')].append(position)
+
+    # 대상 정책이 있는 vsys 의 정책만 구간으로 변환하여 인덱스 구성
+    rules: List[Optional[RuleRanges]] = [None] * len(policies)
+    for position in [*target_set, *(position for positions in groups.values() for position in positions)]:
+        rules[position] = RuleRanges.from_policy(policies[position])
+    indexes = {vsys: RuleRangeIndex(rules, groups[vsys]) for vsys in target_vsys}
+
+    impacts: Dict[int, List[Impact]] = {}
+    for target in targets:
+        rule = rules[target]
+        found: List[Impact] = []
+        for position in indexes[policies[target].get('vsys')].overlaps(rule):
+            other = rules[position]
+            allow = is_allow(policies[position])
+            if position < target:
+                if allow:
+                    found.append((position, IMPACT_BYPASS, _covers(other, rule)))
+                continue
+            contained = _covers(rule, other)
+            if mode == "deny":
+                found.append((position, IMPACT_SHADOWED if contained else IMPACT_PARTIAL, contained))
+            else:
+                found.append((position, IMPACT_BYPASS if allow else IMPACT_RECEIVES, contained))
+        impacts[target] = found
+    return impacts
+
+def build_impact_entries(policies: List[Dict[str, Any]], impacts: Dict[int, List[Impact]],
+                         max_affected: Optional[int] = None) -> List[Dict[str, Any]]:
+    """PolicyTable 에서 표시할 결과 행 (대상 정책 다음에 영향 정책이 이어짐)
+
+    대상 정책마다 영향 정책은 max_affected 건까지만 행으로 만들고, 건수는 요약에 모두 반영한다.
+    """
+    rows = []
+    for target, found in impacts.items():
+        policy = policies[target]
+        counts = Counter(kind for _, kind, _ in found)
+        # 앞의 allow 정책이 대상 정책 전체를 포함하면 차단해도 효과가 없음
+        bypassed_by = next(
+            (policies[position]['rulename'] for position, kind, full in found if full and position < target),
+            None
+        )
+        rows.append({
+            **policy,
+            "analysis_type": "Target Rule",
+            "impact_summary": ", ".join(f"{count} {kind}" for kind, count in counts.items()) or "No other rules affected",
+            "affected_count": len(found),
+            "fully_bypassed_by": bypassed_by
+        })
+        for position, kind, full in found[:max_affected]:
+            affected = policies[position]
+            rows.append({
+                **affected,
+                "analysis_type": "Affected Rule",
+                "target_rule": policy['rulename'],
+                "impact_type": kind,
+                "full_overlap": full,
+                "impact_details": overlap_details(affected, policy)
+            })
+    return rows
+
+def block_targets(policies: List[Dict[str, Any]], rule_names: List[str]) -> List[int]:
+    """정책명이 일치하는 대상 정책 위치 (같은 이름의 정책이 여러 vsys 에 있으면 모두 대상)"""
+    names = set(rule_names)
+    return [position for position, policy in enumerate(policies) if policy.get('rulename') in names]
+
+def impact_rows(policies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """영향 계산에 필요한 필드만 남긴 정책 목록"""
+    return [{field: policy.get(field) for field in IMPACT_FIELDS} for policy in policies]
+
+def summarize_impacts(rows: List[Dict[str, Any]], impacts: Dict[int, List[Impact]], mode: str,
+                      max_affected: Optional[int] = None) -> Dict[str, Any]:
+    counts = Counter(kind for found in impacts.values() for _, kind, _ in found)
+    summary = {
+        "mode": mode,
+        "target_count": len(impacts),
+        "affected_count": sum(len(found) for found in impacts.values()),
+        "impact_counts": dict(counts),
+        "fully_bypassed_targets": sum(1 for row in rows if row.get("fully_bypassed_by")),
+        "truncated_targets": sum(1 for found in impacts.values() if max_affected is not None and len(found) > max_affected)
+    }
+    logging.info(f"Block impact analysis: {summary['target_count']} targets, {summary['affected_count']} affected rules")
+    return summary
+
+def analyze_block_impact(policies: List[Dict[str, Any]], rule_names: List[str], mode: str = "deny",
+                         max_affected: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """정책명으로 지정한 대상 정책의 차단 영향 분석, (결과 행, 요약) 반환"""
+    impacts = find_block_impacts(policies, block_targets(policies, rule_names), mode)
+    rows = build_impact_entries(policies, impacts, max_affected)
+    return rows, summarize_impacts(rows, impacts, mode, max_affected)
@@ -0,0 +1,383 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+# 작업 상태
+JOB_QUEUED = "Queued"
+JOB_RUNNING = "Running"
+JOB_COMPLETED = "Completed"
+JOB_ERROR = "Error"
+JOB_CANCELLED = "Cancelled"
+JOB_TIMEOUT = "Timeout"
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_ERROR, JOB_CANCELLED, JOB_TIMEOUT)
+
+JobFactory = Callable[[], Awaitable[Dict[str, Any]]]
+# on_update(job_id, 변경된 필드) : 상태 변경을 영속 저장소(jobs 테이블)에 기록
+JobUpdateHook = Callable[[str, Dict[str, Any]], None]
+
+class TaskCancelled(Exception):
+    """취소 또는 시간 초과로 실행이 중단됨
+
+    reason 은 JOB_CANCELLED 또는 JOB_TIMEOUT, partial 은 중단 시점까지의 결과(태스크 결과 형식),
+    result 는 작업 결과로 남길 응답.
+    """
+
+    def __init__(self, reason: str = JOB_CANCELLED, message: Optional[str] = None,
+                 partial: Optional[Dict[str, Any]] = None):
+        super().__init__(message or ("Cancelled by user" if reason == JOB_CANCELLED else "Time budget exceeded"))
+        self.reason = reason
+        self.partial = partial
+        self.result: Optional[Dict[str, Any]] = None
+
+class CancelToken:
+    """협조적 취소 표시 (상위 토큰이 취소되면 함께 취소된 것으로 본다)"""
+
+    def __init__(self, parent: Optional["CancelToken"] = None):
+        self.parent = parent
+        self._reason: Optional[str] = None
+
+    @property
+    def reason(self) -> Optional[str]:
+        if self._reason is not None:
+            return self._reason
+        return self.parent.reason if self.parent is not None else None
+
+    def cancel(self, reason: str = JOB_CANCELLED) -> None:
+        if self._reason is None:
+            self._reason = reason
+
+    def check(self) -> None:
+        reason = self.reason
+        if reason is not None:
+            raise TaskCancelled(reason)
+
+class CheckpointScope:
+    """실행 중인 단계의 체크포인트 (이전 실행에서 남긴 상태와 저장 함수)
+
+    저장은 interval 초에 한 번으로 제한하며 force=True 이면 바로 기록한다.
+    """
+
+    def __init__(self, initial: Optional[Dict[str, Any]], save: Callable[[Dict[str, Any]], None], interval: float = 0.0):
+        self.state = initial
+        self._save = save
+        self.interval = interval
+        self._saved_at = float("-inf")
+
+    def save(self, state: Dict[str, Any], force: bool = False) -> bool:
+        self.state = state
+        now = time.monotonic()
+        if not force and now - self._saved_at < self.interval:
+            return False
+        self._saved_at = now
+        self._save(state)
+        return True
+
+_current_job: ContextVar[Optional[str]] = ContextVar("current_job", default=None)
+_checkpoint: ContextVar[Optional[CheckpointScope]] = ContextVar("checkpoint", default=None)
+_cancel_token: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+# 여러 단계를 하나의 작업으로 실행할 때 단계별 진행률 구간 [start, end] 과 공통 metrics
+_progress_scope: ContextVar[Tuple[float, float, Dict[str, Any]]] = ContextVar(
+    "progress_scope", default=(0.0, 1.0, {})
+)
+
+class _PendingJob:
+    __slots__ = ("job_id", "key", "factory")
+
+    def __init__(self, job_id: str, key: str, factory: JobFactory):
+        self.job_id = job_id
+        self.key = key
+        self.factory = factory
+
+class JobEngine:
+    """프로세스 내 백그라운드 작업 실행기
+
+    고정된 수의 워커가 대기열에서 작업을 꺼내 실행한다. 같은 키(방화벽)의 작업은
+    동시에 per_key_limit 개까지만 실행하며, 한도에 걸린 작업은 건너뛰고
+    다른 방화벽의 작업을 먼저 실행한다.
+    """
+
+    def __init__(self, workers: int, per_key_limit: int, on_update: Optional[JobUpdateHook] = None):
+        self.workers = max(1, workers)
+        self.per_key_limit = max(1, per_key_limit)
+        self.on_update = on_update
+        self._pending: deque = deque()
+        self._running: Counter = Counter()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._condition: Optional[asyncio.Condition] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._tokens: Dict[str, CancelToken] = {}
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._worker_tasks)
+
+    async def start(self) -> None:
+        if self.started:
+            return
+        self._condition = asyncio.Condition()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(index)) for index in range(self.workers)
+        ]
+        logging.info(f"Job engine started with {self.workers} workers (per-firewall limit {self.per_key_limit})")
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(self, job_id: str, key: str, factory: JobFactory,
+                     channel: Optional[str] = None, info: Optional[Dict[str, Any]] = None) -> None:
+        """작업을 대기열에 추가 (실행은 워커가 담당)
+
+        channel 은 진행 이벤트를 구독하는 단위(프로젝트), info 는 이벤트에 함께 실을 작업 정보.
+        """
+        if not self.started:
+            await self.start()
+        self._state[job_id] = {
+            "status": JOB_QUEUED, "progress": 0.0, "message": None, "metrics": {},
+            "key": key, "channel": channel, "info": info or {}
+        }
+        async with self._condition:
+            self._pending.append(_PendingJob(job_id, key, factory))
+            self._condition.notify_all()
+        if self.on_update is not None:
+            self.on_update(job_id, {"status": JOB_QUEUED})
+
+    def state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._state.get(job_id)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        for position, pending in enumerate(self._pending):
+            if pending.job_id == job_id:
+                return position
+        return None
+
+    def cancel(self, job_id: str) -> bool:
+        """대기 중인 작업은 바로 취소하고, 실행 중인 작업은 취소를 요청 (없거나 끝난 작업이면 False)"""
+        for pending in self._pending:
+            if pending.job_id == job_id:
+                self._pending.remove(pending)
+                self._update(job_id, status=JOB_CANCELLED, finished_at=datetime.now(), error="Cancelled before start")
+                return True
+        token = self._tokens.get(job_id)
+        if token is None:
+            return False
+        token.cancel(JOB_CANCELLED)
+        task = self._running_tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        return True
+
+    def _take_runnable(self) -> Optional[_PendingJob]:
+        for pending in self._pending:
+            if self._running[pending.key] < self.per_key_limit:
+                self._pending.remove(pending)
+                self._running[pending.key] += 1
+                return pending
+        return None
+
+    def _update(self, job_id: str, **fields) -> None:
+        state = self._state.setdefault(job_id, {})
+        state.update(fields)
+        if self.on_update is not None:
+            try:
+                self.on_update(job_id, fields)
+            except Exception as e:
+                logging.error(f"Failed to persist job {job_id} update: {str(e)}")
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            async with self._condition:
+                job = self._take_runnable()
+                while job is None:
+                    await self._condition.wait()
+                    job = self._take_runnable()
+
+            cancel_token = CancelToken()
+            self._tokens[job.job_id] = cancel_token
+            token = _current_job.set(job.job_id)
+            token_var = _cancel_token.set(cancel_token)
+            self._update(job.job_id, status=JOB_RUNNING, started_at=datetime.now())
+            # 작업마다 별도 태스크로 실행하여 작업만 취소할 수 있도록 함
+            task = asyncio.create_task(job.factory())
+            self._running_tasks[job.job_id] = task
+            try:
+                result = await asyncio.shield(task)
+                success = bool(result.get("success", False)) if isinstance(result, dict) else True
+                self._update(
+                    job.job_id,
+                    status=JOB_COMPLETED if success else JOB_ERROR,
+                    progress=1.0 if success else self._state[job.job_id].get("progress", 0.0),
+                    finished_at=datetime.now(),
+                    result=result,
+                    error=None if success else (result.get("error") or result.get("message"))
+                )
+            except TaskCancelled as e:
+                logging.warning(f"Job {job.job_id} stopped ({e.reason}): {str(e)}")
+                self._update(job.job_id, status=e.reason, finished_at=datetime.now(), result=e.result, error=str(e))
+            except asyncio.CancelledError:
+                if not task.done():
+                    # 작업 엔진 종료
+                    task.cancel()
+                    self._update(job.job_id, status=JOB_ERROR, finished_at=datetime.now(), error="Job cancelled")
+                    raise
+                self._update(job.job_id, status=cancel_token.reason or JOB_CANCELLED, finished_at=datetime.now(),
+                             error="Cancelled by user")
+            except Exception as e:
+                logging.error(f"Job {job.job_id} failed: {str(e)}")
+                self._update(job.job_id, status=JOB_ERROR, finished_at=datetime.now(), error=str(e))
+            finally:
+                self._tokens.pop(job.job_id, None)
+                self._running_tasks.pop(job.job_id, None)
+                _cancel_token.reset(token_var)
+                _current_job.reset(token)
+                async with self._condition:
+                    self._running[job.key] -= 1
+                    self._condition.notify_all()
+
+_job_engine: Optional[JobEngine] = None
+
+def set_job_engine(engine: Optional[JobEngine]) -> None:
+    global _job_engine
+    _job_engine = engine
+
+def get_job_engine() -> Optional[JobEngine]:
+    return _job_engine
+
+def current_job_id() -> Optional[str]:
+    return _current_job.get()
+
+def report_progress(progress: float, message: Optional[str] = None, **metrics) -> None:
+    """실행 중인 작업의 진행률(0~1) 보고 (작업 밖에서 호출되면 무시)
+
+    metrics 에는 단계별 수치(가져온 정책 수, 비교한 정책 수, 처리량 등)를 전달한다.
+    """
+    job_id = _current_job.get()
+    if job_id is None or _job_engine is None:
+        return
+    start, end, scope_metrics = _progress_scope.get()
+    progress = start + (end - start) * max(0.0, min(1.0, progress))
+    _job_engine._update(job_id, progress=progress, message=message, metrics={**scope_metrics, **metrics})
+
+@contextmanager
+def progress_scope(start: float, end: float, **metrics):
+    """블록 안에서 보고되는 진행률(0~1)을 전체 작업의 [start, end] 구간으로 변환"""
+    token = _progress_scope.set((start, end, metrics))
+    try:
+        yield
+    finally:
+        _progress_scope.reset(token)
+
+def check_cancelled() -> None:
+    """실행 중인 작업에 취소가 요청되었으면 TaskCancelled 발생 (긴 반복문에서 주기적으로 호출)"""
+    token = _cancel_token.get()
+    if token is not None:
+        token.check()
+
+def cancel_reason() -> Optional[str]:
+    token = _cancel_token.get()
+    return token.reason if token is not None else None
+
+async def run_with_budget(coro: Awaitable[Any], timeout: Optional[float]) -> Any:
+    """코루틴을 시간 제한(초) 안에서 실행
+
+    시간이 지나면 이 실행에만 해당하는 취소 토큰을 JOB_TIMEOUT 으로 표시하고 태스크를 취소한다.
+    스레드에서 실행 중인 반복문은 check_cancelled() 로 중단 요청을 확인한다.
+    """
+    token = CancelToken(_cancel_token.get())
+    token_var = _cancel_token.set(token)
+    try:
+        task = asyncio.ensure_future(coro)
+    finally:
+        _cancel_token.reset(token_var)
+
+    def expire() -> None:
+        token.cancel(JOB_TIMEOUT)
+        task.cancel()
+
+    timer = asyncio.get_running_loop().call_later(timeout, expire) if timeout else None
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if token.reason is None:
+            raise
+        message = f"Time budget of {timeout:g}s exceeded" if token.reason == JOB_TIMEOUT else None
+        raise TaskCancelled(token.reason, message) from None
+    except TaskCancelled as e:
+        if e.reason == JOB_TIMEOUT and token.reason == JOB_TIMEOUT:
+            e.args = (f"Time budget of {timeout:g}s exceeded",)
+        raise
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+@contextmanager
+def checkpoint_scope(initial: Optional[Dict[str, Any]], save: Callable[[Dict[str, Any]], None], interval: float = 0.0):
+    """블록 안의 핸들러가 load_checkpoint/save_checkpoint 로 진행 상태를 저장하고 이어받도록 설정"""
+    token = _checkpoint.set(CheckpointScope(initial, save, interval))
+    try:
+        yield
+    finally:
+        _checkpoint.reset(token)
+
+def load_checkpoint() -> Optional[Dict[str, Any]]:
+    """이전 실행이 중단되기 전에 남긴 체크포인트 (없으면 None)"""
+    scope = _checkpoint.get()
+    return scope.state if scope is not None else None
+
+def save_checkpoint(state: Dict[str, Any], force: bool = False) -> None:
+    """재시작 후 이어서 실행할 수 있도록 진행 상태(JSON 직렬화 가능)를 저장 (단계 밖에서는 무시)"""
+    scope = _checkpoint.get()
+    if scope is not None:
+        scope.save(state, force)
+
+@contextmanager
+def detached_progress():
+    """블록 안의 진행률 보고를 현재 작업에 반영하지 않음 (여러 대상을 동시에 실행할 때 사용)"""
+    token = _current_job.set(None)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+class ProgressStage:
+    """핸들러의 한 단계를 전체 진행률 구간 [start, end] 에 대응시켜 보고 (처리량 포함)"""
+
+    def __init__(self, name: str, start: float, end: float, total: Optional[int] = None, unit: str = "rules"):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.total = total
+        self.unit = unit
+        self.started = time.monotonic()
+
+    def update(self, done: int, message: Optional[str] = None, **metrics) -> None:
+        elapsed = time.monotonic() - self.started
+        fraction = min(1.0, done / self.total) if self.total else 0.0
+        report_progress(
+            self.start + (self.end - self.start) * fraction,
+            message or f"{self.name}: {done}" + (f"/{self.total}" if self.total else "") + f" {self.unit}",
+            stage=self.name,
+            done=done,
+            total=self.total,
+            unit=self.unit,
+            throughput=round(done / elapsed, 1) if elapsed > 0 else None,
+            elapsed=round(elapsed, 3),
+            **metrics
+        )
+
+def estimate_eta(state: Dict[str, Any], now: Optional[datetime] = None) -> Optional[float]:
+    """진행률과 경과 시간으로 남은 시간(초) 추정"""
+    started_at = state.get("started_at")
+    progress = state.get("progress") or 0.0
+    if state.get("status") != JOB_RUNNING or started_at is None or progress <= 0:
+        return None
+    elapsed = ((now or datetime.now()) - started_at).total_seconds()
+    return round(elapsed * (1 - progress) / progress, 1)
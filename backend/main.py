@@ -1,12 +1,16 @@
 from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import Column, String, DateTime, ForeignKey, create_engine, JSON, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, create_engine, JSON, Boolean, Float
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Set
 from datetime import datetime
 import json
+import asyncio
+import shutil
+import time
 from pathlib import Path
 import traceback
 from contextlib import contextmanager
@@ -18,7 +22,31 @@ from config import AppConfig
 
 # 프로젝트 관련 임포트
 from projects import project_templates
-from task_manager import TASK_TYPE_HANDLERS, get_task_type_info, TaskType, TaskManager
+from task_manager import TASK_TYPE_HANDLERS, get_task_type_info, get_task_timeout, TaskType, TaskManager, InputFormat
+from executor import shutdown_analysis_executor
+from policy_table import to_json_compatible, policy_json_default
+from policy_store import get_policy_store, expand_policy_refs, policy_ref, resolve_policies, iter_ref_policies
+from result_query import get_result_view, query_result
+from result_writer import read_result_meta
+from job_engine import (
+    JobEngine, set_job_engine, get_job_engine, estimate_eta, progress_scope, report_progress,
+    detached_progress, ProgressStage, TaskCancelled, run_with_budget, cancel_reason,
+    checkpoint_scope, current_job_id,
+    JOB_QUEUED, JOB_RUNNING, JOB_ERROR, FINISHED_STATUSES
+)
+from progress_events import get_progress_broker, format_sse
+from fleet import (
+    parse_targets_csv, normalize_targets, split_vendor_steps, VendorRateLimiter, run_fleet, iter_fleet_rows
+)
+from artifact_store import get_artifact_store, iter_artifact_ids
+from upload_store import get_upload_store, UploadTooLarge
+from firewall_session import get_session_pool
+from db_writer import get_db_writer
+from credentials import validate_secret_ref, resolve_secret
+from scheduler import (
+    Scheduler, CronExpression, next_run_time, overlap_action,
+    OVERLAP_COALESCE, OVERLAP_POLICIES, ACTION_RUN, ACTION_SKIP, ACTION_DEFER
+)
 
 # FastAPI 앱 설정
 app = FastAPI(title="Automated Task Launcher")
@@ -28,7 +56,11 @@ AppConfig.init_logging()
 
 # 데이터베이스 URL 설정
 DATABASE_URL = f"sqlite:///{AppConfig.DB_DIR}/firewall_policies.db"
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    json_serializer=lambda value: json.dumps(value, default=policy_json_default)
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -58,6 +90,68 @@ class Task(Base):
     is_restartable = Column(Boolean, default=True)
     project = relationship("Project", back_populates="tasks")
 
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String, primary_key=True)
+    project_id = Column(String, ForeignKey("projects.id", ondelete="CASCADE"), index=True)
+    task_id = Column(String, ForeignKey("tasks.id", ondelete="CASCADE"))
+    task_name = Column(String, nullable=False)
+    firewall = Column(String, nullable=True)
+    status = Column(String, default=JOB_QUEUED)
+    progress = Column(Float, default=0.0)
+    message = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+
+class Fleet(Base):
+    __tablename__ = "fleets"
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    template = Column(String, nullable=False)
+    status = Column(String, default="Waiting")
+    job_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    finished_at = Column(DateTime, nullable=True)
+    # 대상별 상태 (비밀번호는 저장하지 않음)
+    targets = Column(JSON, nullable=False)
+    # 통합 결과 (아티팩트 핸들과 집계)
+    result = Column(JSON, nullable=True)
+
+class FirewallTarget(Base):
+    """스케줄 실행에 사용하는 저장된 방화벽 대상"""
+    __tablename__ = "firewall_targets"
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=True)
+    type = Column(String, nullable=False)
+    ip = Column(String, nullable=False, unique=True)
+    username = Column(String, nullable=True)
+    # 비밀번호는 저장하지 않고 참조(env:NAME, keyring:SERVICE)만 저장하여 실행 시 읽음
+    password_ref = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+class Schedule(Base):
+    __tablename__ = "schedules"
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    template = Column(String, nullable=False)
+    cron = Column(String, nullable=False)
+    target_ids = Column(JSON, nullable=False)
+    text = Column(String, nullable=True)
+    engine = Column(String, nullable=True)
+    enabled = Column(Boolean, default=True)
+    overlap_policy = Column(String, default=OVERLAP_COALESCE)
+    jitter_seconds = Column(Float, default=0.0)
+    stagger_seconds = Column(Float, default=0.0)
+    next_run_at = Column(DateTime, nullable=True)
+    last_run_at = Column(DateTime, nullable=True)
+    last_fleet_id = Column(String, nullable=True)
+    # 이전 실행 중에 실행 시각이 되어 끝난 뒤 한 번 실행할 예정 (coalesce)
+    pending = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.now)
+
 # Pydantic 모델
 class TaskCreate(BaseModel):
     name: str
@@ -75,8 +169,43 @@ class UpdateTaskRequest(BaseModel):
     pw: Optional[str] = None
     type: Optional[str] = None
     text: Optional[str] = None
+    engine: Optional[str] = None
+    # 설정 파일 가져오기: POST /uploads 로 올린 파일 ID
+    upload_id: Optional[str] = None
+    auto_run: Optional[bool] = None
     previous_result: Optional[Dict[str, Any]] = None
 
+class FleetTarget(BaseModel):
+    type: str
+    ip: str
+    id: Optional[str] = None
+    pw: Optional[str] = None
+    # 저장된 대상(/targets) 의 비밀번호 참조
+    pw_ref: Optional[str] = None
+    name: Optional[str] = None
+    text: Optional[str] = None
+
+class FleetCreate(BaseModel):
+    name: str
+    template: str
+    targets: Optional[List[FleetTarget]] = None
+    # 업로드한 CSV 파일 내용 (헤더: name,type,ip,id,pw,text)
+    csv: Optional[str] = None
+    text: Optional[str] = None
+    engine: Optional[str] = None
+
+class ScheduleCreate(BaseModel):
+    name: str
+    template: str
+    cron: str
+    target_ids: List[str]
+    text: Optional[str] = None
+    engine: Optional[str] = None
+    enabled: bool = True
+    overlap_policy: str = OVERLAP_COALESCE
+    jitter_seconds: Optional[float] = None
+    stagger_seconds: Optional[float] = None
+
 # 데이터베이스 의존성
 @contextmanager
 def get_db():
@@ -137,29 +266,34 @@ async def get_projects():
             logging.error(f"Traceback: {traceback.format_exc()}")
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+def _add_project(db: Session, name: str, tasks: List[TaskCreate]) -> Tuple[Project, List[Task]]:
+    db_project = Project(
+        id=str(uuid4()),
+        name=name,
+        status="Waiting",
+        created_at=datetime.now()
+    )
+    db.add(db_project)
+
+    db_tasks = []
+    for task_data in tasks:
+        db_task = Task(
+            id=str(uuid4()),
+            name=task_data.name,
+            type=task_data.type,
+            project_id=db_project.id,
+            created_at=datetime.now(),
+            is_restartable=True
+        )
+        db.add(db_task)
+        db_tasks.append(db_task)
+    return db_project, db_tasks
+
 @app.post("/projects")
 def create_project(project: ProjectCreate):
     with get_db() as db:
         try:
-            db_project = Project(
-                id=str(uuid4()),
-                name=project.name,
-                status="Waiting",
-                created_at=datetime.now()
-            )
-            db.add(db_project)
-
-            for task_data in project.tasks:
-                db_task = Task(
-                    id=str(uuid4()),
-                    name=task_data.name,
-                    type=task_data.type,
-                    project_id=db_project.id,
-                    created_at=datetime.now(),
-                    is_restartable=True
-                )
-                db.add(db_task)
-
+            _add_project(db, project.name, project.tasks)
             db.commit()
             return {"message": "Project created successfully"}
         except Exception as e:
@@ -199,6 +333,10 @@ async def get_task_result(project_id: str, task_name: str):
         if result is None:
             # 캐시에 없는 경우 DB에서 조회
             result = task.intermediate_result or task.result_summary
+
+        if isinstance(result, dict) and result.get("data"):
+            # 스냅샷 참조는 정책 테이블에서 읽어 펼침
+            result = {**result, "data": expand_policy_refs(result["data"])}
         
         return {
             "task_name": task.name,
@@ -225,15 +363,397 @@ async def get_project_result(project_id: str):
             return {
                 "result": {
                     "type": last_task.result_summary.get("type", "text"),
-                    "data": last_task.result_summary.get("data", {}),
+                    "data": expand_policy_refs(last_task.result_summary.get("data", {})),
                     "message": last_task.result_summary.get("message", "")
                 }
             }
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+def _query_result_page(data: Any, query: Dict[str, Any]) -> Dict[str, Any]:
+    """결과 data 의 정책 목록에서 한 페이지를 조회 (스냅샷/아티팩트 참조는 ID 기준으로 캐시)"""
+    ref = policy_ref(data)
+    if ref is not None:
+        source_key = f"artifact:{ref['artifact']['id']}" if 'artifact' in ref else f"snapshot:{ref['snapshot_id']}"
+    else:
+        source_key = None
+    view = get_result_view(source_key, lambda: resolve_policies(data))
+    try:
+        return query_result(view, **query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _page_query(offset: int, limit: int, cursor: Optional[str], action: Optional[str], vsys: Optional[str],
+                shadow_type: Optional[str], risk_level: Optional[str], search: Optional[str], sort: Optional[str],
+                firewall: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "filters": {"action": action, "vsys": vsys, "shadow_type": shadow_type, "risk_level": risk_level, "firewall": firewall},
+        "search": search,
+        "sort": sort,
+        "offset": offset,
+        "limit": limit,
+        "cursor": cursor
+    }
+
+@app.get("/task-result/{project_id}/{task_name}/rows")
+async def query_task_result(project_id: str, task_name: str, offset: int = 0, limit: int = 100,
+                            cursor: Optional[str] = None, action: Optional[str] = None, vsys: Optional[str] = None,
+                            shadow_type: Optional[str] = None, risk_level: Optional[str] = None,
+                            search: Optional[str] = None, sort: Optional[str] = None):
+    """태스크 결과 정책을 서버에서 필터/검색/정렬하여 페이지 단위로 반환"""
+    with get_db() as db:
+        task = db.query(Task).filter(
+            Task.project_id == project_id,
+            Task.name == task_name
+        ).first()
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        result = task_results_cache.get(f"{project_id}_{task_name}")
+        if result is None:
+            result = task.intermediate_result or task.result_summary
+        data = (result or {}).get("data") or {}
+
+    query = _page_query(offset, limit, cursor, action, vsys, shadow_type, risk_level, search, sort)
+    page = await asyncio.to_thread(_query_result_page, data, query)
+    return {
+        "task_name": task_name,
+        **page
+    }
+
+@app.get("/project-result/{project_id}/rows")
+async def query_project_result(project_id: str, offset: int = 0, limit: int = 100,
+                               cursor: Optional[str] = None, action: Optional[str] = None, vsys: Optional[str] = None,
+                               shadow_type: Optional[str] = None, risk_level: Optional[str] = None,
+                               search: Optional[str] = None, sort: Optional[str] = None):
+    """프로젝트 최종 결과 정책을 서버에서 필터/검색/정렬하여 페이지 단위로 반환"""
+    with get_db() as db:
+        project = db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        last_task = db.query(Task).filter(
+            Task.project_id == project_id
+        ).order_by(Task.created_at.desc()).first()
+        data = (last_task.result_summary or {}).get("data") if last_task else None
+
+    query = _page_query(offset, limit, cursor, action, vsys, shadow_type, risk_level, search, sort)
+    page = await asyncio.to_thread(_query_result_page, data or {}, query)
+    return page
+
+def _firewall_key(db: Session, project_id: str, params: Dict[str, Any]) -> str:
+    """작업 동시 실행 제한에 사용할 방화벽 키 (연결 정보가 없으면 프로젝트 단위)"""
+    if params.get("ip"):
+        return params["ip"]
+    tasks = db.query(Task).filter(Task.project_id == project_id).order_by(Task.created_at).all()
+    for task in tasks:
+        data = (task.result_summary or {}).get("data")
+        if isinstance(data, dict) and (data.get("connection_info") or {}).get("ip"):
+            return data["connection_info"]["ip"]
+    return f"project:{project_id}"
+
+# 결과 파일로도 저장하는 최종 결과 태스크
+FINAL_TASK_NAMES = ["Process Policies", "Process Shadow Policies", "Process Impact Analysis"]
+
+def _result_summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "success": result.get("success", False),
+        "message": result.get("message", ""),
+        "data": result.get("data", {}),
+        "type": result.get("type", "text")
+    }
+
+def _plan_pipeline(db: Session, project_id: str, current_task: Task, task_config: Dict[str, Any],
+                   auto_run: bool) -> List[Dict[str, Any]]:
+    """현재 태스크와, 이어지는 입력 없는(InputFormat.NONE) 태스크들을 한 작업의 단계로 구성"""
+    steps = [{"id": current_task.id, "name": current_task.name, "type": current_task.type, "config": task_config}]
+    if not auto_run:
+        return steps
+
+    following_tasks = db.query(Task).filter(
+        Task.project_id == project_id,
+        Task.created_at > current_task.created_at
+    ).order_by(Task.created_at).all()
+    for task in following_tasks:
+        config = TASK_TYPE_HANDLERS.get(task.type)
+        if not config or config["input_format"] != InputFormat.NONE:
+            break
+        steps.append({"id": task.id, "name": task.name, "type": task.type, "config": config})
+    return steps
+
+# 재시작 후 이어서 실행할 때 저장하지 않는 요청 값 (비밀번호 등)
+RESUME_EXCLUDED_PARAMS = ("pw", "previous_result")
+
+def _mark_step_running(step: Dict[str, Any], params: Dict[str, Any], pipeline: List[str],
+                       checkpoint: Optional[Dict[str, Any]]) -> None:
+    """실행을 시작한 단계를 intermediate_result 에 표시 (서버가 중단되면 재시작 시 이 표시로 이어서 실행)"""
+    with get_db() as db:
+        task = db.query(Task).filter(Task.id == step["id"]).first()
+        if not task:
+            raise ValueError("Task was deleted while running")
+        task.intermediate_result = {
+            "running": True,
+            "message": f"Running {step['name']}",
+            "job_id": current_job_id(),
+            "params": {key: value for key, value in params.items() if key not in RESUME_EXCLUDED_PARAMS},
+            "pipeline": pipeline,
+            "checkpoint": checkpoint
+        }
+        db.commit()
+
+def _queue_step_checkpoint(task_id: str, state: Dict[str, Any]) -> None:
+    """핸들러가 save_checkpoint 로 넘긴 진행 상태를 기록 대기열에 추가 (이후 변경과 섞이지 않도록 지금 복사)"""
+    get_db_writer().call(_save_step_checkpoint, task_id, to_json_compatible(state), datetime.now().isoformat())
+
+def _save_step_checkpoint(task_id: str, checkpoint: Dict[str, Any], checkpoint_at: str) -> None:
+    """진행 상태를 실행 표시에 기록"""
+    with get_db() as db:
+        task = db.query(Task).filter(Task.id == task_id).first()
+        if not task or not (task.intermediate_result or {}).get("running"):
+            return
+        task.intermediate_result = {
+            **task.intermediate_result,
+            "checkpoint": checkpoint,
+            "checkpoint_at": checkpoint_at
+        }
+        db.commit()
+
+def _clear_step_marker(task_id: str) -> None:
+    with get_db() as db:
+        task = db.query(Task).filter(Task.id == task_id).first()
+        if task and (task.intermediate_result or {}).get("running"):
+            task.intermediate_result = None
+            db.commit()
+
+async def _checkpoint_step(step: Dict[str, Any], result: Dict[str, Any]) -> Optional[str]:
+    """단계 결과를 intermediate_result 에 기록 (최종 결과 태스크는 결과 파일도 저장)"""
+    result_file = None
+    if step["name"] in FINAL_TASK_NAMES and result.get("success", False):
+        summary = await TaskManager.save_task_result(step["id"], result)
+        result_file = summary.get("result_file")
+    await get_db_writer().run(_record_step_result, step["id"], _result_summary(result))
+    return result_file
+
+def _record_step_result(task_id: str, summary: Dict[str, Any]) -> None:
+    with get_db() as db:
+        task = db.query(Task).filter(Task.id == task_id).first()
+        if not task:
+            raise ValueError("Task was deleted while running")
+        task.intermediate_result = summary
+        db.commit()
+
+def _finalize_pipeline(project_id: str, finished: List[Tuple[Dict[str, Any], Dict[str, Any], Optional[str]]],
+                       stopped: Optional[Tuple[Dict[str, Any], TaskCancelled]] = None) -> Dict[str, Any]:
+    """실행된 단계들의 결과를 확정하고 프로젝트 상태를 갱신
+
+    stopped 는 취소/시간 초과로 중단된 단계로, 부분 결과는 intermediate_result 에 남긴다.
+    """
+    with get_db() as db:
+        try:
+            project = db.query(Project).filter(Project.id == project_id).first()
+            if not project:
+                raise ValueError("Project was deleted while running")
+
+            pipeline = []
+            for step, result, result_file in finished:
+                task = db.query(Task).filter(Task.id == step["id"]).first()
+                if not task:
+                    raise ValueError("Task was deleted while running")
+                task.result_summary = _result_summary(result)
+                task.intermediate_result = None
+                if result_file:
+                    task.result_path = result_file
+                task.status = "Completed" if result.get("success", False) else "Error"
+                pipeline.append({
+                    "name": task.name,
+                    "status": task.status,
+                    "result": to_json_compatible(task.result_summary)
+                })
+
+            if stopped is not None:
+                step, error = stopped
+                task = db.query(Task).filter(Task.id == step["id"]).first()
+                if task:
+                    task.status = error.reason
+                    task.intermediate_result = {
+                        "success": False,
+                        "message": str(error),
+                        "data": error.partial or {},
+                        "partial": error.partial is not None
+                    }
+                    pipeline.append({
+                        "name": task.name,
+                        "status": task.status,
+                        "result": to_json_compatible(task.intermediate_result)
+                    })
+            
+            # 프로젝트 상태 업데이트
+            all_tasks = db.query(Task).filter(Task.project_id == project.id).all()
+            if all(task.status == "Completed" for task in all_tasks):
+                project.status = "Completed"
+            elif any(task.status == "Error" for task in all_tasks):
+                project.status = "Error"
+            elif stopped is not None:
+                project.status = stopped[1].reason
+            else:
+                project.status = "In Progress"
+            
+            db.commit()
+
+            last_result = finished[-1][1] if stopped is None else {"success": False, "message": str(stopped[1])}
+            return {
+                "success": last_result.get("success", False),
+                "message": "Task updated successfully",
+                "error": None if last_result.get("success", False) else last_result.get("message"),
+                "task": pipeline[0],
+                "pipeline": [{"name": item["name"], "status": item["status"], "message": item["result"]["message"]} for item in pipeline],
+                "project": {
+                    "id": project.id,
+                    "status": project.status
+                }
+            }
+        except Exception:
+            db.rollback()
+            raise
+
+async def execute_pipeline(project_id: str, steps: List[Dict[str, Any]], params: Dict[str, Any],
+                           previous_result: Optional[Dict[str, Any]],
+                           resume_checkpoint: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """태스크 단계들을 차례로 실행
+
+    각 단계의 결과는 메모리에서 다음 단계로 바로 전달하고 intermediate_result 에
+    체크포인트로 기록한다. 실행이 끝나면(실패 포함) 완료된 단계의 결과를 확정한다.
+    resume_checkpoint 는 서버 재시작으로 중단된 첫 단계가 남긴 진행 상태이다.
+    """
+    finished = []
+    stopped = None
+    error = None
+    step = None
+    try:
+        for index, step in enumerate(steps):
+            initial = resume_checkpoint if index == 0 else None
+            # DB 기록은 기록 스레드에서 순서대로 실행 (이벤트 루프를 막지 않음)
+            await get_db_writer().run(_mark_step_running, step, params, [pending["id"] for pending in steps[index:]], initial)
+            with progress_scope(index / len(steps), (index + 1) / len(steps),
+                                step=step["name"], step_index=index, step_count=len(steps)), \
+                    checkpoint_scope(initial, lambda state, task_id=step["id"]: _queue_step_checkpoint(task_id, state),
+                                     AppConfig.CHECKPOINT_INTERVAL):
+                report_progress(0.0, f"Running {step['name']}")
+                try:
+                    # 핸들러는 이벤트 루프에서 실행하고 CPU 연산만 분석 실행기(워커 프로세스)로 보냄
+                    result = await run_with_budget(
+                        step["config"]["handler"]({**params, "task_name": step["name"]}, previous_result),
+                        get_task_timeout(step["config"])
+                    )
+                except TaskCancelled as e:
+                    stopped = (step, e)
+                    break
+            result_file = await _checkpoint_step(step, result)
+            finished.append((step, result, result_file))
+            if not result.get("success", False):
+                break
+            # 다음 단계에는 DB를 다시 조회하지 않고 메모리의 결과를 전달
+            previous_result = _result_summary(result)
+    except Exception as e:
+        error = e
+        if step is not None:
+            await get_db_writer().run(_clear_step_marker, step["id"])
+
+    if finished or stopped:
+        response = await get_db_writer().run(_finalize_pipeline, project_id, finished, stopped)
+    if error is not None:
+        raise error
+    if stopped is not None:
+        # 작업 상태도 Cancelled/Timeout 으로 기록되도록 응답을 실어 다시 발생
+        stopped[1].result = response
+        raise stopped[1]
+    return response
+
+# 진행률만 바뀐 경우 DB 기록 최소 간격(초)
+JOB_PROGRESS_PERSIST_INTERVAL = 1.0
+_job_progress_persisted: Dict[str, float] = {}
+
+def _on_job_update(job_id: str, fields: Dict[str, Any]) -> None:
+    """작업 상태 변경을 구독자에게 발행하고 jobs 테이블에 기록"""
+    state = get_job_engine().state(job_id) if get_job_engine() else None
+    if state and state.get("channel"):
+        status = state.get("status")
+        get_progress_broker().publish(state["channel"], {
+            "type": "job",
+            "job_id": job_id,
+            **state.get("info", {}),
+            "status": status,
+            "progress": round(state.get("progress") or 0.0, 4),
+            "message": state.get("message"),
+            "metrics": state.get("metrics") or {},
+            "eta_seconds": estimate_eta(state),
+            "error": state.get("error"),
+            "finished": status in FINISHED_STATUSES
+        })
+
+    if "status" not in fields:
+        # 진행률 갱신은 일정 간격으로만 기록
+        now = time.monotonic()
+        if now - _job_progress_persisted.get(job_id, 0.0) < JOB_PROGRESS_PERSIST_INTERVAL:
+            return
+        _job_progress_persisted[job_id] = now
+    elif fields["status"] in FINISHED_STATUSES:
+        _job_progress_persisted.pop(job_id, None)
+    get_db_writer().call(_persist_job_update, job_id, dict(fields))
+
+def _persist_job_update(job_id: str, fields: Dict[str, Any]) -> None:
+    """작업 엔진의 상태 변경을 jobs 테이블에 기록"""
+    with get_db() as db:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if job is None:
+            return
+        for name in ("status", "progress", "message", "started_at", "finished_at", "error"):
+            if name in fields:
+                setattr(job, name, fields[name])
+        if "result" in fields:
+            job.result = to_json_compatible(fields["result"])
+        db.commit()
+
+def _job_info(job: Job) -> Dict[str, Any]:
+    engine_state = (get_job_engine().state(job.id) if get_job_engine() else None) or {}
+    state = {
+        "status": job.status,
+        "progress": job.progress or 0.0,
+        "message": job.message,
+        "started_at": job.started_at,
+        **{key: value for key, value in engine_state.items() if key in ("status", "progress", "message", "started_at")}
+    }
+    queue_position = get_job_engine().queue_position(job.id) if get_job_engine() else None
+    return {
+        "id": job.id,
+        "project_id": job.project_id,
+        "task_name": job.task_name,
+        "firewall": job.firewall,
+        "status": state["status"],
+        "progress": round(state["progress"], 4),
+        "message": state["message"],
+        "eta_seconds": estimate_eta(state),
+        "queue_position": queue_position,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": state["started_at"].isoformat() if state["started_at"] else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error
+    }
+
+@app.post("/uploads")
+async def upload_config_file(request: Request, filename: Optional[str] = None):
+    """설정 파일 업로드 (요청 본문을 그대로 디스크에 스트리밍, multipart 아님)
+
+    반환한 upload_id 를 설정 파일 가져오기 태스크의 입력으로 사용한다.
+    """
+    try:
+        return await get_upload_store().save_stream(request.stream(), filename)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
 @app.post("/update-task")
 async def update_task(request: UpdateTaskRequest):
+    """태스크 실행을 백그라운드 작업으로 등록하고 작업 ID를 바로 반환"""
     with get_db() as db:
         try:
             project = db.query(Project).filter(Project.id == request.project_id).first()
@@ -249,72 +769,683 @@ async def update_task(request: UpdateTaskRequest):
                 raise HTTPException(status_code=404, detail="Task not found")
 
             task_config = TASK_TYPE_HANDLERS.get(current_task.type)
-            if task_config:
-                params = request.dict(exclude_unset=True)
-                
-                # 이전 태스크의 결과를 가져옴
-                previous_result = None
-                if task_config["requires_previous"]:
-                    previous_tasks = db.query(Task).filter(
-                        Task.project_id == project.id,
-                        Task.created_at < current_task.created_at
-                    ).order_by(Task.created_at.desc()).first()
-                    
-                    if previous_tasks:
-                        previous_result = previous_tasks.result_summary
-                
-                # 태스크 실행
-                result = await task_config["handler"](params, previous_result)
-                
-                # 최종 결과인 경우 파일로 저장
-                is_final_task = current_task.name in ["Process Policies", "Process Shadow Policies", "Process Impact Analysis"]
-                if is_final_task and result.get("success", False):
-                    summary = await TaskManager.save_task_result(current_task.id, result)
-                    current_task.result_path = summary.get("result_file")
-                    current_task.result_summary = {
-                        "success": result.get("success", False),
-                        "message": result.get("message", ""),
-                        "data": result.get("data", {}),
-                        "type": result.get("type", "text")
-                    }
-                else:
-                    current_task.result_summary = {
-                        "success": result.get("success", False),
-                        "message": result.get("message", ""),
-                        "data": result.get("data", {}),
-                        "type": result.get("type", "text")
-                    }
-                
-                current_task.status = "Completed" if result.get("success", False) else "Error"
-                
-                # 프로젝트 상태 업데이트
-                all_tasks = db.query(Task).filter(Task.project_id == project.id).all()
-                if all(task.status == "Completed" for task in all_tasks):
-                    project.status = "Completed"
-                elif any(task.status == "Error" for task in all_tasks):
-                    project.status = "Error"
-                else:
-                    project.status = "In Progress"
-                
-                db.commit()
-                
-                return {
-                    "message": "Task updated successfully",
-                    "task": {
-                        "name": current_task.name,
-                        "status": current_task.status,
-                        "result": current_task.result_summary
-                    },
-                    "project": {
-                        "id": project.id,
-                        "status": project.status
-                    }
-                }
+            if not task_config:
+                raise HTTPException(status_code=400, detail=f"Unsupported task type: {current_task.type}")
+
+            params = request.dict(exclude_unset=True)
             
+            # 이전 태스크의 결과를 가져옴
+            previous_result = None
+            if task_config["requires_previous"]:
+                previous_tasks = db.query(Task).filter(
+                    Task.project_id == project.id,
+                    Task.created_at < current_task.created_at
+                ).order_by(Task.created_at.desc()).first()
+                
+                if previous_tasks:
+                    previous_result = previous_tasks.result_summary
+
+            auto_run = request.auto_run if request.auto_run is not None else AppConfig.PIPELINE_AUTO_RUN
+            steps = _plan_pipeline(db, project.id, current_task, task_config, auto_run)
+
+            job = Job(
+                id=str(uuid4()),
+                project_id=project.id,
+                task_id=current_task.id,
+                task_name=current_task.name,
+                firewall=_firewall_key(db, project.id, params),
+                status=JOB_QUEUED
+            )
+            db.add(job)
+            db.commit()
+
+            project_id = project.id
+            job_info = _job_info(job)
+        except HTTPException:
+            raise
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+    await get_job_engine().submit(
+        job_info["id"],
+        job_info["firewall"],
+        lambda: execute_pipeline(project_id, steps, params, previous_result),
+        channel=project_id,
+        info={"project_id": project_id, "task_name": job_info["task_name"], "pipeline": [step["name"] for step in steps]}
+    )
+
+    return {
+        "message": "Task queued",
+        "job_id": job_info["id"],
+        "job": job_info,
+        "pipeline": [step["name"] for step in steps]
+    }
+
+# SSE 연결 유지용 주석 전송 간격(초)
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+def _event_stream_response(channel: str, request: Request) -> StreamingResponse:
+    broker = get_progress_broker()
+    queue = broker.subscribe(channel)
+
+    async def event_stream():
+        try:
+            # 진행 중인 작업의 현재 상태부터 전송
+            for event in broker.snapshot(channel):
+                yield format_sse(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            broker.unsubscribe(channel, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/projects/{project_id}/events")
+async def project_events(project_id: str, request: Request):
+    """프로젝트의 작업 진행 이벤트 스트림 (Server-Sent Events)"""
+    return _event_stream_response(project_id, request)
+
+@app.get("/jobs")
+async def list_jobs(project_id: Optional[str] = None, status: Optional[str] = None):
+    with get_db() as db:
+        query = db.query(Job)
+        if project_id:
+            query = query.filter(Job.project_id == project_id)
+        if status:
+            query = query.filter(Job.status == status)
+        return [_job_info(job) for job in query.order_by(Job.created_at.desc()).all()]
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태, 진행률, 예상 남은 시간 조회"""
+    with get_db() as db:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return _job_info(job)
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """완료된 작업의 결과 (update-task 의 기존 응답 형식)"""
+    with get_db() as db:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        # 완료 상태 기록이 아직 기록 대기열에 있을 수 있으므로 엔진의 상태를 우선
+        engine_state = (get_job_engine().state(job_id) if get_job_engine() else None) or {}
+        status = engine_state.get("status", job.status)
+        result = to_json_compatible(engine_state["result"]) if "result" in engine_state else job.result
+        if status not in FINISHED_STATUSES:
+            raise HTTPException(status_code=409, detail=f"Job is not finished (status: {status})")
+        if status == JOB_ERROR and not result:
+            raise HTTPException(status_code=500, detail=engine_state.get("error", job.error) or "Job failed")
+        return result
+
+def _fleet_info(fleet: Fleet) -> Dict[str, Any]:
+    return {
+        "id": fleet.id,
+        "name": fleet.name,
+        "template": fleet.template,
+        "status": fleet.status,
+        "job_id": fleet.job_id,
+        "created_at": fleet.created_at.isoformat() if fleet.created_at else None,
+        "finished_at": fleet.finished_at.isoformat() if fleet.finished_at else None,
+        "targets": fleet.targets,
+        "result": fleet.result
+    }
+
+def _update_fleet(fleet_id: str, fields: Dict[str, Any]) -> None:
+    with get_db() as db:
+        fleet = db.query(Fleet).filter(Fleet.id == fleet_id).first()
+        if fleet is None:
+            return
+        for name, value in fields.items():
+            setattr(fleet, name, value)
+        db.commit()
+
+def _update_fleet_target(fleet_id: str, index: int, fields: Dict[str, Any]) -> None:
+    with get_db() as db:
+        fleet = db.query(Fleet).filter(Fleet.id == fleet_id).first()
+        if fleet is None:
+            return
+        targets = list(fleet.targets)
+        targets[index] = {**targets[index], **fields}
+        fleet.targets = targets
+        db.commit()
+
+def _stop_fleet(fleet_id: str, status: str) -> None:
+    """중단된 일괄 실행과 아직 시작하지 않은 대상의 상태를 기록"""
+    with get_db() as db:
+        fleet = db.query(Fleet).filter(Fleet.id == fleet_id).first()
+        if fleet is not None:
+            fleet.status = status
+            fleet.finished_at = datetime.now()
+            fleet.targets = [
+                {**target, "status": status} if target.get("status") == "Waiting" else target
+                for target in fleet.targets
+            ]
+            db.commit()
+
+def _final_policy_data(db: Session, project_id: str) -> Optional[Dict[str, Any]]:
+    """프로젝트에서 정책 목록(또는 참조)을 가진 마지막 태스크 결과의 data"""
+    tasks = db.query(Task).filter(Task.project_id == project_id).order_by(Task.created_at.desc()).all()
+    for task in tasks:
+        data = (task.result_summary or {}).get("data")
+        if policy_ref(data) is not None or (isinstance(data, dict) and isinstance(data.get("policies"), list)):
+            return data
+    return None
+
+def _iter_data_policies(data: Dict[str, Any]):
+    ref = policy_ref(data)
+    return iter_ref_policies(ref) if ref else iter(data.get("policies") or [])
+
+async def _run_fleet_target(plan: Dict[str, Any], limiter: VendorRateLimiter) -> Dict[str, Any]:
+    """한 방화벽에 대해 템플릿의 태스크를 실행 (접속/가져오기 단계는 종류별 제한 안에서)"""
+    steps = plan["steps"]
+    split = split_vendor_steps(steps)
+    response = None
+    previous_result = None
+    # 대상별 단계 진행률은 전체 작업의 진행률(완료된 방화벽 수)에 섞지 않음
+    with detached_progress():
+        try:
+            if split:
+                async with limiter.slot(plan["target"]["type"]):
+                    response = await execute_pipeline(plan["project_id"], steps[:split], plan["params"], None)
+                if not response["success"]:
+                    return response
+                with get_db() as db:
+                    task = db.query(Task).filter(Task.id == steps[split - 1]["id"]).first()
+                    previous_result = task.result_summary if task else None
+            if split < len(steps):
+                response = await execute_pipeline(plan["project_id"], steps[split:], plan["params"], previous_result)
+        except TaskCancelled as e:
+            if cancel_reason() is not None:
+                # 일괄 실행 전체가 취소됨
+                raise
+            # 이 방화벽의 단계만 시간 초과
+            return {**(e.result or {}), "success": False, "status": e.reason, "error": str(e)}
+    return response
+
+def _consolidate_fleet(plans: List[Dict[str, Any]], outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """성공한 방화벽들의 최종 정책 결과를 하나의 아티팩트로 통합"""
+    sources = []
+    with get_db() as db:
+        for plan, outcome in zip(plans, outcomes):
+            if outcome.get("success"):
+                data = _final_policy_data(db, plan["project_id"])
+                if data is not None:
+                    sources.append((plan["target"], data))
+
+    handle = get_artifact_store().put(
+        iter_fleet_rows((target, _iter_data_policies(data)) for target, data in sources)
+    )
+    succeeded = sum(1 for outcome in outcomes if outcome.get("success"))
+    return {
+        "artifact": handle,
+        "total_policies": handle["rows"],
+        "total_targets": len(plans),
+        "succeeded": succeeded,
+        "failed": len(plans) - succeeded
+    }
+
+async def execute_fleet(fleet_id: str, plans: List[Dict[str, Any]], stagger: float = 0.0) -> Dict[str, Any]:
+    """여러 방화벽에 템플릿을 동시에 실행하고 결과를 통합"""
+    await get_db_writer().run(_update_fleet, fleet_id, {"status": "In Progress"})
+    limiter = VendorRateLimiter(AppConfig.FLEET_VENDOR_LIMITS, AppConfig.FLEET_VENDOR_INTERVALS)
+    stage = ProgressStage("targets", 0.0, 0.95, total=len(plans), unit="firewalls")
+    finished = {"done": 0, "failed": 0}
+
+    def on_done(index: int, plan: Dict[str, Any], outcome: Dict[str, Any]) -> None:
+        finished["done"] += 1
+        if not outcome.get("success"):
+            finished["failed"] += 1
+        get_db_writer().call(
+            _update_fleet_target, fleet_id, index, {
+                "status": outcome.get("status") or ("Completed" if outcome.get("success") else "Error"),
+                "message": outcome.get("error") or ((outcome.get("pipeline") or [{}])[-1].get("message") or outcome.get("message"))
+            }
+        )
+        stage.update(finished["done"], f"{finished['done']}/{len(plans)} firewalls finished", failed=finished["failed"])
+
+    try:
+        outcomes = await run_fleet(
+            plans, lambda plan: _run_fleet_target(plan, limiter), AppConfig.FLEET_CONCURRENCY, on_done, stagger
+        )
+        report_progress(0.95, "Consolidating results")
+        summary = await asyncio.to_thread(_consolidate_fleet, plans, outcomes)
+    except (Exception, asyncio.CancelledError):
+        # 취소되어도 대기 중인 대상의 상태 기록은 마치도록 기다림
+        await asyncio.shield(get_db_writer().run(_stop_fleet, fleet_id, cancel_reason() or "Error"))
+        raise
+
+    success = summary["succeeded"] > 0
+    await get_db_writer().run(_update_fleet, fleet_id, {
+        "status": "Completed" if summary["failed"] == 0 else "Error",
+        "finished_at": datetime.now(),
+        "result": summary
+    })
+    return {
+        "success": success,
+        "message": f"{summary['succeeded']}/{summary['total_targets']} firewalls completed ({summary['total_policies']} policies)",
+        "error": None if success else "All firewalls failed",
+        "data": summary
+    }
+
+def _find_template(name: str) -> Optional[Dict[str, Any]]:
+    return next((item for item in project_templates if item["name"] == name), None)
+
+def _validate_fleet_template(template: Dict[str, Any], targets: List[Dict[str, Any]], text: Optional[str]) -> None:
+    """템플릿의 태스크를 입력 없이 실행할 수 있는지 확인"""
+    for task in template["tasks"]:
+        config = TASK_TYPE_HANDLERS.get(task["type"])
+        if not config:
+            raise ValueError(f"Unsupported task type: {task['type']}")
+        if config["input_format"] == InputFormat.CONFIG_FILE:
+            raise ValueError(f"Task '{task['name']}' requires an uploaded configuration file")
+        if config["input_format"] == InputFormat.TARGET_RULES and not text:
+            missing = [target["ip"] for target in targets if not target.get("text")]
+            if missing:
+                raise ValueError(f"Target rules are required for: {', '.join(missing)}")
+
+def _prepare_fleet(db: Session, name: str, template: Dict[str, Any], targets: List[Dict[str, Any]],
+                   text: Optional[str], engine: Optional[str]) -> Tuple[Fleet, Job, List[Dict[str, Any]]]:
+    """대상마다 프로젝트를 만들고 일괄 실행 레코드와 작업, 실행 계획을 구성 (commit 은 호출자가 수행)"""
+    fleet = Fleet(id=str(uuid4()), name=name, template=template["name"], status="Waiting", targets=[])
+    plans = []
+    target_states = []
+    for target in targets:
+        project, tasks = _add_project(
+            db,
+            f"{name} - {target.get('name') or target['ip']}",
+            [TaskCreate(name=task["name"], type=task["type"]) for task in template["tasks"]]
+        )
+        params = {
+            "project_id": project.id,
+            "type": target["type"],
+            "ip": target["ip"],
+            "id": target.get("id"),
+            "pw": target.get("pw"),
+            "text": target.get("text") or text,
+            "engine": engine
+        }
+        plans.append({
+            "target": target,
+            "project_id": project.id,
+            "params": {key: value for key, value in params.items() if value is not None},
+            "steps": [
+                {"id": task.id, "name": task.name, "type": task.type, "config": TASK_TYPE_HANDLERS[task.type]}
+                for task in tasks
+            ]
+        })
+        target_states.append({
+            **{key: value for key, value in target.items() if key not in ("pw", "text")},
+            "project_id": project.id,
+            "status": "Waiting",
+            "message": None
+        })
+    fleet.targets = target_states
+
+    job = Job(
+        id=str(uuid4()),
+        task_name=f"Fleet: {name}",
+        firewall=f"fleet:{fleet.id}",
+        status=JOB_QUEUED
+    )
+    fleet.job_id = job.id
+    db.add(fleet)
+    db.add(job)
+    return fleet, job, plans
+
+async def _submit_fleet(fleet_id: str, job_info: Dict[str, Any], plans: List[Dict[str, Any]], stagger: float = 0.0) -> None:
+    await get_job_engine().submit(
+        job_info["id"],
+        job_info["firewall"],
+        lambda: execute_fleet(fleet_id, plans, stagger),
+        channel=f"fleet:{fleet_id}",
+        info={"fleet_id": fleet_id, "task_name": job_info["task_name"]}
+    )
+
+@app.post("/fleets")
+async def create_fleet(request: FleetCreate):
+    """템플릿을 여러 방화벽에 일괄 실행 (대상마다 프로젝트를 만들고 하나의 작업으로 실행)"""
+    template = _find_template(request.template)
+    if template is None:
+        raise HTTPException(status_code=404, detail=f"Template not found: {request.template}")
+
+    try:
+        targets = [target.dict(exclude_none=True) for target in request.targets or []]
+        if request.csv:
+            targets.extend(parse_targets_csv(request.csv))
+        targets = normalize_targets(targets)
+        _validate_fleet_template(template, targets, request.text)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with get_db() as db:
+        try:
+            fleet, job, plans = _prepare_fleet(db, request.name, template, targets, request.text, request.engine)
+            db.commit()
+            fleet_id = fleet.id
+            job_info = _job_info(job)
+            fleet_info = _fleet_info(fleet)
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
 
+    await _submit_fleet(fleet_id, job_info, plans)
+
+    return {
+        "message": "Fleet queued",
+        "job_id": job_info["id"],
+        "fleet": fleet_info
+    }
+
+@app.get("/fleets")
+async def list_fleets():
+    with get_db() as db:
+        fleets = db.query(Fleet).order_by(Fleet.created_at.desc()).all()
+        return [
+            {key: value for key, value in _fleet_info(fleet).items() if key != "targets"}
+            for fleet in fleets
+        ]
+
+@app.get("/fleets/{fleet_id}")
+async def get_fleet(fleet_id: str):
+    """일괄 실행 상태 (대상별 상태 포함)"""
+    with get_db() as db:
+        fleet = db.query(Fleet).filter(Fleet.id == fleet_id).first()
+        if not fleet:
+            raise HTTPException(status_code=404, detail="Fleet not found")
+        return _fleet_info(fleet)
+
+@app.get("/fleets/{fleet_id}/rows")
+async def query_fleet_result(fleet_id: str, offset: int = 0, limit: int = 100,
+                             cursor: Optional[str] = None, action: Optional[str] = None, vsys: Optional[str] = None,
+                             shadow_type: Optional[str] = None, risk_level: Optional[str] = None,
+                             firewall: Optional[str] = None, search: Optional[str] = None, sort: Optional[str] = None):
+    """일괄 실행의 통합 결과를 서버에서 필터/검색/정렬하여 페이지 단위로 반환"""
+    with get_db() as db:
+        fleet = db.query(Fleet).filter(Fleet.id == fleet_id).first()
+        if not fleet:
+            raise HTTPException(status_code=404, detail="Fleet not found")
+        if not fleet.result:
+            raise HTTPException(status_code=409, detail=f"Fleet has no result yet (status: {fleet.status})")
+        data = fleet.result
+
+    query = _page_query(offset, limit, cursor, action, vsys, shadow_type, risk_level, search, sort, firewall)
+    page = await asyncio.to_thread(_query_result_page, data, query)
+    return page
+
+@app.get("/fleets/{fleet_id}/events")
+async def fleet_events(fleet_id: str, request: Request):
+    """일괄 실행의 진행 이벤트 스트림 (Server-Sent Events)"""
+    return _event_stream_response(f"fleet:{fleet_id}", request)
+
+def _target_info(target: FirewallTarget) -> Dict[str, Any]:
+    return {
+        "id": target.id,
+        "name": target.name,
+        "type": target.type,
+        "ip": target.ip,
+        "username": target.username,
+        "pw_ref": target.password_ref,
+        "created_at": target.created_at.isoformat() if target.created_at else None
+    }
+
+@app.post("/targets")
+async def create_target(request: FleetTarget):
+    """스케줄 실행에 사용할 방화벽 대상 저장 (비밀번호 대신 pw_ref 참조를 저장)"""
+    if request.pw:
+        raise HTTPException(
+            status_code=400,
+            detail="Passwords are not stored: set pw_ref to env:<VARIABLE> or keyring:<SERVICE> instead"
+        )
+    try:
+        target = normalize_targets([request.dict(exclude_none=True)])[0]
+        password_ref = validate_secret_ref(request.pw_ref) if request.pw_ref else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with get_db() as db:
+        if db.query(FirewallTarget).filter(FirewallTarget.ip == target["ip"]).first():
+            raise HTTPException(status_code=409, detail=f"Target already exists: {target['ip']}")
+        db_target = FirewallTarget(
+            id=str(uuid4()),
+            name=target.get("name"),
+            type=target["type"],
+            ip=target["ip"],
+            username=target.get("id"),
+            password_ref=password_ref
+        )
+        db.add(db_target)
+        db.commit()
+        return _target_info(db_target)
+
+@app.get("/targets")
+async def list_targets():
+    with get_db() as db:
+        return [_target_info(target) for target in db.query(FirewallTarget).order_by(FirewallTarget.created_at).all()]
+
+@app.delete("/targets/{target_id}")
+async def delete_target(target_id: str):
+    with get_db() as db:
+        target = db.query(FirewallTarget).filter(FirewallTarget.id == target_id).first()
+        if not target:
+            raise HTTPException(status_code=404, detail="Target not found")
+        used_by = [schedule.name for schedule in db.query(Schedule).all() if target_id in (schedule.target_ids or [])]
+        if used_by:
+            raise HTTPException(status_code=409, detail=f"Target is used by schedules: {', '.join(used_by)}")
+        db.delete(target)
+        db.commit()
+        return {"message": "Target deleted successfully"}
+
+def _schedule_info(schedule: Schedule) -> Dict[str, Any]:
+    return {
+        "id": schedule.id,
+        "name": schedule.name,
+        "template": schedule.template,
+        "cron": schedule.cron,
+        "target_ids": schedule.target_ids,
+        "enabled": schedule.enabled,
+        "overlap_policy": schedule.overlap_policy,
+        "jitter_seconds": schedule.jitter_seconds,
+        "stagger_seconds": schedule.stagger_seconds,
+        "next_run_at": schedule.next_run_at.isoformat() if schedule.next_run_at else None,
+        "last_run_at": schedule.last_run_at.isoformat() if schedule.last_run_at else None,
+        "last_fleet_id": schedule.last_fleet_id,
+        "pending": schedule.pending
+    }
+
+def _schedule_running(db: Session, schedule: Schedule) -> bool:
+    """스케줄의 마지막 일괄 실행이 아직 진행 중인지"""
+    if not schedule.last_fleet_id:
+        return False
+    fleet = db.query(Fleet).filter(Fleet.id == schedule.last_fleet_id).first()
+    return fleet is not None and fleet.status in ("Waiting", "In Progress")
+
+def _prepare_schedule_run(db: Session, schedule: Schedule, now: datetime) -> Tuple[str, Dict[str, Any], List[Dict[str, Any]], float]:
+    """스케줄의 저장된 대상으로 일괄 실행을 구성 (commit 은 호출자가 수행)"""
+    template = _find_template(schedule.template)
+    if template is None:
+        raise ValueError(f"Template not found: {schedule.template}")
+    saved = {
+        target.id: target
+        for target in db.query(FirewallTarget).filter(FirewallTarget.id.in_(schedule.target_ids or [])).all()
+    }
+    # 비밀번호 참조는 실행할 때 읽음 (값이 없으면 ValueError 로 이번 실행을 건너뜀)
+    targets = normalize_targets([
+        {
+            "name": target.name, "type": target.type, "ip": target.ip, "id": target.username,
+            "pw": resolve_secret(target.password_ref, target.username) if target.password_ref else None
+        }
+        for target in (saved[target_id] for target_id in schedule.target_ids if target_id in saved)
+    ])
+    _validate_fleet_template(template, targets, schedule.text)
+
+    fleet, job, plans = _prepare_fleet(
+        db, f"{schedule.name} {now:%Y-%m-%d %H:%M}", template, targets, schedule.text, schedule.engine
+    )
+    db.flush()
+    schedule.last_run_at = now
+    schedule.last_fleet_id = fleet.id
+    schedule.pending = False
+    return fleet.id, _job_info(job), plans, schedule.stagger_seconds or 0.0
+
+def _plan_due_schedules(now: datetime) -> List[Tuple[str, Dict[str, Any], List[Dict[str, Any]], float]]:
+    """실행 시각이 된 스케줄의 다음 실행 시각을 갱신하고 실행할 일괄 실행을 구성"""
+    launches = []
+    with get_db() as db:
+        try:
+            for schedule in db.query(Schedule).filter(Schedule.enabled == True).all():
+                due = schedule.next_run_at is not None and schedule.next_run_at <= now
+                action = overlap_action(due, schedule.pending, _schedule_running(db, schedule), schedule.overlap_policy)
+                if due:
+                    schedule.next_run_at = next_run_time(schedule.cron, now, schedule.jitter_seconds or 0.0)
+
+                if action == ACTION_SKIP:
+                    logging.info(f"Skipped schedule '{schedule.name}': previous run is still in progress")
+                elif action == ACTION_DEFER:
+                    logging.info(f"Deferred schedule '{schedule.name}' until the previous run finishes")
+                    schedule.pending = True
+                elif action == ACTION_RUN:
+                    try:
+                        launches.append(_prepare_schedule_run(db, schedule, now))
+                    except ValueError as e:
+                        logging.error(f"Failed to start schedule '{schedule.name}': {str(e)}")
+                        schedule.pending = False
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return launches
+
+async def _run_due_schedules(now: datetime) -> None:
+    """실행 시각이 된 스케줄을 일괄 실행으로 등록 (이전 실행이 진행 중이면 건너뛰거나 합침)"""
+    launches = await get_db_writer().run(_plan_due_schedules, now)
+    for fleet_id, job_info, plans, stagger in launches:
+        await _submit_fleet(fleet_id, job_info, plans, stagger)
+
+@app.post("/schedules")
+async def create_schedule(request: ScheduleCreate):
+    """템플릿을 저장된 대상들에 cron 식에 따라 반복 실행하는 스케줄 등록"""
+    if _find_template(request.template) is None:
+        raise HTTPException(status_code=404, detail=f"Template not found: {request.template}")
+    if request.overlap_policy not in OVERLAP_POLICIES:
+        raise HTTPException(status_code=400, detail=f"overlap_policy must be one of: {', '.join(OVERLAP_POLICIES)}")
+    if not request.target_ids:
+        raise HTTPException(status_code=400, detail="At least one target is required")
+    try:
+        CronExpression(request.cron)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    jitter = AppConfig.SCHEDULE_JITTER_SECONDS if request.jitter_seconds is None else max(0.0, request.jitter_seconds)
+    stagger = AppConfig.SCHEDULE_TARGET_STAGGER if request.stagger_seconds is None else max(0.0, request.stagger_seconds)
+
+    with get_db() as db:
+        found = {target.id for target in db.query(FirewallTarget).filter(FirewallTarget.id.in_(request.target_ids)).all()}
+        missing = [target_id for target_id in request.target_ids if target_id not in found]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Unknown targets: {', '.join(missing)}")
+
+        schedule = Schedule(
+            id=str(uuid4()),
+            name=request.name,
+            template=request.template,
+            cron=request.cron,
+            target_ids=list(request.target_ids),
+            text=request.text,
+            engine=request.engine,
+            enabled=request.enabled,
+            overlap_policy=request.overlap_policy,
+            jitter_seconds=jitter,
+            stagger_seconds=stagger,
+            next_run_at=next_run_time(request.cron, datetime.now(), jitter),
+            pending=False
+        )
+        db.add(schedule)
+        db.commit()
+        return _schedule_info(schedule)
+
+@app.get("/schedules")
+async def list_schedules():
+    with get_db() as db:
+        return [_schedule_info(schedule) for schedule in db.query(Schedule).order_by(Schedule.created_at).all()]
+
+@app.get("/schedules/{schedule_id}")
+async def get_schedule(schedule_id: str):
+    with get_db() as db:
+        schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+        if not schedule:
+            raise HTTPException(status_code=404, detail="Schedule not found")
+        return _schedule_info(schedule)
+
+@app.post("/schedules/{schedule_id}/run")
+async def run_schedule(schedule_id: str):
+    """스케줄을 즉시 실행 (이전 실행이 진행 중이면 409)"""
+    with get_db() as db:
+        schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+        if not schedule:
+            raise HTTPException(status_code=404, detail="Schedule not found")
+        if _schedule_running(db, schedule):
+            raise HTTPException(status_code=409, detail="Previous run is still in progress")
+        try:
+            fleet_id, job_info, plans, stagger = _prepare_schedule_run(db, schedule, datetime.now())
+            db.commit()
+        except ValueError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+
+    await _submit_fleet(fleet_id, job_info, plans, stagger)
+    return {
+        "message": "Schedule run queued",
+        "job_id": job_info["id"],
+        "fleet_id": fleet_id
+    }
+
+@app.delete("/schedules/{schedule_id}")
+async def delete_schedule(schedule_id: str):
+    with get_db() as db:
+        schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+        if not schedule:
+            raise HTTPException(status_code=404, detail="Schedule not found")
+        db.delete(schedule)
+        db.commit()
+        return {"message": "Schedule deleted successfully"}
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """작업 취소 (실행 중이면 진행 중인 태스크가 다음 확인 지점에서 중단되고 부분 결과를 남김)"""
+    with get_db() as db:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job.status in FINISHED_STATUSES:
+            raise HTTPException(status_code=409, detail=f"Job is already finished (status: {job.status})")
+
+    if get_job_engine() is None or not get_job_engine().cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not running")
+    return {"message": "Cancellation requested", "job_id": job_id}
+
+@app.post("/fleets/{fleet_id}/cancel")
+async def cancel_fleet(fleet_id: str):
+    with get_db() as db:
+        fleet = db.query(Fleet).filter(Fleet.id == fleet_id).first()
+        if not fleet:
+            raise HTTPException(status_code=404, detail="Fleet not found")
+        job_id = fleet.job_id
+    return await cancel_job(job_id)
+
 @app.post("/restart-task/{project_id}/{task_name}")
 async def restart_task(project_id: str, task_name: str):
     with get_db() as db:
@@ -373,8 +1504,12 @@ async def delete_project(project_id: str):
                 cache_key = f"{project_id}_{task.name}"
                 task_results_cache.pop(cache_key, None)
             
+            task_ids = [task.id for task in project.tasks]
+            db.query(Job).filter(Job.project_id == project_id).delete()
             db.delete(project)
             db.commit()
+            get_policy_store().delete_project_snapshots(project_id)
+            await asyncio.to_thread(_delete_project_files, project_id, task_ids)
             
             return {"message": "Project deleted successfully"}
             
@@ -382,6 +1517,141 @@ async def delete_project(project_id: str):
             db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
 
+def _delete_project_files(project_id: str, task_ids: List[str]) -> None:
+    """삭제한 프로젝트의 태스크 결과 디렉토리와, 더 이상 참조되지 않는 아티팩트 정리"""
+    for task_id in task_ids:
+        shutil.rmtree(AppConfig.RESULT_DIR / task_id, ignore_errors=True)
+    (AppConfig.RESULT_DIR / f"project_{project_id}.json").unlink(missing_ok=True)
+    _sweep_artifacts()
+
+def _referenced_artifacts() -> Set[str]:
+    """태스크/작업/일괄 실행 결과가 가리키는 아티팩트 ID"""
+    referenced = set(iter_artifact_ids(list(task_results_cache.values())))
+    with get_db() as db:
+        for query in (db.query(Task.result_summary, Task.intermediate_result), db.query(Job.result), db.query(Fleet.result)):
+            for row in query:
+                referenced.update(iter_artifact_ids(list(row)))
+    return referenced
+
+def _sweep_artifacts() -> int:
+    return get_artifact_store().sweep(_referenced_artifacts(), AppConfig.ARTIFACT_SWEEP_GRACE)
+
+_scheduler: Optional[Scheduler] = None
+_session_keeper: Optional[Scheduler] = None
+_artifact_sweeper: Optional[Scheduler] = None
+
+INTERRUPTED_MESSAGE = "Interrupted by server restart"
+
+def _needs_firewall_session(step: Dict[str, Any], params: Dict[str, Any]) -> bool:
+    """방화벽 로그인 세션으로 정책을 조회하는 단계인지 (업로드한 설정 파일은 세션 불필요)"""
+    return step["type"] == TaskType.CONFIG_IMPORT and not params.get("upload_id")
+
+def _plan_resume(db: Session, task: Task) -> Optional[Dict[str, Any]]:
+    """중단된 태스크를 이어서 실행할 계획 (이어서 실행할 수 없으면 None)"""
+    marker = task.intermediate_result
+    config = TASK_TYPE_HANDLERS.get(task.type)
+    job = db.query(Job).filter(Job.id == marker.get("job_id")).first() if marker.get("job_id") else None
+    # 비밀번호는 저장하지 않으므로 접속 단계는 다시 실행할 수 없고, fleet 작업은 fleet 단위로 다시 실행해야 함
+    if (not AppConfig.RESUME_INTERRUPTED_TASKS or not task.is_restartable or config is None
+            or config["input_format"] == InputFormat.IP_ID_PW or job is None or job.task_id is None):
+        return None
+
+    project_tasks = db.query(Task).filter(Task.project_id == task.project_id).order_by(Task.created_at).all()
+    earlier = [other for other in project_tasks if other.created_at < task.created_at]
+    # 같은 작업에서 먼저 끝났지만 아직 확정되지 않은 단계
+    promote = []
+    for other in earlier:
+        summary = other.intermediate_result
+        if other.status == "Waiting" and isinstance(summary, dict) and "success" in summary \
+                and not summary.get("running") and not summary.get("partial"):
+            meta = read_result_meta(AppConfig.RESULT_DIR / other.id) if other.name in FINAL_TASK_NAMES else None
+            result_file = str(AppConfig.RESULT_DIR / other.id / meta["rows_file"]) if meta else None
+            promote.append(({"id": other.id, "name": other.name}, summary, result_file))
+
+    tasks_by_id = {other.id: other for other in project_tasks}
+    steps = [
+        {"id": step_task.id, "name": step_task.name, "type": step_task.type, "config": TASK_TYPE_HANDLERS[step_task.type]}
+        for step_task in (tasks_by_id.get(task_id) for task_id in marker.get("pipeline") or [task.id])
+        if step_task is not None and step_task.type in TASK_TYPE_HANDLERS
+    ]
+    # 재시작 후에는 세션 풀이 비어 있고 비밀번호도 없으므로, 방화벽 정책 조회는 스냅샷 저장을 마친 경우에만 이어서 실행
+    params = marker.get("params") or {}
+    checkpoint = marker.get("checkpoint") or {}
+    if any(_needs_firewall_session(step, params) and not (index == 0 and checkpoint.get("snapshot_id"))
+           for index, step in enumerate(steps)):
+        return None
+    return {
+        "project_id": task.project_id,
+        "task_id": task.id,
+        "task_name": task.name,
+        "firewall": job.firewall,
+        "previous": earlier[-1].id if earlier and config["requires_previous"] else None,
+        "promote": promote,
+        "steps": steps,
+        "params": params,
+        "checkpoint": marker.get("checkpoint")
+    }
+
+async def _resume_interrupted_tasks() -> None:
+    """서버 재시작으로 중단된 태스크를 마지막 체크포인트부터 이어서 실행"""
+    plans = []
+    with get_db() as db:
+        tasks = db.query(Task).filter(Task.intermediate_result.isnot(None)).all()
+        for task in tasks:
+            if not (isinstance(task.intermediate_result, dict) and task.intermediate_result.get("running")):
+                continue
+            plan = _plan_resume(db, task)
+            if plan is None:
+                task.status = "Error"
+                task.intermediate_result = None
+                task.result_summary = {"success": False, "message": INTERRUPTED_MESSAGE, "data": {}, "type": "text"}
+                continue
+            plans.append(plan)
+        db.commit()
+
+    for plan in plans:
+        if plan["promote"]:
+            _finalize_pipeline(plan["project_id"], plan["promote"])
+
+        with get_db() as db:
+            previous_task = db.query(Task).filter(Task.id == plan["previous"]).first() if plan["previous"] else None
+            previous_result = previous_task.result_summary if previous_task else None
+            job = Job(
+                id=str(uuid4()),
+                project_id=plan["project_id"],
+                task_id=plan["task_id"],
+                task_name=plan["task_name"],
+                firewall=plan["firewall"],
+                status=JOB_QUEUED,
+                message="Resumed after server restart"
+            )
+            db.add(job)
+            db.commit()
+            job_id = job.id
+
+        logging.info(f"Resuming task {plan['task_name']} of project {plan['project_id']} as job {job_id}")
+        await get_job_engine().submit(
+            job_id,
+            plan["firewall"],
+            lambda plan=plan, previous_result=previous_result: execute_pipeline(
+                plan["project_id"], plan["steps"], plan["params"], previous_result, plan["checkpoint"]
+            ),
+            channel=plan["project_id"],
+            info={"project_id": plan["project_id"], "task_name": plan["task_name"],
+                  "pipeline": [step["name"] for step in plan["steps"]]}
+        )
+
+def _migrate_firewall_targets() -> None:
+    """이전 버전의 firewall_targets 테이블 정리 (평문 password 컬럼 삭제, password_ref 컬럼 추가)"""
+    with engine.begin() as connection:
+        columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(firewall_targets)")}
+        if "password_ref" not in columns:
+            connection.exec_driver_sql("ALTER TABLE firewall_targets ADD COLUMN password_ref VARCHAR")
+        if "password" in columns:
+            connection.exec_driver_sql("UPDATE firewall_targets SET password = NULL")
+            connection.exec_driver_sql("ALTER TABLE firewall_targets DROP COLUMN password")
+            logging.warning("Removed stored firewall target passwords: set pw_ref on saved targets used by schedules")
+
 # FastAPI 앱 초기화 시 디렉토리 생성
 @app.on_event("startup")
 async def startup_event():
@@ -393,6 +1663,43 @@ async def startup_event():
         AppConfig.init_logging()
         
         AppConfig.init_db()
+        Base.metadata.create_all(bind=engine)
+        _migrate_firewall_targets()
+        get_policy_store().init_schema()
+        get_upload_store().cleanup()
+
+        # 이전 실행에서 끝나지 않은 작업은 오류로 표시
+        with get_db() as db:
+            db.query(Job).filter(Job.status.in_([JOB_QUEUED, JOB_RUNNING])).update(
+                {"status": JOB_ERROR, "error": INTERRUPTED_MESSAGE, "finished_at": datetime.now()},
+                synchronize_session=False
+            )
+            db.query(Fleet).filter(Fleet.status.in_(["Waiting", "In Progress"])).update(
+                {"status": "Error", "finished_at": datetime.now()},
+                synchronize_session=False
+            )
+            db.commit()
+
+        # 작업 상태/체크포인트 기록은 이벤트 루프 밖에서 순서대로 실행
+        await get_db_writer().start()
+        job_engine = JobEngine(AppConfig.JOB_WORKERS, AppConfig.JOB_PER_FIREWALL_LIMIT, _on_job_update)
+        set_job_engine(job_engine)
+        await job_engine.start()
+        await _resume_interrupted_tasks()
+
+        # 서버가 꺼져 있는 동안 지난 실행 시각은 첫 확인 때 한 번만 실행
+        global _scheduler, _session_keeper, _artifact_sweeper
+        if AppConfig.SCHEDULER_ENABLED:
+            _scheduler = Scheduler(AppConfig.SCHEDULER_INTERVAL, _run_due_schedules)
+            await _scheduler.start()
+
+        # 방화벽 로그인 세션 유지 확인과 유휴 세션 정리
+        _session_keeper = Scheduler(AppConfig.FIREWALL_SESSION_KEEPALIVE, lambda now: get_session_pool().maintain())
+        await _session_keeper.start()
+
+        # 어떤 결과도 가리키지 않는 아티팩트 정리 (시작할 때 한 번, 이후 일정 간격)
+        _artifact_sweeper = Scheduler(AppConfig.ARTIFACT_SWEEP_INTERVAL, lambda now: asyncio.to_thread(_sweep_artifacts))
+        await _artifact_sweeper.start()
         
     except Exception as e:
         logging.error(f"Application startup failed: {str(e)}")
@@ -414,4 +1721,21 @@ async def save_result(project_id: str, result_data: dict):
 @app.on_event("shutdown")
 async def shutdown_event():
     # 캐시 정리 등 필요한 정리 작업 수행
-    task_results_cache.clear()
\ No newline at end of file
+    task_results_cache.clear()
+    global _scheduler, _session_keeper, _artifact_sweeper
+    if _scheduler is not None:
+        await _scheduler.stop()
+        _scheduler = None
+    if _session_keeper is not None:
+        await _session_keeper.stop()
+        _session_keeper = None
+    if _artifact_sweeper is not None:
+        await _artifact_sweeper.stop()
+        _artifact_sweeper = None
+    if get_job_engine() is not None:
+        await get_job_engine().stop()
+        set_job_engine(None)
+    # 작업 엔진이 마지막으로 남긴 상태까지 기록한 뒤 종료
+    await get_db_writer().stop()
+    await get_session_pool().close()
+    shutdown_analysis_executor()
\ No newline at end of file
@@ -0,0 +1,165 @@
+# MF2 CLI("show policy") 출력 파서
+#
+# MF2 는 SSH CLI 로만 정책을 조회할 수 있으며 정책마다 다음과 같은 텍스트 블록을 출력한다.
+#   [Rule 12]
+#     name        : Rule_00012_DENY_LOW_RISK
+#     vsys        : vsys3
+#     action      : deny
+#     source      : 10.11.0.0/24 10.11.0.1/24
+#     destination : 192.168.11.0/24
+#     service     : tcp/80 tcp/443
+#     description : ...
+#         (필드 들여쓰기보다 깊게 들여쓴 줄은 앞 필드 값의 이어지는 줄)
+#
+# 줄 단위로 읽으면서 정책 하나가 끝날 때마다 handle_config_import 와 같은 형태의 dict 를 내보내므로
+# 덤프 크기와 관계없이 메모리는 정책 한 개 분량만 사용한다.
+from typing import Dict, Any, List, Optional, Iterable, Iterator, AsyncIterator, Awaitable, Callable
+import codecs
+import re
+
+from policy_table import PolicyTable
+
+MF2_PROMPT = "MF2> "
+
+RULE_HEADER = re.compile(r"\[Rule\s+([^\]\s]+)\]\s*$")
+FIELD_LINE = re.compile(r"  ([A-Za-z][\w-]*) *: ?(.*)")
+CONTINUATION_LINE = re.compile(r"   +(\S.*)")
+
+# 공백으로 구분된 여러 값을 목록으로 저장하는 필드
+LIST_FIELDS = frozenset({"source", "destination", "service", "application", "user", "from", "to", "tags"})
+# CLI 필드명 -> 정책 dict 키
+FIELD_NAMES = {"name": "rulename", "tag": "tags", "app": "application"}
+# 정수로 저장하는 필드
+INT_FIELDS = frozenset({"hit_count"})
+
+class Mf2PolicyParser:
+    """줄을 하나씩 넣으면 끝난 정책을 돌려주는 증분 파서"""
+
+    def __init__(self):
+        self.current: Optional[Dict[str, Any]] = None
+        self.last_field: Optional[str] = None
+        self.line_number = 0
+        self.rules = 0
+        # CLI 필드명 -> 정책 dict 키 (정규화 결과 캐시)
+        self._keys: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """한 줄 처리, 이 줄로 앞 정책이 끝났으면 그 정책을 반환"""
+        self.line_number += 1
+        line = line.rstrip()
+
+        # 대부분의 줄은 필드 줄이므로 먼저 확인
+        if line.startswith("  ") and self.current is not None:
+            field = FIELD_LINE.match(line)
+            if field:
+                name, value = field.groups()
+                key = self._keys.get(name)
+                if key is None:
+                    key = name.lower().replace("-", "_")
+                    key = self._keys[name] = FIELD_NAMES.get(key, key)
+                self._set(key, value)
+                return None
+            continuation = CONTINUATION_LINE.match(line)
+            if continuation and self.last_field is not None:
+                self._append(self.last_field, continuation.group(1))
+                return None
+
+        if not line:
+            return None
+        if line.startswith("["):
+            header = RULE_HEADER.match(line)
+            if header:
+                finished = self.close()
+                self.current = {"seq": header.group(1)}
+                return finished
+        if line.startswith("%"):
+            raise ValueError(f"MF2 CLI error at line {self.line_number}: {line[1:].strip()}")
+        if self.current is None or line.startswith(MF2_PROMPT.rstrip()):
+            # 첫 정책 앞의 배너, 명령 에코, 프롬프트는 무시
+            return None
+        raise ValueError(f"Unexpected MF2 policy line {self.line_number}: {line[:80]!r}")
+
+    def _set(self, key: str, value: str) -> None:
+        if key in LIST_FIELDS:
+            self.current[key] = value.split()
+        elif key in INT_FIELDS and value.isdigit():
+            self.current[key] = int(value)
+        else:
+            self.current[key] = value
+        self.last_field = key
+
+    def _append(self, key: str, value: str) -> None:
+        existing = self.current[key]
+        if isinstance(existing, list):
+            existing.extend(value.split())
+        else:
+            self.current[key] = f"{existing} {value}" if existing else value
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """입력이 끝났을 때 마지막 정책 반환"""
+        finished, self.current, self.last_field = self.current, None, None
+        if finished is not None:
+            if "rulename" not in finished:
+                raise ValueError(f"MF2 rule {finished['seq']} has no name (line {self.line_number})")
+            self.rules += 1
+        return finished
+
+def iter_mf2_policies(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """MF2 덤프의 줄들을 정책 dict 로 변환"""
+    parser = Mf2PolicyParser()
+    for line in lines:
+        policy = parser.feed(line)
+        if policy is not None:
+            yield policy
+    policy = parser.close()
+    if policy is not None:
+        yield policy
+
+def iter_mf2_file(path: str, encoding: str = "utf-8") -> Iterator[Dict[str, Any]]:
+    """MF2 덤프 파일을 한 줄씩 읽어 정책 dict 로 변환"""
+    with open(path, "r", encoding=encoding, errors="replace", newline="") as dump:
+        yield from iter_mf2_policies(dump)
+
+async def aiter_mf2_channel(read: Callable[[int], Awaitable[bytes]], prompt: str = MF2_PROMPT,
+                            chunk_size: int = 65536, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+    """SSH 채널(또는 StreamReader.read)에서 명령 출력을 읽어 정책을 페이지 단위로 반환
+
+    프롬프트는 줄바꿈 없이 출력되므로 줄 단위가 아니라 chunk 단위로 읽고, 남은 버퍼가 프롬프트이면
+    출력이 끝난 것으로 본다. 명령 실행 뒤 첫 줄(명령 에코)부터 넘겨주면 된다.
+    """
+    parser = Mf2PolicyParser()
+    # chunk 경계에서 잘린 멀티바이트 문자는 다음 chunk 와 이어서 디코딩
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    page: List[Dict[str, Any]] = []
+    pending = ""
+    prompt_text = prompt.rstrip()
+    while True:
+        chunk = await read(chunk_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            policy = parser.feed(line)
+            if policy is not None:
+                page.append(policy)
+        if page and len(page) >= page_size:
+            yield page
+            page = []
+        if pending.rstrip() == prompt_text:
+            pending = ""
+            break
+    if pending:
+        policy = parser.feed(pending)
+        if policy is not None:
+            page.append(policy)
+    policy = parser.close()
+    if policy is not None:
+        page.append(policy)
+    if page:
+        yield page
+
+def load_mf2_table(path: str) -> PolicyTable:
+    """MF2 덤프 파일을 컬럼형 PolicyTable 로 로드"""
+    return PolicyTable.from_policies(iter_mf2_file(path))
@@ -0,0 +1,337 @@
+# 부하/장시간 테스트용 모의 방화벽 서버
+#   python mock_firewall.py --rules 100000 --page-size 1000 --latency 0.05 --jitter 0.02 \
+#       --error-rate 0.01 --rate-limit 20 --http-port 8443 --ssh-port 2222
+#
+# HTTP (Paloalto/NGF 형태 API)
+#   GET  /api/?type=keygen&user=&password=              Paloalto API 키 발급 (XML)
+#   GET  /api/?type=config&action=get&key=              Paloalto 보안 정책 전체 (vsys 별 XML, 스트리밍)
+#   POST /api/v1/auth {"user", "password"}              NGF 토큰 발급
+#   GET  /api/v1/policies?offset=&limit=[&vsys=]        NGF 정책 페이지 조회 (Authorization: Bearer <token>)
+#   GET  /api/v1/vsys                                   vsys 목록
+#   GET  /api/v1/session, POST /api/v1/logout           세션 확인/종료
+# SSH 형태 텍스트 세션 (MF2)
+#   login/Password 입력 후 "show policy" 로 정책 블록을 스트리밍, "exit" 로 종료
+#
+# 백엔드는 AppConfig.FIREWALL_API_URL 을 이 서버 주소로 지정하면 HttpFirewallClient 로 접속한다.
+from typing import Dict, Any, List, Optional, Iterator
+from xml.sax.saxutils import escape, quoteattr
+from uuid import uuid4
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from utils.firewall_utils import build_mock_policy
+from mf2_parser import MF2_PROMPT
+
+class MockFirewallSettings:
+    """모의 방화벽 동작 설정"""
+
+    def __init__(self, rules: int = 10000, page_size: int = 1000, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: float = 0.0, user: str = "admin", password: str = "1234",
+                 seed: Optional[int] = None):
+        self.rules = rules
+        # 한 번에 돌려주는 최대 정책 수 (요청한 limit 이 더 커도 이 값으로 제한)
+        self.page_size = page_size
+        # 요청마다 latency ± jitter 초 지연
+        self.latency = latency
+        self.jitter = jitter
+        # 요청이 503 으로 실패할 확률
+        self.error_rate = error_rate
+        # 클라이언트별 초당 요청 수 (0 이면 제한 없음, 넘으면 429 + Retry-After)
+        self.rate_limit = rate_limit
+        self.user = user
+        self.password = password
+        self.seed = seed
+
+class TokenBucket:
+    def __init__(self, rate: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def take(self) -> float:
+        """토큰을 하나 쓰고 0 을 반환 (없으면 다음 토큰까지 기다려야 할 시간(초))"""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class MockFirewall:
+    """모의 방화벽 상태 (정책, 발급한 키, 요청 제한, 통계)"""
+
+    def __init__(self, settings: MockFirewallSettings):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.keys: Dict[str, str] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.stats = {"requests": 0, "logins": 0, "rate_limited": 0, "errors": 0, "rules_served": 0}
+
+    def policy(self, index: int) -> Dict[str, Any]:
+        return build_mock_policy(index)
+
+    def login(self, user: Optional[str], password: Optional[str]) -> Optional[str]:
+        if user != self.settings.user or password != self.settings.password:
+            return None
+        key = uuid4().hex
+        self.keys[key] = user
+        self.stats["logins"] += 1
+        return key
+
+    async def admit(self, client: str) -> Optional[Response]:
+        """지연, 요청 제한, 오류 주입 (요청을 거절하면 응답을 반환)"""
+        self.stats["requests"] += 1
+        if self.settings.rate_limit > 0:
+            bucket = self.buckets.setdefault(client, TokenBucket(self.settings.rate_limit))
+            wait = bucket.take()
+            if wait > 0:
+                self.stats["rate_limited"] += 1
+                return JSONResponse({"error": "Too many requests"}, status_code=429,
+                                    headers={"Retry-After": f"{wait:.3f}"})
+        delay = self.settings.latency + self.random.uniform(-self.settings.jitter, self.settings.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.random.random() < self.settings.error_rate:
+            self.stats["errors"] += 1
+            return JSONResponse({"error": "Service temporarily unavailable"}, status_code=503)
+        return None
+
+    def vsys_names(self) -> List[str]:
+        return [f"vsys{k + 1}" for k in range(min(3, self.settings.rules))]
+
+    def page(self, offset: int, limit: int, vsys: Optional[str] = None) -> Dict[str, Any]:
+        # i 번째 정책의 vsys 는 vsys{i % 3 + 1}
+        if vsys is None:
+            indices = range(self.settings.rules)
+        elif vsys in self.vsys_names():
+            indices = range(int(vsys[4:]) - 1, self.settings.rules, 3)
+        else:
+            indices = range(0)
+        offset = max(0, offset)
+        items = [self.policy(index) for index in indices[offset:offset + max(0, min(limit, self.settings.page_size))]]
+        self.stats["rules_served"] += len(items)
+        return {"total": len(indices), "offset": offset, "items": items}
+
+    def iter_paloalto_xml(self) -> Iterator[str]:
+        """vsys 별 보안 정책을 PAN-OS 설정 XML 형태로 조금씩 생성"""
+        yield '<response status="success"><result><config><devices><entry name="localhost.localdomain"><vsys>'
+        for vsys_index in range(3):
+            yield f'<entry name="vsys{vsys_index + 1}"><rulebase><security><rules>'
+            for index in range(vsys_index, self.settings.rules, 3):
+                yield _paloalto_entry(self.policy(index))
+                self.stats["rules_served"] += 1
+            yield '</rules></security></rulebase></entry>'
+        yield '</vsys></entry></devices></config></result></response>'
+
+    def iter_mf2_blocks(self) -> Iterator[str]:
+        """MF2 "show policy" 출력 (정책마다 한 블록)"""
+        for index in range(self.settings.rules):
+            self.stats["rules_served"] += 1
+            yield format_mf2_block(self.policy(index))
+
+def format_mf2_block(policy: Dict[str, Any]) -> str:
+    """MF2 "show policy" 출력의 정책 한 블록"""
+    return (
+        f"[Rule {policy['seq']}]\n"
+        f"  name        : {policy['rulename']}\n"
+        f"  vsys        : {policy['vsys']}\n"
+        f"  action      : {policy['action']}\n"
+        f"  source      : {' '.join(policy['source'])}\n"
+        f"  destination : {' '.join(policy['destination'])}\n"
+        f"  service     : {' '.join(policy['service'])}\n"
+        f"  description : {policy['description']}\n"
+        "\n"
+    )
+
+def _members(tag: str, values) -> str:
+    return f"<{tag}>" + "".join(f"<member>{escape(str(value))}</member>" for value in values) + f"</{tag}>"
+
+def _paloalto_entry(policy: Dict[str, Any]) -> str:
+    return (
+        f"<entry name={quoteattr(policy['rulename'])}>"
+        + _members("from", ["any"]) + _members("to", ["any"])
+        + _members("source", policy["source"]) + _members("destination", policy["destination"])
+        + _members("service", policy["service"])
+        + f"<action>{policy['action']}</action>"
+        + f"<description>{escape(policy['description'])}</description>"
+        + _members("tag", policy.get("tags", []))
+        + "</entry>"
+    )
+
+def _xml_error(message: str, status_code: int) -> Response:
+    body = f'<response status="error"><msg>{escape(message)}</msg></response>'
+    return Response(body, status_code=status_code, media_type="application/xml")
+
+def create_app(firewall: MockFirewall) -> FastAPI:
+    app = FastAPI(title="Mock firewall")
+
+    def client_id(request: Request, key: Optional[str] = None) -> str:
+        return key or (request.client.host if request.client else "local")
+
+    def bearer(request: Request) -> Optional[str]:
+        header = request.headers.get("authorization", "")
+        token = header[7:] if header.lower().startswith("bearer ") else None
+        return token if token in firewall.keys else None
+
+    @app.get("/api/")
+    async def paloalto_api(request: Request, type: str, action: Optional[str] = None, key: Optional[str] = None,
+                           user: Optional[str] = None, password: Optional[str] = None):
+        rejected = await firewall.admit(client_id(request, key))
+        if rejected is not None:
+            return rejected
+        if type == "keygen":
+            api_key = firewall.login(user, password)
+            if api_key is None:
+                return _xml_error("Invalid credentials.", 403)
+            return Response(f'<response status="success"><result><key>{api_key}</key></result></response>',
+                            media_type="application/xml")
+        if key not in firewall.keys:
+            return _xml_error("Invalid key", 403)
+        if type == "config" and action in ("get", "show"):
+            return StreamingResponse(firewall.iter_paloalto_xml(), media_type="application/xml")
+        return _xml_error(f"Unsupported request type '{type}'", 400)
+
+    @app.post("/api/v1/auth")
+    async def ngf_auth(request: Request):
+        body = await request.json()
+        rejected = await firewall.admit(client_id(request))
+        if rejected is not None:
+            return rejected
+        token = firewall.login(body.get("user"), body.get("password"))
+        if token is None:
+            return JSONResponse({"error": "Invalid credentials"}, status_code=401)
+        return {"token": token}
+
+    @app.get("/api/v1/policies")
+    async def ngf_policies(request: Request, offset: int = 0, limit: int = 1000, vsys: Optional[str] = None):
+        token = bearer(request)
+        if token is None:
+            return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        rejected = await firewall.admit(client_id(request, token))
+        if rejected is not None:
+            return rejected
+        # 모의 서버가 병목이 되지 않도록 jsonable_encoder 를 거치지 않고 바로 직렬화
+        return Response(json.dumps(firewall.page(offset, limit, vsys), ensure_ascii=False), media_type="application/json")
+
+    @app.get("/api/v1/vsys")
+    async def ngf_vsys(request: Request):
+        token = bearer(request)
+        if token is None:
+            return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        rejected = await firewall.admit(client_id(request, token))
+        if rejected is not None:
+            return rejected
+        return {"items": firewall.vsys_names()}
+
+    @app.get("/api/v1/session")
+    async def ngf_session(request: Request):
+        if bearer(request) is None:
+            return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        return {"status": "active"}
+
+    @app.post("/api/v1/logout")
+    async def ngf_logout(request: Request):
+        token = bearer(request)
+        if token is not None:
+            firewall.keys.pop(token, None)
+        return {"status": "logged out"}
+
+    @app.get("/stats")
+    async def stats():
+        return firewall.stats
+
+    return app
+
+async def handle_mf2_session(firewall: MockFirewall, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """MF2 SSH 세션을 흉내 낸 줄 단위 텍스트 세션"""
+    peer = writer.get_extra_info("peername")
+    try:
+        writer.write(b"login: ")
+        user = (await reader.readline()).decode().strip()
+        writer.write(b"Password: ")
+        password = (await reader.readline()).decode().strip()
+        if firewall.login(user, password) is None:
+            writer.write(b"Login incorrect\n")
+            return
+        writer.write(MF2_PROMPT.encode())
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            if command in ("exit", "quit"):
+                writer.write(b"bye\n")
+                return
+            if command == "show policy":
+                for index, block in enumerate(firewall.iter_mf2_blocks()):
+                    # 페이지 크기마다 지연을 두고 흘려보냄 (느린 SSH 출력)
+                    if index % firewall.settings.page_size == 0:
+                        rejected = await firewall.admit(str(peer))
+                        if rejected is not None and rejected.status_code == 503:
+                            writer.write(b"% Error: connection reset by peer\n")
+                            return
+                        if rejected is not None:
+                            # 요청 제한을 넘으면 출력 속도를 늦춤
+                            await asyncio.sleep(float(rejected.headers["Retry-After"]))
+                        await writer.drain()
+                    writer.write(block.encode())
+            elif command:
+                writer.write(f"% Unknown command: {command}\n".encode())
+            writer.write(MF2_PROMPT.encode())
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def start_mf2_server(firewall: MockFirewall, host: str = "127.0.0.1", port: int = 2222) -> asyncio.AbstractServer:
+    return await asyncio.start_server(lambda reader, writer: handle_mf2_session(firewall, reader, writer), host, port)
+
+async def serve(settings: MockFirewallSettings, host: str, http_port: int, ssh_port: int) -> None:
+    import uvicorn
+
+    firewall = MockFirewall(settings)
+    mf2_server = await start_mf2_server(firewall, host, ssh_port)
+    server = uvicorn.Server(uvicorn.Config(create_app(firewall), host=host, port=http_port, log_level="warning"))
+    logging.info(f"Mock firewall serving {settings.rules} rules on http://{host}:{http_port} (MF2 on port {ssh_port})")
+    try:
+        await server.serve()
+    finally:
+        mf2_server.close()
+        await mf2_server.wait_closed()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock firewall for load and soak testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--http-port", type=int, default=8443)
+    parser.add_argument("--ssh-port", type=int, default=2222)
+    parser.add_argument("--rules", type=int, default=10000, help="rulebase size")
+    parser.add_argument("--page-size", type=int, default=1000, help="maximum rules per page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second per client (0 = unlimited)")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="1234")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    settings = MockFirewallSettings(
+        rules=args.rules, page_size=args.page_size, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, rate_limit=args.rate_limit, user=args.user, password=args.password, seed=args.seed
+    )
+    asyncio.run(serve(settings, args.host, args.http_port, args.ssh_port))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# PAN-OS 설정 XML(running-config.xml 또는 API 의 config 응답) 파서
+#
+# 설정 파일은 수백 MB 가 될 수 있으므로 ElementTree.iterparse 로 읽으면서 처리가 끝난 요소는
+# 부모에서 떼어내 메모리를 일정하게 유지한다. 보안 정책이 주소/서비스 객체보다 앞에 올 수도
+# 있어 두 번 읽는다.
+#   1) shared 및 vsys 별 address / address-group / service / service-group 객체와 호스트명 수집
+#   2) vsys 별 rulebase/security/rules 의 정책을 객체 값으로 풀어 정책 dict 로 변환
+# 정책 dict 는 handle_config_import 가 방화벽에서 가져오는 정책과 같은 형태이며, 주소는
+# CIDR/호스트/a-b 범위, 서비스는 tcp/80, udp/1000-2000 형태로 풀어서 후속 분석에서 그대로 사용한다.
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+import logging
+import xml.etree.ElementTree as ET
+
+# 객체 종류 (설정 XML 태그)
+OBJECT_TAGS = ("address", "address-group", "service", "service-group")
+RULE_PATH = ["rulebase", "security", "rules", "entry"]
+HOSTNAME_PATH = ["deviceconfig", "system", "hostname"]
+SHARED_SCOPE = "shared"
+
+# PAN-OS 기본 제공 서비스
+PREDEFINED_SERVICES = {
+    "service-http": ["tcp/80", "tcp/8080"],
+    "service-https": ["tcp/443"]
+}
+
+# 정책 항목 태그 -> 정책 dict 키 (member 목록)
+RULE_MEMBER_FIELDS = [
+    ("from", "from"),
+    ("to", "to"),
+    ("source", "source"),
+    ("source-user", "user"),
+    ("destination", "destination"),
+    ("service", "service"),
+    ("application", "application")
+]
+
+def _members(element: Optional[ET.Element]) -> List[str]:
+    if element is None:
+        return []
+    return [(member.text or "").strip() for member in element.iter("member") if (member.text or "").strip()]
+
+def _text(element: Optional[ET.Element], path: str) -> Optional[str]:
+    found = element.find(path) if element is not None else None
+    return found.text.strip() if found is not None and found.text else None
+
+class PaloaltoObjects:
+    """scope(shared 또는 vsys 이름) 별 주소/서비스 객체와 그룹"""
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {tag: {} for tag in OBJECT_TAGS}
+
+    def add(self, tag: str, scope: str, entry: ET.Element) -> None:
+        name = entry.get("name")
+        if not name:
+            return
+        if tag == "address":
+            value = None
+            for kind in ("ip-netmask", "ip-range", "fqdn", "ip-wildcard"):
+                value = _text(entry, kind)
+                if value:
+                    break
+            stored: Any = value or name
+        elif tag == "service":
+            stored = []
+            for protocol in ("tcp", "udp", "sctp"):
+                ports = _text(entry, f"protocol/{protocol}/port")
+                if ports:
+                    stored.extend(f"{protocol}/{port.strip()}" for port in ports.split(",") if port.strip())
+            stored = stored or [name]
+        elif tag == "address-group":
+            # 동적 그룹은 풀 수 없으므로 이름 그대로 사용
+            stored = _members(entry.find("static")) if entry.find("static") is not None else None
+        else:
+            members = entry.find("members")
+            stored = _members(members if members is not None else entry)
+        self.tables[tag][(scope, name)] = stored
+
+    def counts(self) -> Dict[str, int]:
+        return {tag.replace("-", "_"): len(table) for tag, table in self.tables.items()}
+
+    def _lookup(self, tag: str, scope: str, name: str) -> Tuple[bool, Any]:
+        table = self.tables[tag]
+        for key in ((scope, name), (SHARED_SCOPE, name)):
+            if key in table:
+                return True, table[key]
+        return False, None
+
+    def resolve_addresses(self, scope: str, names: List[str]) -> List[str]:
+        return list(dict.fromkeys(self._resolve("address", "address-group", scope, names, set())))
+
+    def resolve_services(self, scope: str, names: List[str]) -> List[str]:
+        return list(dict.fromkeys(self._resolve("service", "service-group", scope, names, set())))
+
+    def _resolve(self, object_tag: str, group_tag: str, scope: str, names: List[str], seen: set) -> Iterator[str]:
+        for name in names:
+            found, value = self._lookup(object_tag, scope, name)
+            if found:
+                if isinstance(value, list):
+                    yield from value
+                else:
+                    yield value
+                continue
+            found, members = self._lookup(group_tag, scope, name)
+            if found and members is not None:
+                # 그룹이 자신을 다시 포함하는 경우 (순환 참조) 는 건너뜀
+                if name not in seen:
+                    yield from self._resolve(object_tag, group_tag, scope, members, seen | {name})
+            elif object_tag == "service" and name in PREDEFINED_SERVICES:
+                yield from PREDEFINED_SERVICES[name]
+            else:
+                # any, 직접 입력한 주소/서비스, 알 수 없는 객체명은 그대로
+                yield name
+
+def _iter_targets(path: str, want_rules: bool) -> Iterator[Tuple[str, str, ET.Element]]:
+    """설정 XML 에서 (종류, scope, 요소) 를 차례로 반환하고, 처리가 끝난 요소는 부모에서 제거
+
+    종류는 OBJECT_TAGS 의 객체, "rule"(want_rules 일 때), "hostname" 중 하나이다.
+    """
+    elements: List[ET.Element] = []
+    tags: List[str] = []
+    scopes: List[str] = []
+    collecting = 0
+
+    def target() -> Optional[str]:
+        if tags[-1] == "entry" and len(tags) >= 3 and tags[-2] in OBJECT_TAGS \
+                and (tags[-3] == SHARED_SCOPE or (tags[-3] == "entry" and len(tags) >= 4 and tags[-4] == "vsys")):
+            return None if want_rules else tags[-2]
+        if want_rules and tags[-4:] == RULE_PATH:
+            return "rule"
+        if not want_rules and tags[-3:] == HOSTNAME_PATH:
+            return "hostname"
+        return None
+
+    for event, element in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            elements.append(element)
+            tags.append(element.tag)
+            if element.tag == "entry" and len(tags) >= 2 and tags[-2] == "vsys":
+                scopes.append(element.get("name") or "vsys1")
+            elif element.tag == SHARED_SCOPE:
+                scopes.append(SHARED_SCOPE)
+            if target() is not None:
+                collecting += 1
+            continue
+
+        kind = target()
+        if kind is not None:
+            collecting -= 1
+            yield kind, scopes[-1] if scopes else SHARED_SCOPE, element
+        if (element.tag == "entry" and len(tags) >= 2 and tags[-2] == "vsys") or element.tag == SHARED_SCOPE:
+            scopes.pop()
+        elements.pop()
+        tags.pop()
+        if collecting == 0 and elements:
+            # 처리했거나 필요 없는 요소는 부모에서 떼어내어 메모리에서 해제
+            element.clear()
+            elements[-1].remove(element)
+
+def load_paloalto_objects(path: str) -> Tuple[PaloaltoObjects, Optional[str]]:
+    """1차: 객체와 호스트명 수집"""
+    objects = PaloaltoObjects()
+    hostname = None
+    for kind, scope, element in _iter_targets(path, want_rules=False):
+        if kind == "hostname":
+            hostname = (element.text or "").strip() or hostname
+        else:
+            objects.add(kind, scope, element)
+    return objects, hostname
+
+def build_rule(element: ET.Element, vsys: str, seq: int, objects: PaloaltoObjects) -> Dict[str, Any]:
+    policy: Dict[str, Any] = {
+        "vsys": vsys,
+        "seq": str(seq),
+        "rulename": element.get("name"),
+        "enable": _text(element, "disabled") != "yes",
+        "action": _text(element, "action") or "allow"
+    }
+    for tag, key in RULE_MEMBER_FIELDS:
+        values = _members(element.find(tag)) or ["any"]
+        if key in ("source", "destination"):
+            values = objects.resolve_addresses(vsys, values)
+        elif key == "service":
+            values = objects.resolve_services(vsys, values)
+        policy[key] = values
+    for tag, key in (("negate-source", "negate_source"), ("negate-destination", "negate_destination")):
+        if _text(element, tag) == "yes":
+            policy[key] = True
+    policy["description"] = _text(element, "description") or ""
+    policy["tags"] = _members(element.find("tag"))
+    return policy
+
+def iter_paloalto_rules(path: str, objects: Optional[PaloaltoObjects] = None) -> Iterator[Dict[str, Any]]:
+    """2차: 보안 정책을 설정 파일 순서대로 정책 dict 로 반환 (seq 는 1 부터 전체 순번)"""
+    if objects is None:
+        objects, _ = load_paloalto_objects(path)
+    seq = 0
+    for _, scope, element in _iter_targets(path, want_rules=True):
+        seq += 1
+        yield build_rule(element, scope, seq, objects)
+    logging.info(f"Parsed {seq} security rules from {path}")
@@ -0,0 +1,451 @@
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+from datetime import datetime
+from uuid import uuid4
+import hashlib
+import json
+import logging
+import zlib
+
+from sqlalchemy import create_engine
+
+from config import AppConfig
+from policy_table import PolicyTable
+from artifact_store import get_artifact_store, is_artifact_handle
+from job_engine import check_cancelled
+
+# 정규화된 정책 스냅샷 테이블
+#   policy_snapshot : 가져오기(CONFIG_IMPORT) 한 번에 해당하는 스냅샷
+#   policy_rule     : 스냅샷의 정책 한 행 (목록 필드를 제외한 값은 attributes JSON)
+#   policy_member   : 목록 필드(source/destination/service 등)의 각 값
+#
+# 같은 방화벽(ip)을 다시 가져오면 이전 스냅샷을 기준(base_id)으로 하는 델타 스냅샷으로 저장한다.
+# 델타 스냅샷에는 기준 체인에 없는 지문(fingerprint)의 정책 행만 저장하고, 전체 정책 순서는
+# manifest(지문, vsys, 정책명, 변동 값 목록을 zlib 압축한 JSON)로 보관한다.
+# 체인 깊이가 SNAPSHOT_FULL_INTERVAL 에 이르면 다시 전체 스냅샷을 저장한다.
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS policy_snapshot (
+        id TEXT PRIMARY KEY,
+        project_id TEXT,
+        ip TEXT,
+        created_at TEXT NOT NULL,
+        rule_count INTEGER NOT NULL DEFAULT 0,
+        base_id TEXT,
+        depth INTEGER NOT NULL DEFAULT 0,
+        manifest BLOB,
+        changes TEXT,
+        retained INTEGER NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS policy_rule (
+        snapshot_id TEXT NOT NULL REFERENCES policy_snapshot(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        seq,
+        rulename TEXT,
+        vsys TEXT,
+        action TEXT,
+        attributes TEXT NOT NULL,
+        fingerprint TEXT,
+        PRIMARY KEY (snapshot_id, position)
+    )""",
+    """CREATE TABLE IF NOT EXISTS policy_member (
+        snapshot_id TEXT NOT NULL REFERENCES policy_snapshot(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        field TEXT NOT NULL,
+        ordinal INTEGER NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (snapshot_id, position, field, ordinal)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_policy_snapshot_project ON policy_snapshot (project_id)",
+    "CREATE INDEX IF NOT EXISTS ix_policy_snapshot_ip ON policy_snapshot (ip, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_policy_snapshot_base ON policy_snapshot (base_id)",
+    "CREATE INDEX IF NOT EXISTS ix_policy_rule_rulename ON policy_rule (snapshot_id, rulename)",
+    "CREATE INDEX IF NOT EXISTS ix_policy_rule_seq ON policy_rule (snapshot_id, seq)",
+    "CREATE INDEX IF NOT EXISTS ix_policy_rule_vsys ON policy_rule (snapshot_id, vsys)",
+    "CREATE INDEX IF NOT EXISTS ix_policy_member_value ON policy_member (snapshot_id, field, value)"
+]
+
+# 이전 스키마로 만든 DB 에 추가할 컬럼 (테이블, 컬럼, 정의)
+MIGRATIONS = [
+    ("policy_snapshot", "base_id", "TEXT"),
+    ("policy_snapshot", "depth", "INTEGER NOT NULL DEFAULT 0"),
+    ("policy_snapshot", "manifest", "BLOB"),
+    ("policy_snapshot", "changes", "TEXT"),
+    ("policy_snapshot", "retained", "INTEGER NOT NULL DEFAULT 0"),
+    ("policy_rule", "fingerprint", "TEXT")
+]
+
+INSERT_RULE = (
+    "INSERT INTO policy_rule (snapshot_id, position, seq, rulename, vsys, action, attributes, fingerprint) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_MEMBER = "INSERT INTO policy_member (snapshot_id, position, field, ordinal, value) VALUES (?, ?, ?, ?, ?)"
+
+# 가져올 때마다 바뀔 수 있어 정책 내용 비교(지문)에서 제외하는 필드, 값은 manifest 에 보관
+VOLATILE_FIELDS = ("seq", "hit_count", "last_hit")
+
+def _is_member_list(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+
+def rule_fingerprint(policy: Dict[str, Any]) -> str:
+    """정책의 의미 있는 필드(VOLATILE_FIELDS 제외)에 대한 안정적인 지문 (필드 순서와 무관)"""
+    semantic = {field: value for field, value in policy.items() if field not in VOLATILE_FIELDS}
+    volatile = sorted(field for field in VOLATILE_FIELDS if field in policy)
+    payload = json.dumps([semantic, volatile], sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=10).hexdigest()
+
+def _manifest_entry(policy: Dict[str, Any], fingerprint: str) -> List[Any]:
+    return [fingerprint, policy.get('vsys'), policy.get('rulename'),
+            {field: policy[field] for field in VOLATILE_FIELDS if field in policy}]
+
+def _pack_manifest(manifest: List[List[Any]]) -> bytes:
+    return zlib.compress(json.dumps(manifest, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8'))
+
+def _unpack_manifest(blob: Optional[bytes]) -> Optional[List[List[Any]]]:
+    return json.loads(zlib.decompress(blob).decode('utf-8')) if blob else None
+
+def diff_manifests(base: List[List[Any]], current: List[List[Any]]) -> Dict[str, int]:
+    """(vsys, 정책명) 기준으로 추가/변경/삭제된 정책 수"""
+    previous = {(entry[1], entry[2]): entry[0] for entry in base}
+    latest = {(entry[1], entry[2]): entry[0] for entry in current}
+    return {
+        "added": sum(1 for key in latest if key not in previous),
+        "modified": sum(1 for key, fingerprint in latest.items() if key in previous and previous[key] != fingerprint),
+        "deleted": sum(1 for key in previous if key not in latest)
+    }
+
+class PolicySnapshotStore:
+    """정책 스냅샷을 정규화된 SQLite 테이블에 저장/조회"""
+
+    def __init__(self, database_url: Optional[str] = None, batch_size: int = 10000):
+        self.database_url = database_url or f"sqlite:///{AppConfig.DB_DIR}/firewall_policies.db"
+        self.engine = create_engine(self.database_url)
+        self.batch_size = batch_size
+        self._schema_ready = False
+
+    def init_schema(self) -> None:
+        if self._schema_ready:
+            return
+        with self.engine.begin() as connection:
+            for table, column, definition in MIGRATIONS:
+                columns = {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")}
+                if columns and column not in columns:
+                    connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            for statement in SCHEMA:
+                connection.exec_driver_sql(statement)
+        self._schema_ready = True
+
+    def _raw_connection(self):
+        self.init_schema()
+        connection = self.engine.raw_connection()
+        connection.cursor().execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    def _delta_base(self, cursor, ip: str) -> Optional[Tuple[str, int, List[List[Any]]]]:
+        """같은 방화벽의 가장 최근 스냅샷 (델타 기준), 체인이 길어졌으면 None (전체 스냅샷 저장)"""
+        row = cursor.execute(
+            "SELECT id, depth, manifest FROM policy_snapshot "
+            "WHERE ip = ? AND rule_count >= 0 AND manifest IS NOT NULL ORDER BY created_at DESC LIMIT 1",
+            (ip,)
+        ).fetchone()
+        if row is None or row[1] + 1 >= AppConfig.SNAPSHOT_FULL_INTERVAL:
+            return None
+        return row[0], row[1], _unpack_manifest(row[2])
+
+    def save_snapshot(self, policies: Iterable, project_id: Optional[str] = None, ip: Optional[str] = None,
+                      delta: bool = False) -> str:
+        """정책 목록을 스냅샷으로 저장 (executemany 로 배치 단위 일괄 삽입)
+
+        policies 는 방화벽에서 페이지 단위로 도착하는 스트림일 수 있으므로 배치마다 커밋하여
+        다음 행을 기다리는 동안 쓰기 잠금을 잡고 있지 않는다. 저장이 끝나기 전까지 스냅샷은
+        rule_count = -1 로 표시되어 조회되지 않으며, 실패하면 지금까지 저장한 행을 삭제한다.
+
+        delta 이면 같은 ip 의 이전 스냅샷과 지문을 비교하여 새로 추가/변경된 정책 행만 저장한다.
+        """
+        snapshot_id = str(uuid4())
+        connection = self._raw_connection()
+        try:
+            cursor = connection.cursor()
+            base = self._delta_base(cursor, ip) if delta and ip else None
+            cursor.execute(
+                "INSERT INTO policy_snapshot (id, project_id, ip, created_at, rule_count, base_id, depth) "
+                "VALUES (?, ?, ?, ?, -1, ?, ?)",
+                (snapshot_id, project_id, ip, datetime.now().isoformat(),
+                 base[0] if base else None, base[1] + 1 if base else 0)
+            )
+            connection.commit()
+
+            # 기준 체인에 이미 저장된 지문 (델타에서는 같은 내용의 정책 행을 다시 저장하지 않음)
+            known = {entry[0] for entry in base[2]} if base else None
+            manifest: List[List[Any]] = []
+            rules: List[Tuple] = []
+            members: List[Tuple] = []
+            stored = 0
+            for position, policy in enumerate(policies):
+                fingerprint = rule_fingerprint(policy)
+                manifest.append(_manifest_entry(policy, fingerprint))
+                if known is not None:
+                    if fingerprint in known:
+                        continue
+                    known.add(fingerprint)
+
+                attributes = {}
+                for field, value in policy.items():
+                    if _is_member_list(value):
+                        attributes[field] = []
+                        members.extend(
+                            (snapshot_id, position, field, ordinal, item)
+                            for ordinal, item in enumerate(value)
+                        )
+                    else:
+                        attributes[field] = value
+                rules.append((
+                    snapshot_id, position, policy.get('seq'), policy.get('rulename'),
+                    policy.get('vsys'), policy.get('action'),
+                    json.dumps(attributes, ensure_ascii=False, separators=(',', ':')), fingerprint
+                ))
+                stored += 1
+
+                if len(rules) >= self.batch_size:
+                    # 취소 요청 시 예외로 중단되며 트랜잭션은 롤백됨
+                    check_cancelled()
+                    cursor.executemany(INSERT_RULE, rules)
+                    cursor.executemany(INSERT_MEMBER, members)
+                    connection.commit()
+                    rules, members = [], []
+
+            if rules:
+                cursor.executemany(INSERT_RULE, rules)
+                cursor.executemany(INSERT_MEMBER, members)
+            changes = diff_manifests(base[2], manifest) if base else None
+            cursor.execute(
+                "UPDATE policy_snapshot SET rule_count = ?, manifest = ?, changes = ? WHERE id = ?",
+                (len(manifest), _pack_manifest(manifest), json.dumps(changes) if changes else None, snapshot_id)
+            )
+            connection.commit()
+            if base:
+                logging.info(
+                    f"Saved policy snapshot {snapshot_id} ({len(manifest)} rules) as delta of {base[0]}: "
+                    f"{changes['added']} added, {changes['modified']} modified, {changes['deleted']} deleted, "
+                    f"{stored} rows stored"
+                )
+            else:
+                logging.info(f"Saved policy snapshot {snapshot_id} ({len(manifest)} rules)")
+            return snapshot_id
+        except Exception:
+            connection.rollback()
+            connection.cursor().execute("DELETE FROM policy_snapshot WHERE id = ?", (snapshot_id,))
+            connection.commit()
+            raise
+        finally:
+            connection.close()
+
+    def snapshot_info(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        connection = self._raw_connection()
+        try:
+            row = connection.cursor().execute(
+                "SELECT id, project_id, ip, created_at, rule_count, base_id, depth, changes "
+                "FROM policy_snapshot WHERE id = ? AND rule_count >= 0",
+                (snapshot_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        info = dict(zip(("id", "project_id", "ip", "created_at", "rule_count", "base_id", "depth"), row))
+        info["changes"] = json.loads(row[7]) if row[7] else None
+        return info
+
+    def _iter_rows(self, connection, snapshot_id: str, where: str = "", params: Tuple = ()) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+        """정책 행과 목록 필드 값을 position 순서로 병합하여 (지문, dict) 로 반환"""
+        rule_cursor = connection.cursor()
+        rule_cursor.execute(
+            f"SELECT position, attributes, fingerprint FROM policy_rule WHERE snapshot_id = ? {where} ORDER BY position",
+            (snapshot_id, *params)
+        )
+        member_cursor = connection.cursor()
+        member_cursor.execute(
+            f"SELECT m.position, m.field, m.value FROM policy_member m "
+            f"WHERE m.snapshot_id = ? AND m.position IN "
+            f"(SELECT position FROM policy_rule WHERE snapshot_id = ? {where}) "
+            f"ORDER BY m.position, m.field, m.ordinal",
+            (snapshot_id, snapshot_id, *params)
+        ) if where else member_cursor.execute(
+            "SELECT position, field, value FROM policy_member WHERE snapshot_id = ? ORDER BY position, field, ordinal",
+            (snapshot_id,)
+        )
+
+        pending = member_cursor.fetchone()
+        for position, attributes, fingerprint in rule_cursor:
+            policy = json.loads(attributes)
+            while pending is not None and pending[0] < position:
+                pending = member_cursor.fetchone()
+            while pending is not None and pending[0] == position:
+                policy[pending[1]].append(pending[2])
+                pending = member_cursor.fetchone()
+            yield fingerprint, policy
+
+    def _delta_manifest(self, connection, snapshot_id: str) -> Optional[List[List[Any]]]:
+        """델타 스냅샷이면 manifest, 전체 스냅샷이면 None"""
+        row = connection.cursor().execute(
+            "SELECT manifest FROM policy_snapshot WHERE id = ? AND base_id IS NOT NULL", (snapshot_id,)
+        ).fetchone()
+        return _unpack_manifest(row[0]) if row else None
+
+    def _iter_delta(self, connection, snapshot_id: str, manifest: List[List[Any]]) -> Iterator[Dict[str, Any]]:
+        """기준 체인을 따라가며 지문별 정책 내용을 모아 manifest 순서대로 복원"""
+        needed = {entry[0] for entry in manifest}
+        contents: Dict[str, Dict[str, Any]] = {}
+        current = snapshot_id
+        while current is not None and len(contents) < len(needed):
+            for fingerprint, policy in self._iter_rows(connection, current):
+                if fingerprint in needed and fingerprint not in contents:
+                    contents[fingerprint] = policy
+            row = connection.cursor().execute(
+                "SELECT base_id FROM policy_snapshot WHERE id = ?", (current,)
+            ).fetchone()
+            current = row[0] if row else None
+        if len(contents) < len(needed):
+            raise ValueError(f"Policy snapshot chain is incomplete: {snapshot_id}")
+
+        for fingerprint, _, _, volatile in manifest:
+            policy = {field: list(value) if isinstance(value, list) else value
+                      for field, value in contents[fingerprint].items()}
+            policy.update(volatile)
+            yield policy
+
+    def iter_policies(self, snapshot_id: str) -> Iterator[Dict[str, Any]]:
+        connection = self._raw_connection()
+        try:
+            manifest = self._delta_manifest(connection, snapshot_id)
+            if manifest is not None:
+                yield from self._iter_delta(connection, snapshot_id, manifest)
+            else:
+                for _, policy in self._iter_rows(connection, snapshot_id):
+                    yield policy
+        finally:
+            connection.close()
+
+    def load_snapshot(self, snapshot_id: str) -> PolicyTable:
+        """스냅샷을 컬럼형 PolicyTable 로 로드"""
+        if self.snapshot_info(snapshot_id) is None:
+            raise ValueError(f"Policy snapshot not found: {snapshot_id}")
+        return PolicyTable.from_policies(self.iter_policies(snapshot_id))
+
+    def find_policies(self, snapshot_id: str, rulenames: Optional[List[str]] = None,
+                      vsys: Optional[str] = None, member: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """인덱스를 사용한 조건 조회 (정책명 목록, vsys, 목록 필드 값)
+
+        델타 스냅샷은 행이 기준 체인에 나뉘어 있으므로 복원한 정책을 같은 조건으로 거른다.
+        """
+        if rulenames is not None and not rulenames:
+            return []
+        connection = self._raw_connection()
+        try:
+            manifest = self._delta_manifest(connection, snapshot_id)
+            if manifest is not None:
+                names = set(rulenames) if rulenames is not None else None
+                return [
+                    policy for policy in self._iter_delta(connection, snapshot_id, manifest)
+                    if (names is None or policy.get('rulename') in names)
+                    and (vsys is None or policy.get('vsys') == vsys)
+                    and (member is None or member[1] in (policy.get(member[0]) or []))
+                ]
+
+            conditions = []
+            params: List[Any] = []
+            if rulenames is not None:
+                conditions.append(f"rulename IN ({', '.join('?' for _ in rulenames)})")
+                params.extend(rulenames)
+            if vsys is not None:
+                conditions.append("vsys = ?")
+                params.append(vsys)
+            if member is not None:
+                conditions.append(
+                    "position IN (SELECT position FROM policy_member WHERE snapshot_id = ? AND field = ? AND value = ?)"
+                )
+                params.extend((snapshot_id, *member))
+
+            where = "".join(f" AND {condition}" for condition in conditions)
+            return [policy for _, policy in self._iter_rows(connection, snapshot_id, where, tuple(params))]
+        finally:
+            connection.close()
+
+    def delete_project_snapshots(self, project_id: str) -> None:
+        """프로젝트의 스냅샷 삭제
+
+        다른 델타 스냅샷의 기준인 스냅샷은 프로젝트에서 분리하여 보관(retained)하고,
+        더 이상 참조되지 않는 보관 스냅샷은 함께 정리한다.
+        """
+        connection = self._raw_connection()
+        try:
+            cursor = connection.cursor()
+            referenced = "SELECT base_id FROM policy_snapshot WHERE base_id IS NOT NULL"
+            cursor.execute(
+                f"UPDATE policy_snapshot SET project_id = NULL, retained = 1 WHERE project_id = ? AND id IN ({referenced})",
+                (project_id,)
+            )
+            cursor.execute("DELETE FROM policy_snapshot WHERE project_id = ?", (project_id,))
+            while cursor.execute(
+                f"DELETE FROM policy_snapshot WHERE retained = 1 AND id NOT IN ({referenced})"
+            ).rowcount:
+                pass
+            connection.commit()
+        finally:
+            connection.close()
+
+_policy_store = None
+
+def get_policy_store() -> PolicySnapshotStore:
+    global _policy_store
+    if _policy_store is None:
+        _policy_store = PolicySnapshotStore()
+    return _policy_store
+
+def policy_ref(data: Any) -> Optional[Dict[str, Any]]:
+    """태스크 결과 data 의 정책 참조 (스냅샷 ID 또는 아티팩트 핸들), 정책이 직접 포함된 경우 None"""
+    if not isinstance(data, dict) or data.get('policies') is not None:
+        return None
+    if data.get('snapshot_id'):
+        return {"snapshot_id": data['snapshot_id']}
+    if is_artifact_handle(data.get('artifact')):
+        return {"artifact": data['artifact']}
+    return None
+
+def policy_ref_count(ref: Dict[str, Any]) -> int:
+    if 'artifact' in ref:
+        return ref['artifact']['rows']
+    info = get_policy_store().snapshot_info(ref['snapshot_id'])
+    return info['rule_count'] if info else 0
+
+def iter_ref_policies(ref: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    if 'artifact' in ref:
+        return get_artifact_store().iter_rows(ref['artifact'])
+    return get_policy_store().iter_policies(ref['snapshot_id'])
+
+def find_ref_policies(ref: Dict[str, Any], rulenames: List[str]) -> List[Dict[str, Any]]:
+    """참조된 정책 중 정책명이 일치하는 정책 조회 (스냅샷은 인덱스 사용)"""
+    if 'artifact' in ref:
+        names = set(rulenames)
+        return [policy for policy in get_artifact_store().iter_rows(ref['artifact']) if policy.get('rulename') in names]
+    return get_policy_store().find_policies(ref['snapshot_id'], rulenames)
+
+def resolve_policies(data: Any):
+    """태스크 결과 data 에서 정책 목록을 얻음 (정책 목록, 스냅샷 또는 아티팩트 참조)"""
+    if isinstance(data, dict):
+        if data.get('policies') is not None:
+            return data['policies']
+        ref = policy_ref(data)
+        if ref is None:
+            return []
+        if 'artifact' in ref:
+            return get_artifact_store().load(ref['artifact'])
+        if AppConfig.POLICY_STORE == 'columnar':
+            return get_policy_store().load_snapshot(ref['snapshot_id'])
+        return list(get_policy_store().iter_policies(ref['snapshot_id']))
+    return data if data is not None else []
+
+def expand_policy_refs(data: Any) -> Any:
+    """API 응답용: 스냅샷/아티팩트 참조를 실제 정책 목록으로 펼침"""
+    ref = policy_ref(data)
+    if ref is not None and 'policies' not in data:
+        return {**data, "policies": list(iter_ref_policies(ref))}
+    return data
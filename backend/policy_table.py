@@ -0,0 +1,283 @@
+from typing import Dict, Any, List, Optional, Iterable, Iterator
+from array import array
+from collections.abc import Mapping
+import sys
+
+class StringPool:
+    """문자열 intern 풀 (코드 0 은 None)"""
+    __slots__ = ("strings", "codes")
+
+    def __init__(self):
+        self.strings: List[Optional[str]] = [None]
+        self.codes: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.codes[value] = code
+            self.strings.append(sys.intern(value))
+        return code
+
+    def __len__(self) -> int:
+        return len(self.strings) - 1
+
+class _Column:
+    """컬럼 공통 동작: 값이 없는(키가 없는) 행은 nulls 에 기록"""
+    __slots__ = ("nulls",)
+
+    def __init__(self):
+        self.nulls = set()
+
+    def accepts(self, value: Any) -> bool:
+        raise NotImplementedError
+
+    def append_missing(self) -> None:
+        self.nulls.add(len(self))
+        self._append_default()
+
+class StrColumn(_Column):
+    __slots__ = ("pool", "codes")
+
+    def __init__(self, pool: StringPool):
+        super().__init__()
+        self.pool = pool
+        self.codes = array('I')
+
+    def accepts(self, value: Any) -> bool:
+        return value is None or isinstance(value, str)
+
+    def append(self, value: Optional[str]) -> None:
+        self.codes.append(self.pool.intern(value))
+
+    def _append_default(self) -> None:
+        self.codes.append(0)
+
+    def get(self, index: int) -> Optional[str]:
+        return self.pool.strings[self.codes[index]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+class IntColumn(_Column):
+    __slots__ = ("values",)
+
+    def __init__(self):
+        super().__init__()
+        self.values = array('q')
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, int) and not isinstance(value, bool) and -(1 << 63) <= value < (1 << 63)
+
+    def append(self, value: int) -> None:
+        self.values.append(value)
+
+    def _append_default(self) -> None:
+        self.values.append(0)
+
+    def get(self, index: int) -> int:
+        return self.values[index]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class BoolColumn(IntColumn):
+    __slots__ = ()
+
+    def __init__(self):
+        _Column.__init__(self)
+        self.values = array('b')
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, bool)
+
+    def get(self, index: int) -> bool:
+        return bool(self.values[index])
+
+class StrListColumn(_Column):
+    """문자열 리스트 컬럼 (CSR: offsets + intern 코드)"""
+    __slots__ = ("pool", "offsets", "codes")
+
+    def __init__(self, pool: StringPool):
+        super().__init__()
+        self.pool = pool
+        self.offsets = array('Q', [0])
+        self.codes = array('I')
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+
+    def append(self, value: List[str]) -> None:
+        intern = self.pool.intern
+        self.codes.extend(intern(item) for item in value)
+        self.offsets.append(len(self.codes))
+
+    def _append_default(self) -> None:
+        self.offsets.append(len(self.codes))
+
+    def get(self, index: int) -> List[str]:
+        strings = self.pool.strings
+        return [strings[code] for code in self.codes[self.offsets[index]:self.offsets[index + 1]]]
+
+    def get_codes(self, index: int) -> array:
+        return self.codes[self.offsets[index]:self.offsets[index + 1]]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+class ObjectColumn(_Column):
+    """타입이 일정하지 않은 값을 위한 일반 리스트 컬럼"""
+    __slots__ = ("values",)
+
+    def __init__(self, values: Optional[List[Any]] = None):
+        super().__init__()
+        self.values = values if values is not None else []
+
+    def accepts(self, value: Any) -> bool:
+        return True
+
+    def append(self, value: Any) -> None:
+        self.values.append(value)
+
+    def _append_default(self) -> None:
+        self.values.append(None)
+
+    def get(self, index: int) -> Any:
+        return self.values[index]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class PolicyRow(Mapping):
+    """PolicyTable 의 한 행을 dict 처럼 읽는 뷰 (값은 접근할 때 생성)"""
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "PolicyTable", index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._table._columns[key]
+        if self._index in column.nulls:
+            raise KeyError(key)
+        return column.get(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        index = self._index
+        return (name for name, column in self._table._columns.items() if index not in column.nulls)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"PolicyRow({dict(self)!r})"
+
+class PolicyTable:
+    """정책 목록을 컬럼 단위로 저장하는 컨테이너
+
+    객체 문자열은 StringPool 에 한 번만 저장하고 각 컬럼은 intern 코드를
+    array 버퍼에 보관한다. 행은 PolicyRow 뷰로 접근하며, 핸들러는 기존 dict
+    정책 목록과 동일하게 len / 인덱스 / 순회로 사용할 수 있다.
+    """
+
+    def __init__(self):
+        self._pool = StringPool()
+        self._columns: Dict[str, _Column] = {}
+        self._length = 0
+
+    @classmethod
+    def from_policies(cls, policies: Iterable[Mapping]) -> "PolicyTable":
+        table = cls()
+        table.extend(policies)
+        return table
+
+    def _new_column(self, value: Any) -> _Column:
+        if isinstance(value, bool):
+            column = BoolColumn()
+        elif isinstance(value, int):
+            column = IntColumn()
+        elif value is None or isinstance(value, str):
+            column = StrColumn(self._pool)
+        elif isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+            column = StrListColumn(self._pool)
+        else:
+            column = ObjectColumn()
+        if not column.accepts(value):
+            column = ObjectColumn()
+        for _ in range(self._length):
+            column.append_missing()
+        return column
+
+    def _promote(self, name: str) -> _Column:
+        """타입이 맞지 않는 값이 들어오면 일반 리스트 컬럼으로 변환"""
+        column = self._columns[name]
+        promoted = ObjectColumn([column.get(index) for index in range(len(column))])
+        promoted.nulls = column.nulls
+        self._columns[name] = promoted
+        return promoted
+
+    def append(self, policy: Mapping) -> None:
+        for name, value in policy.items():
+            if name not in self._columns:
+                self._columns[name] = self._new_column(value)
+        for name, column in list(self._columns.items()):
+            if name not in policy:
+                column.append_missing()
+                continue
+            value = policy[name]
+            if not column.accepts(value):
+                column = self._promote(name)
+            column.append(value)
+        self._length += 1
+
+    def extend(self, policies: Iterable[Mapping]) -> None:
+        for policy in policies:
+            self.append(policy)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> List[Any]:
+        """한 컬럼의 값 목록 (값이 없는 행은 None)"""
+        column = self._columns[name]
+        return [None if index in column.nulls else column.get(index) for index in range(self._length)]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> PolicyRow:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PolicyTable index out of range")
+        return PolicyRow(self, index)
+
+    def __iter__(self) -> Iterator[PolicyRow]:
+        return (PolicyRow(self, index) for index in range(self._length))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self]
+
+    def __repr__(self) -> str:
+        return f"PolicyTable(rows={self._length}, columns={len(self._columns)}, strings={len(self._pool)})"
+
+def to_json_compatible(value: Any) -> Any:
+    """PolicyTable/PolicyRow 를 포함한 결과를 JSON 으로 직렬화 가능한 형태로 변환"""
+    if isinstance(value, PolicyTable):
+        return value.to_dicts()
+    if isinstance(value, Mapping):
+        return {key: to_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_compatible(item) for item in value]
+    return value
+
+def policy_json_default(value: Any) -> Any:
+    """json.dumps(default=...) 용 변환 함수 (전체 dict 목록을 만들지 않고 행 단위 변환)"""
+    if isinstance(value, PolicyTable):
+        return list(value)
+    if isinstance(value, PolicyRow):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,69 @@
+from typing import Dict, Any, List, Optional
+from collections import defaultdict
+from datetime import datetime
+import asyncio
+import itertools
+import json
+
+class ProgressBroker:
+    """프로젝트(채널)별 진행 이벤트 발행/구독
+
+    구독자마다 크기가 제한된 asyncio.Queue 를 두고, 느린 구독자의 큐가 가득 차면
+    가장 오래된 이벤트를 버린다. 새 구독자는 진행 중인 작업의 마지막 이벤트를 먼저 받는다.
+    """
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+        self._latest: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self._sequence = itertools.count(1)
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[channel].append(queue)
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(channel, [])
+        if queue in subscribers:
+            subscribers.remove(queue)
+        if not subscribers:
+            self._subscribers.pop(channel, None)
+
+    def snapshot(self, channel: str) -> List[Dict[str, Any]]:
+        """채널에서 아직 끝나지 않은 작업의 마지막 이벤트"""
+        return list(self._latest.get(channel, {}).values())
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        event = {**event, "id": next(self._sequence), "timestamp": datetime.now().isoformat()}
+
+        job_id = event.get("job_id")
+        if job_id is not None:
+            if event.get("finished"):
+                self._latest[channel].pop(job_id, None)
+                if not self._latest[channel]:
+                    self._latest.pop(channel, None)
+            else:
+                self._latest[channel][job_id] = event
+
+        for queue in self._subscribers.get(channel, []):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+        return event
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Server-Sent Events 형식의 메시지"""
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"id: {event.get('id', '')}\nevent: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+_progress_broker: Optional[ProgressBroker] = None
+
+def get_progress_broker() -> ProgressBroker:
+    global _progress_broker
+    if _progress_broker is None:
+        _progress_broker = ProgressBroker()
+    return _progress_broker
@@ -52,6 +52,14 @@ project_templates = [
             {"name": "Download Rules", "type": TaskType.RULE_DOWNLOAD}
         ]
     },
+    {
+        "name": "Offline Shadow Policy Analysis",
+        "tasks": [
+            {"name": "Upload Configuration", "type": TaskType.CONFIG_FILE_IMPORT},
+            {"name": "Process Shadow Policies", "type": TaskType.SHADOW_POLICY_PROCESSING},
+            {"name": "Download Rules", "type": TaskType.RULE_DOWNLOAD}
+        ]
+    },
     {
         "name": "Block Impact Analysis",
         "tasks": [
@@ -0,0 +1,182 @@
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from collections import OrderedDict, Counter
+from array import array
+import base64
+import hashlib
+import json
+import threading
+
+from config import AppConfig
+from policy_table import PolicyTable
+
+# 서버 측 필터링을 지원하는 컬럼
+FILTER_COLUMNS = ("action", "vsys", "shadow_type", "risk_level", "firewall")
+
+def _search_text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return "\x1f".join(_search_text(item) for item in value)
+    if isinstance(value, dict):
+        return "\x1f".join(_search_text(item) for item in value.values())
+    return "" if value is None else str(value).lower()
+
+def _sort_key(value: Any) -> Tuple:
+    # None 은 항상 마지막, 타입이 섞인 컬럼도 비교 가능하도록 (타입 순위, 값) 으로 정렬
+    if value is None:
+        return (3, "")
+    if isinstance(value, bool):
+        return (0, int(value))
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, (list, tuple)):
+        return (1, ",".join(str(item) for item in value))
+    if isinstance(value, str) and value.isdigit():
+        # 숫자 문자열(seq 등)은 숫자 순서로 정렬
+        return (0, int(value))
+    return (2, str(value))
+
+def parse_sort(sort: Optional[str]) -> List[Tuple[str, bool]]:
+    """"-seq,rulename" 형식을 [(컬럼, 내림차순 여부), ...] 로 변환"""
+    keys = []
+    for part in (sort or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        descending = part.startswith("-")
+        keys.append((part.lstrip("+-"), descending))
+    return keys
+
+class ResultView:
+    """하나의 결과(행 목록)에 대한 필터/정렬 결과 캐시
+
+    조건별로 선택된 행 위치를 array 로 보관하므로 같은 조건의 다음 페이지는
+    전체 행 수와 무관하게 페이지 크기만큼만 처리한다.
+    """
+
+    def __init__(self, rows, max_selections: int = 16):
+        self.rows = rows if isinstance(rows, PolicyTable) else PolicyTable.from_policies(rows)
+        self.max_selections = max_selections
+        self._selections: "OrderedDict[str, Tuple[array, Dict[str, Dict[str, int]]]]" = OrderedDict()
+        self._columns: Dict[str, List[Any]] = {}
+        self._search_index: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    def _column(self, name: str) -> List[Any]:
+        if name not in self._columns:
+            if name in self.rows.columns:
+                self._columns[name] = self.rows.column(name)
+            else:
+                self._columns[name] = [None] * len(self.rows)
+        return self._columns[name]
+
+    def _search(self) -> List[str]:
+        if self._search_index is None:
+            self._search_index = [_search_text(list(row.values())) for row in self.rows]
+        return self._search_index
+
+    def select(self, filters: Dict[str, str], search: Optional[str], sort: List[Tuple[str, bool]]) -> Tuple[array, Dict[str, Dict[str, int]]]:
+        """조건에 맞는 행 위치(정렬 순서)와 컬럼별 값 개수를 반환"""
+        key = query_key(filters, search, sort)
+        with self._lock:
+            cached = self._selections.get(key)
+            if cached is not None:
+                self._selections.move_to_end(key)
+                return cached
+
+            positions = range(len(self.rows))
+            for name, expected in filters.items():
+                column = self._column(name)
+                positions = [
+                    index for index in positions
+                    if (expected in column[index] if isinstance(column[index], (list, tuple)) else str(column[index]) == expected)
+                ]
+            if search:
+                needle = search.lower()
+                texts = self._search()
+                positions = [index for index in positions if needle in texts[index]]
+
+            positions = list(positions)
+            # 안정 정렬이므로 뒤쪽 키부터 차례로 정렬
+            for name, descending in reversed(sort):
+                column = self._column(name)
+                positions.sort(key=lambda index: _sort_key(column[index]), reverse=descending)
+
+            facets = {}
+            for name in FILTER_COLUMNS:
+                if name in self.rows.columns:
+                    column = self._column(name)
+                    facets[name] = dict(Counter(str(column[index]) for index in positions))
+
+            selection = (array('Q', positions), facets)
+            self._selections[key] = selection
+            if len(self._selections) > self.max_selections:
+                self._selections.popitem(last=False)
+            return selection
+
+def query_key(filters: Dict[str, str], search: Optional[str], sort: List[Tuple[str, bool]]) -> str:
+    payload = json.dumps([sorted(filters.items()), search or "", sort], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+def encode_cursor(key: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"q": key, "o": offset}).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, key: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(payload["o"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if payload.get("q") != key:
+        raise ValueError("Cursor does not match the query")
+    return offset
+
+_views: "OrderedDict[str, ResultView]" = OrderedDict()
+_views_lock = threading.Lock()
+
+def get_result_view(source_key: Optional[str], load_rows: Callable[[], Any]) -> ResultView:
+    """결과별 ResultView (source_key 가 있으면 LRU 캐시 사용)"""
+    if source_key is None:
+        return ResultView(load_rows())
+    with _views_lock:
+        view = _views.get(source_key)
+        if view is not None:
+            _views.move_to_end(source_key)
+            return view
+    view = ResultView(load_rows())
+    with _views_lock:
+        _views[source_key] = view
+        while len(_views) > AppConfig.RESULT_VIEW_CACHE_SIZE:
+            _views.popitem(last=False)
+    return view
+
+def query_result(view: ResultView, filters: Optional[Dict[str, Optional[str]]] = None, search: Optional[str] = None,
+                 sort: Optional[str] = None, offset: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """결과의 한 페이지를 조회 (offset/limit 또는 cursor)"""
+    filters = {name: value for name, value in (filters or {}).items() if value is not None}
+    unknown = set(filters) - set(FILTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unsupported filter columns: {', '.join(sorted(unknown))}")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    limit = min(limit, AppConfig.RESULT_PAGE_MAX)
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+
+    sort_keys = parse_sort(sort)
+    key = query_key(filters, search, sort_keys)
+    if cursor:
+        offset = decode_cursor(cursor, key)
+
+    positions, facets = view.select(filters, search, sort_keys)
+    page = positions[offset:offset + limit]
+    next_offset = offset + len(page)
+
+    return {
+        "policies": [dict(view.rows[index]) for index in page],
+        "total": len(positions),
+        "total_unfiltered": len(view.rows),
+        "offset": offset,
+        "limit": limit,
+        "next_cursor": encode_cursor(key, next_offset) if next_offset < len(positions) else None,
+        "facets": facets
+    }
@@ -0,0 +1,143 @@
+from typing import Dict, Any, Optional, Iterable, Iterator, Tuple
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+import gzip
+import json
+import logging
+import os
+import tempfile
+from uuid import uuid4
+
+from policy_table import PolicyTable, policy_json_default
+
+# 결과 디렉토리 구성
+#   result.<id>.ndjson(.gz) : 정책 한 행당 한 줄 (기록할 때마다 새 파일)
+#   result.meta.json        : 행 이외의 필드, 형식 정보와 현재 행 파일 이름
+# 행 파일을 먼저 디스크에 기록한 뒤 meta 를 교체하는 것이 완료 시점이므로, 중간에 중단되어도
+# meta 는 항상 자신이 가리키는 행 파일과 짝을 이룬다. 이전 행 파일은 meta 교체 후 삭제한다.
+META_FILE = "result.meta.json"
+ROWS_FILE = "result.ndjson"
+LEGACY_FILE = "result.json"
+ROWS_KEY = "policies"
+
+def _rows_path(task_dir: Path, compress: bool) -> Path:
+    name = ROWS_FILE.replace(".", f".{uuid4().hex[:12]}.", 1)
+    return task_dir / (f"{name}.gz" if compress else name)
+
+def _is_rows_file(path: Path) -> bool:
+    return path.name.startswith("result.") and path.name.endswith((".ndjson", ".ndjson.gz"))
+
+def _fsync(path: str) -> None:
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+
+def _open_rows(path: Path, mode: str, compress: Optional[bool] = None):
+    if compress is None:
+        compress = path.suffix == '.gz'
+    if compress:
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def _atomic_target(task_dir: Path, target: Path):
+    fd, temp_path = tempfile.mkstemp(dir=task_dir, prefix=f".{target.name}.", suffix='.tmp')
+    os.close(fd)
+    return temp_path
+
+def split_result_data(data: Any, rows: Optional[Iterable] = None) -> Tuple[str, Dict[str, Any], Iterable]:
+    """결과 data 를 (layout, 행 이외의 필드, 행 목록) 으로 분리"""
+    if isinstance(data, (list, tuple, PolicyTable)):
+        return "list", {}, data
+    if isinstance(data, Mapping):
+        fields = {key: value for key, value in data.items() if key != ROWS_KEY}
+        if rows is None:
+            if ROWS_KEY not in data:
+                return "fields", fields, []
+            rows = data[ROWS_KEY] or []
+        return "dict", fields, rows
+    return "value", {"value": data}, []
+
+def write_result(task_dir: Path, data: Any, rows: Optional[Iterable] = None, compress: bool = True) -> Dict[str, Any]:
+    """결과를 NDJSON 으로 스트리밍 기록 (임시 파일에 쓴 뒤 rename)
+
+    rows 를 지정하면 data 의 정책 목록 대신 사용한다 (스냅샷/아티팩트 참조를 순회하며 기록).
+    """
+    task_dir.mkdir(parents=True, exist_ok=True)
+    layout, fields, rows = split_result_data(data, rows)
+    rows_path = _rows_path(task_dir, compress)
+
+    temp_rows = _atomic_target(task_dir, rows_path)
+    temp_meta = _atomic_target(task_dir, task_dir / META_FILE)
+    try:
+        count = 0
+        with _open_rows(Path(temp_rows), 'wt', compress) as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':'), default=policy_json_default))
+                f.write('\n')
+                count += 1
+
+        meta = {
+            "format": "ndjson",
+            "compression": "gzip" if compress else None,
+            "layout": layout,
+            "rows_file": rows_path.name,
+            "row_count": count,
+            "fields": fields,
+            "saved_at": datetime.now().isoformat()
+        }
+        meta["rows_size"] = os.path.getsize(temp_rows)
+        with open(temp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=policy_json_default)
+
+        # 행 파일이 디스크에 기록된 뒤에 meta 를 교체 (meta 교체가 완료 시점)
+        _fsync(temp_rows)
+        os.replace(temp_rows, rows_path)
+        _fsync(temp_meta)
+        os.replace(temp_meta, task_dir / META_FILE)
+    except Exception:
+        for path in (temp_rows, temp_meta):
+            if os.path.exists(path):
+                os.unlink(path)
+        raise
+
+    # 이전 결과의 행 파일과 이전 형식의 결과 파일 정리 (읽는 중이라 지울 수 없으면 다음 기록 때 정리)
+    for stale in [*filter(_is_rows_file, task_dir.iterdir()), task_dir / LEGACY_FILE]:
+        if stale != rows_path and stale.exists():
+            try:
+                stale.unlink()
+            except OSError as e:
+                logging.warning(f"Could not remove old result file {stale}: {str(e)}")
+
+    logging.info(f"Saved result to {rows_path} ({count} rows)")
+    return meta
+
+def read_result_meta(task_dir: Path) -> Optional[Dict[str, Any]]:
+    """완료된 결과의 meta (행 파일이 없거나 크기가 기록과 다르면 None)"""
+    meta_path = task_dir / META_FILE
+    if not meta_path.exists():
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    rows_path = task_dir / meta["rows_file"]
+    expected = meta.get("rows_size")
+    if not rows_path.exists() or (expected is not None and rows_path.stat().st_size != expected):
+        logging.warning(f"Ignoring incomplete result in {task_dir}: rows file does not match its meta")
+        return None
+    return meta
+
+def iter_result_rows(task_dir: Path, meta: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """결과 행을 한 줄씩 읽어 반환 (파일 전체를 메모리에 올리지 않음)"""
+    with _open_rows(task_dir / meta["rows_file"], 'rt') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def assemble_result(meta: Dict[str, Any], rows: Iterable) -> Any:
+    """write_result 에 전달된 data 형태로 복원"""
+    if meta["layout"] == "list":
+        return list(rows)
+    if meta["layout"] == "value":
+        return meta["fields"].get("value")
+    if meta["layout"] == "fields":
+        return dict(meta["fields"])
+    return {**meta["fields"], ROWS_KEY: list(rows)}
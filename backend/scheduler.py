@@ -0,0 +1,137 @@
+from typing import Optional, Callable, Awaitable, FrozenSet
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import random
+
+# 겹침 처리: 이전 실행이 끝나지 않았을 때 이번 실행을 건너뛰거나(skip) 끝난 뒤 한 번으로 합쳐 실행(coalesce)
+OVERLAP_SKIP = "skip"
+OVERLAP_COALESCE = "coalesce"
+OVERLAP_POLICIES = (OVERLAP_SKIP, OVERLAP_COALESCE)
+
+# overlap_action 결과
+ACTION_RUN = "run"
+ACTION_SKIP = "skip"
+ACTION_DEFER = "defer"
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *"
+}
+
+class CronExpression:
+    """5필드 cron 식 (분 시 일 월 요일)
+
+    각 필드는 *, 숫자, 범위(a-b), 목록(a,b), 간격(*/n, a-b/n)을 지원한다. 요일은 0(또는 7)이 일요일.
+    일과 요일이 모두 지정되면 둘 중 하나만 맞아도 실행한다 (cron 과 동일).
+    """
+
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        parts = CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(parts) != 5:
+            raise ValueError(f"Invalid cron expression '{expression}': expected 5 fields")
+        values = [self._parse_field(part, name, low, high) for part, (name, low, high) in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(part: str, name: str, low: int, high: int) -> FrozenSet[int]:
+        values = set()
+        try:
+            for item in part.split(","):
+                base, _, step_text = item.partition("/")
+                step = int(step_text) if step_text else 1
+                if base == "*":
+                    start, end = low, high
+                elif "-" in base:
+                    start, end = (int(value) for value in base.split("-", 1))
+                else:
+                    start = int(base)
+                    end = high if step_text else start
+                if step < 1 or start < low or end > high or start > end:
+                    raise ValueError
+                values.update(range(start, end + 1, step))
+        except ValueError:
+            raise ValueError(f"Invalid cron {name} field: '{part}'")
+        return frozenset(values)
+
+    def _day_matches(self, value: datetime) -> bool:
+        day = value.day in self.days
+        weekday = (value.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def matches(self, value: datetime) -> bool:
+        return (value.minute in self.minutes and value.hour in self.hours
+                and value.month in self.months and self._day_matches(value))
+
+    def next_after(self, value: datetime) -> datetime:
+        """value 이후 처음으로 일치하는 시각 (분 단위)"""
+        candidate = value.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                # 다음 달 1일 0시로 이동
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+def next_run_time(cron: str, after: datetime, jitter_seconds: float = 0.0,
+                  rng: Optional[random.Random] = None) -> datetime:
+    """다음 실행 시각 (같은 시각에 몰리지 않도록 0~jitter_seconds 초의 임의 지연 추가)"""
+    scheduled = CronExpression(cron).next_after(after)
+    if jitter_seconds > 0:
+        scheduled += timedelta(seconds=(rng or random).uniform(0, jitter_seconds))
+    return scheduled
+
+def overlap_action(due: bool, pending: bool, running: bool, policy: str) -> Optional[str]:
+    """실행 시각 도래 여부, 합쳐진 실행 대기 여부, 이전 실행 진행 여부로 이번 틱의 동작 결정"""
+    if running:
+        if not due:
+            return None
+        return ACTION_DEFER if policy == OVERLAP_COALESCE else ACTION_SKIP
+    if due or pending:
+        return ACTION_RUN
+    return None
+
+class Scheduler:
+    """일정 간격으로 tick(now) 을 호출하는 백그라운드 루프"""
+
+    def __init__(self, interval: float, tick: Callable[[datetime], Awaitable[None]]):
+        self.interval = interval
+        self.tick = tick
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logging.info(f"Scheduler started (interval {self.interval}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick(datetime.now())
+            except Exception as e:
+                logging.error(f"Scheduler tick failed: {str(e)}")
+            await asyncio.sleep(self.interval)
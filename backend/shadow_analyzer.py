@@ -0,0 +1,475 @@
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+import asyncio
+import heapq
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # bitmap 엔진에서만 필요
+    np = None
+
+from utils.range_utils import (
+    Range,
+    IPV4_BITS,
+    IPV6_BITS,
+    SERVICE_BITS,
+    address_to_range,
+    service_to_range,
+    addresses_to_ranges,
+    services_to_ranges,
+    complement_ranges,
+    ranges_overlap,
+    range_overlaps_any,
+    range_to_prefixes,
+    service_range_to_prefixes
+)
+from job_engine import TaskCancelled, check_cancelled, cancel_reason
+
+DEFAULT_ENGINE = "index"
+DISABLED_VALUES = frozenset({"false", "no", "disable", "disabled", "0"})
+NEGATED_VALUES = frozenset({"true", "yes", "1"})
+
+def is_enabled(policy: Dict[str, Any]) -> bool:
+    value = policy.get('enable', True)
+    return value is not False and str(value).strip().lower() not in DISABLED_VALUES
+
+def is_negated(value: Any) -> bool:
+    """negate_source/negate_destination 값이 설정되어 있는지"""
+    return value is True or str(value).strip().lower() in NEGATED_VALUES
+
+class RuleRanges:
+    """정책 한 개의 출발지/목적지/서비스 정수 구간"""
+    __slots__ = ("source", "destination", "service")
+
+    def __init__(self, source: List[Range], destination: List[Range], service: List[Range]):
+        self.source = source
+        self.destination = destination
+        self.service = service
+
+    @classmethod
+    def from_values(cls, source: Optional[List[str]], destination: Optional[List[str]], service: Optional[List[str]],
+                    negate_source: Any = False, negate_destination: Any = False) -> "RuleRanges":
+        """부정된 출발지/목적지는 객체가 덮지 않는 IP 구간으로 변환 (부정된 any 는 빈 목록으로 어떤 정책과도 겹치지 않음)"""
+        source_ranges = addresses_to_ranges(source or ['any'])
+        destination_ranges = addresses_to_ranges(destination or ['any'])
+        return cls(
+            complement_ranges(source_ranges) if is_negated(negate_source) else source_ranges,
+            complement_ranges(destination_ranges) if is_negated(negate_destination) else destination_ranges,
+            services_to_ranges(service or ['any'])
+        )
+
+    @classmethod
+    def from_policy(cls, policy: Dict[str, Any]) -> "RuleRanges":
+        return cls.from_values(
+            policy.get('source'), policy.get('destination'), policy.get('service'),
+            policy.get('negate_source', False), policy.get('negate_destination', False)
+        )
+
+class PrefixIndex:
+    """정수 구간을 접두사 단위로 저장하는 prefix-trie 인덱스
+
+    트라이의 각 레벨을 (space, prefixlen) 별 정렬 테이블로 펼쳐서 저장한다.
+    상위 접두사(포함하는 쪽)는 마스킹 조회로, 하위 접두사(포함되는 쪽)는
+    이진 탐색으로 찾는다. 접두사로 분해되지 않는 구간(이름 객체)은 값이
+    같은 경우에만 겹치는 것으로 본다.
+    """
+
+    def __init__(self, decompose: Callable[[Range], Tuple[Tuple[int, int, int], ...]], space_bits: Dict[int, int]):
+        self.decompose = decompose
+        self.space_bits = space_bits
+        self.any_postings: List[int] = []
+        self.named: Dict[int, List[int]] = defaultdict(list)
+        self.levels: Dict[Tuple[int, int], Dict[int, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self.sorted_levels: Dict[Tuple[int, int], List[int]] = {}
+        self.lengths: Dict[int, List[int]] = {}
+
+    def add(self, position: int, ranges: List[Range]) -> None:
+        for target in ranges:
+            prefixes = self.decompose(target)
+            if not prefixes:
+                self._append(self.named[target[0]], position)
+                continue
+            for space, prefixlen, network in prefixes:
+                if space == 0:
+                    self._append(self.any_postings, position)
+                else:
+                    self._append(self.levels[(space, prefixlen)][network], position)
+
+    @staticmethod
+    def _append(postings: List[int], position: int) -> None:
+        if not postings or postings[-1] != position:
+            postings.append(position)
+
+    def freeze(self) -> None:
+        """조회 전 레벨별 정렬 테이블 구성"""
+        self.sorted_levels = {key: sorted(table) for key, table in self.levels.items()}
+        lengths = defaultdict(list)
+        for space, prefixlen in self.levels:
+            lengths[space].append(prefixlen)
+        self.lengths = {space: sorted(values) for space, values in lengths.items()}
+
+    def query(self, ranges: List[Range]) -> Optional[List[List[int]]]:
+        """구간 목록과 겹치는 정책들의 posting 목록 반환 (전체와 겹치면 None)"""
+        if not ranges:
+            # 부정된 any 처럼 일치하는 구간이 없으면 어떤 정책과도 겹치지 않음
+            return []
+        postings = [self.any_postings] if self.any_postings else []
+        for target in ranges:
+            prefixes = self.decompose(target)
+            if not prefixes:
+                if target[0] in self.named:
+                    postings.append(self.named[target[0]])
+                continue
+            for space, prefixlen, network in prefixes:
+                if space == 0:
+                    return None
+                bits = self.space_bits[space]
+                size = 1 << (bits - prefixlen)
+                for length in self.lengths.get(space, []):
+                    table = self.levels[(space, length)]
+                    if length <= prefixlen:
+                        # 상위(포함) 접두사
+                        shift = bits - length
+                        match = table.get((network >> shift) << shift)
+                        if match:
+                            postings.append(match)
+                    else:
+                        # 하위(포함되는) 접두사
+                        keys = self.sorted_levels[(space, length)]
+                        lo = bisect_left(keys, network)
+                        hi = bisect_left(keys, network + size)
+                        postings.extend(table[key] for key in keys[lo:hi])
+        return postings
+
+def address_prefix_index() -> PrefixIndex:
+    return PrefixIndex(range_to_prefixes, {4: IPV4_BITS, 6: IPV6_BITS})
+
+def service_prefix_index() -> PrefixIndex:
+    return PrefixIndex(service_range_to_prefixes, {1: SERVICE_BITS})
+
+def _iter_from(posting: List[int], offset: int):
+    for index in range(offset, len(posting)):
+        yield posting[index]
+
+def _merge_after(postings: List[List[int]], position: int):
+    """posting 목록들을 position 이후 위치부터 오름차순으로 병합 (중복 제거)"""
+    streams = []
+    for posting in postings:
+        offset = bisect_right(posting, position)
+        if offset < len(posting):
+            streams.append(_iter_from(posting, offset))
+    previous = None
+    for candidate in heapq.merge(*streams):
+        if candidate != previous:
+            previous = candidate
+            yield candidate
+
+def _remaining(postings: List[List[int]], position: int) -> int:
+    return sum(len(posting) - bisect_right(posting, position) for posting in postings)
+
+class RuleRangeIndex:
+    """정책 집합(전체 또는 일부 위치)에 대한 출발지/목적지/서비스 인덱스"""
+
+    def __init__(self, rules: List[RuleRanges], positions: Optional[List[int]] = None):
+        self.rules = rules
+        self.positions = sorted(positions) if positions is not None else list(range(len(rules)))
+        self.indexes = (
+            ("destination", address_prefix_index()),
+            ("source", address_prefix_index()),
+            ("service", service_prefix_index())
+        )
+        for position in self.positions:
+            rule = rules[position]
+            for dimension, index in self.indexes:
+                index.add(position, getattr(rule, dimension))
+        for _, index in self.indexes:
+            index.freeze()
+
+    def first_overlap(self, rule: RuleRanges, position: int) -> Optional[int]:
+        """position 이후의 인덱스된 정책 중 rule 과 처음으로 겹치는 정책 위치"""
+        # 가장 후보가 적은 차원을 골라 후보를 생성하고 나머지 차원은 구간 비교로 검증
+        candidates = []
+        for dimension, index in self.indexes:
+            postings = index.query(getattr(rule, dimension))
+            if postings is not None:
+                candidates.append((_remaining(postings, position), dimension, postings))
+
+        if not candidates:
+            offset = bisect_right(self.positions, position)
+            return self.positions[offset] if offset < len(self.positions) else None
+
+        _, selected, postings = min(candidates, key=lambda item: item[0])
+        checks = [dimension for dimension in ("source", "destination", "service") if dimension != selected]
+        for candidate in _merge_after(postings, position):
+            other = self.rules[candidate]
+            if all(ranges_overlap(getattr(rule, dimension), getattr(other, dimension)) for dimension in checks):
+                return candidate
+        return None
+
+    def overlaps(self, rule: RuleRanges) -> List[int]:
+        """인덱스된 정책 중 rule 과 세 차원 모두 겹치는 정책 위치 (오름차순)"""
+        candidates = []
+        for dimension, index in self.indexes:
+            postings = index.query(getattr(rule, dimension))
+            if postings is not None:
+                candidates.append((_remaining(postings, -1), dimension, postings))
+
+        if not candidates:
+            return list(self.positions)
+
+        _, selected, postings = min(candidates, key=lambda item: item[0])
+        checks = [dimension for dimension in ("source", "destination", "service") if dimension != selected]
+        return [
+            candidate for candidate in _merge_after(postings, -1)
+            if all(ranges_overlap(getattr(rule, dimension), getattr(self.rules[candidate], dimension)) for dimension in checks)
+        ]
+
+def find_first_overlaps_index(rules: List[RuleRanges], limit: Optional[int] = None) -> List[Optional[int]]:
+    """인덱스 기반 엔진: 각 정책과 처음으로 겹치는 이후 정책의 위치 계산
+
+    limit 이 주어지면 앞쪽 limit 개 정책에 대해서만 계산한다 (샤드 실행용).
+    """
+    index = RuleRangeIndex(rules)
+    count = len(rules) if limit is None else min(limit, len(rules))
+    return [index.first_overlap(rules[position], position) for position in range(count)]
+
+def find_first_overlaps_naive(rules: List[RuleRanges], limit: Optional[int] = None) -> List[Optional[int]]:
+    """기준 엔진: 모든 이후 정책과 구간을 직접 비교 (검증 및 비교용)"""
+    count = len(rules) if limit is None else min(limit, len(rules))
+    results: List[Optional[int]] = [None] * count
+    for position in range(count):
+        rule = rules[position]
+        for candidate in range(position + 1, len(rules)):
+            other = rules[candidate]
+            if (ranges_overlap(rule.source, other.source) and
+                ranges_overlap(rule.destination, other.destination) and
+                ranges_overlap(rule.service, other.service)):
+                results[position] = candidate
+                break
+    return results
+
+class ObjectBitmap:
+    """한 차원(출발지/목적지/서비스)의 객체를 비트 컬럼으로 인코딩한 행렬
+
+    rows[i] 는 정책 i 가 사용하는 객체의 packed bit 행이고, closure(i) 는 정책 i 의
+    객체와 겹치는 모든 객체의 bit 행이다. 두 정책이 이 차원에서 겹치는지는
+    rows[j] & closure(i) 가 0이 아닌지로 판단한다.
+    행렬은 처음부터 packed(uint8) 형태로 만들고, closure 는 필요할 때 계산하여 보관하지 않는다.
+    """
+
+    def __init__(self, rule_ranges: List[List[Range]]):
+        object_ids: Dict[Range, int] = {}
+        self.rule_objects: List[List[int]] = []
+        for ranges in rule_ranges:
+            self.rule_objects.append([object_ids.setdefault(target, len(object_ids)) for target in ranges])
+
+        objects = sorted(object_ids, key=object_ids.get)
+        # 구간 끝점을 순위로 압축하여 int64 범위에서 비교 (IPv6 정수는 int64 범위를 넘음)
+        points = sorted({value for target in objects for value in target})
+        rank = {value: position for position, value in enumerate(points)}
+        self.starts = np.array([rank[start] for start, _ in objects], dtype=np.int64)
+        self.ends = np.array([rank[end] for _, end in objects], dtype=np.int64)
+
+        # 정책별 객체 번호의 bit 를 packbits 와 같은 순서(상위 bit 부터)로 직접 설정
+        positions = np.repeat(np.arange(len(rule_ranges)), [len(ids) for ids in self.rule_objects])
+        ids = np.fromiter((object_id for ids in self.rule_objects for object_id in ids), dtype=np.int64, count=len(positions))
+        self.rows = np.zeros((len(rule_ranges), (len(objects) + 7) // 8), dtype=np.uint8)
+        np.bitwise_or.at(self.rows, (positions, ids >> 3), (0x80 >> (ids & 7)).astype(np.uint8))
+
+    def closure(self, position: int):
+        overlaps = np.zeros(len(self.starts), dtype=bool)
+        for object_id in self.rule_objects[position]:
+            overlaps |= (self.starts <= self.ends[object_id]) & (self.ends >= self.starts[object_id])
+        return np.packbits(overlaps)
+
+def find_first_overlaps_bitmap(rules: List[RuleRanges], limit: Optional[int] = None,
+                               initial_block: int = 64, max_block: int = 65536) -> List[Optional[int]]:
+    """NumPy bitmap 엔진: 이후 정책 블록 전체에 대해 한 번의 AND + any 로 겹침 확인"""
+    if np is None:
+        raise RuntimeError("NumPy is required for the bitmap shadow analysis engine")
+
+    bitmaps = [
+        ObjectBitmap([rule.source for rule in rules]),
+        ObjectBitmap([rule.destination for rule in rules]),
+        ObjectBitmap([rule.service for rule in rules])
+    ]
+
+    count = len(rules)
+    results: List[Optional[int]] = [None] * (count if limit is None else min(limit, count))
+    for position in range(min(len(results), count - 1)):
+        closures = [bitmap.closure(position) for bitmap in bitmaps]
+        block_start = position + 1
+        block_size = initial_block
+        while block_start < count:
+            block_end = min(block_start + block_size, count)
+            hits = np.ones(block_end - block_start, dtype=bool)
+            for bitmap, closure in zip(bitmaps, closures):
+                hits &= (bitmap.rows[block_start:block_end] & closure).any(axis=1)
+            if hits.any():
+                results[position] = block_start + int(hits.argmax())
+                break
+            block_start = block_end
+            block_size = min(block_size * 2, max_block)
+
+    return results
+
+# Shadow 분석 엔진 등록
+SHADOW_ENGINES: Dict[str, Callable[..., List[Optional[int]]]] = {
+    "index": find_first_overlaps_index,
+    "bitmap": find_first_overlaps_bitmap,
+    "naive": find_first_overlaps_naive
+}
+
+# 샤드 하나: (vsys 그룹의 정책 위치 목록, 그룹 내 시작 위치, 그룹 내 종료 위치)
+ShadowShard = Tuple[List[int], int, int]
+
+def _get_engine(engine: Optional[str]) -> Callable[..., List[Optional[int]]]:
+    engine_name = engine or DEFAULT_ENGINE
+    finder = SHADOW_ENGINES.get(engine_name)
+    if finder is None:
+        raise ValueError(f"Unknown shadow analysis engine: {engine_name}")
+    return finder
+
+def plan_shadow_shards(policies: List[Dict[str, Any]], shard_count: int = 1, min_shard_size: int = 1) -> List[ShadowShard]:
+    """vsys 그룹별로 활성 정책을 연속 구간 샤드로 분할
+
+    서로 다른 vsys의 정책은 비교하지 않으므로 샤드는 그룹 경계를 넘지 않는다.
+    비활성 정책은 트래픽을 처리하지 않으므로 분석 대상과 겹침 후보에서 모두 제외한다.
+    """
+    groups: Dict[Any, List[int]] = defaultdict(list)
+    for position, policy in enumerate(policies):
+        if is_enabled(policy):
+            groups[policy.get('vsys')].append(position)
+
+    active = sum(len(positions) for positions in groups.values())
+    shard_size = max(min_shard_size, -(-active // max(shard_count, 1)), 1)
+    shards = []
+    for positions in groups.values():
+        for start in range(0, len(positions), shard_size):
+            shards.append((positions, start, min(start + shard_size, len(positions))))
+    return shards
+
+# 샤드 실행에 필요한 정책 필드 (RuleRanges.from_values 인자 순서)
+SHARD_FIELDS = ("source", "destination", "service", "negate_source", "negate_destination")
+
+def shard_rows(policies: List[Dict[str, Any]], shard: ShadowShard) -> List[Tuple[Any, ...]]:
+    """샤드 실행에 필요한 최소 필드만 추출 (샤드 시작 위치 이후 정책 전체)"""
+    positions, start, _ = shard
+    return [tuple(policies[position].get(field) for field in SHARD_FIELDS) for position in positions[start:]]
+
+def run_shadow_shard(rows: List[Tuple[Any, ...]], limit: int, engine: Optional[str] = None) -> List[Optional[int]]:
+    """샤드 하나를 분석 (프로세스 풀 워커에서 실행 가능한 모듈 수준 함수)"""
+    finder = _get_engine(engine)
+    rules = [RuleRanges.from_values(*row) for row in rows]
+    return finder(rules, limit)
+
+def merge_shadow_shards(shards: List[ShadowShard], shard_results: List[List[Optional[int]]]) -> List[Tuple[int, int]]:
+    """샤드별 결과(샤드 내 상대 위치)를 전체 정책 위치 쌍으로 병합"""
+    pairs = []
+    for (positions, start, _), matches in zip(shards, shard_results):
+        for local, match in enumerate(matches):
+            if match is not None:
+                pairs.append((positions[start + local], positions[start + match]))
+    pairs.sort()
+    return pairs
+
+def find_shadow_pairs(policies: List[Dict[str, Any]], engine: Optional[str] = None) -> List[Tuple[int, int]]:
+    """(정책 위치, 겹치는 첫 이후 정책 위치) 쌍 목록 계산
+
+    서로 다른 vsys의 정책과 비활성 정책은 비교하지 않는다.
+    """
+    _get_engine(engine)
+    shards = plan_shadow_shards(policies)
+    results = [run_shadow_shard(shard_rows(policies, shard), shard[2] - shard[1], engine) for shard in shards]
+    return merge_shadow_shards(shards, results)
+
+async def find_shadow_pairs_sharded(policies: List[Dict[str, Any]], engine: Optional[str], executor,
+                                    min_shard_size: int = 1,
+                                    on_progress: Optional[Callable[[int, int], None]] = None,
+                                    shard_count: Optional[int] = None,
+                                    completed_shards: Optional[Dict[int, List[Optional[int]]]] = None,
+                                    on_shard: Optional[Callable[[int, List[Optional[int]]], None]] = None) -> List[Tuple[int, int]]:
+    """분석 실행기(executor)의 워커 수(또는 shard_count)만큼 샤드를 나누어 병렬로 계산
+
+    on_progress(완료된 정책 수, 지금까지 찾은 shadow 쌍 수) 는 샤드가 끝날 때마다 호출된다.
+    completed_shards 에 이전 실행에서 끝난 샤드의 결과를 주면 그 샤드는 다시 계산하지 않으며,
+    on_shard(샤드 번호, 결과) 로 끝난 샤드를 체크포인트에 기록할 수 있다.
+    """
+    _get_engine(engine)
+    shards = plan_shadow_shards(policies, shard_count or executor.workers, min_shard_size)
+    finished: Dict[int, List[Optional[int]]] = {
+        index: result for index, result in (completed_shards or {}).items() if 0 <= index < len(shards)
+    }
+    completed = {
+        "rules": sum(shards[index][2] - shards[index][1] for index in finished),
+        "pairs": sum(1 for result in finished.values() for match in result if match is not None)
+    }
+
+    async def run_shard(index: int, shard: ShadowShard) -> List[Optional[int]]:
+        if index in finished:
+            return finished[index]
+        check_cancelled()
+        result = await executor.run(run_shadow_shard, shard_rows(policies, shard), shard[2] - shard[1], engine)
+        finished[index] = result
+        completed["rules"] += shard[2] - shard[1]
+        completed["pairs"] += sum(1 for match in result if match is not None)
+        if on_shard is not None:
+            on_shard(index, result)
+        if on_progress is not None:
+            on_progress(completed["rules"], completed["pairs"])
+        check_cancelled()
+        return result
+
+    try:
+        results = await asyncio.gather(*(run_shard(index, shard) for index, shard in enumerate(shards)))
+    except (asyncio.CancelledError, TaskCancelled) as e:
+        reason = e.reason if isinstance(e, TaskCancelled) else cancel_reason()
+        if reason is None:
+            # 취소 요청 없이 중단됨 (서버 종료) - 끝난 샤드는 체크포인트에서 이어받음
+            raise
+        # 끝난 샤드의 결과를 부분 결과로 전달
+        done = sorted(finished)
+        pairs = merge_shadow_shards([shards[index] for index in done], [finished[index] for index in done])
+        raise TaskCancelled(reason, partial={"pairs": pairs, "rules_compared": completed["rules"]}) from None
+    logging.info(f"Shadow analysis finished: {len(policies)} rules in {len(shards)} shards")
+    return merge_shadow_shards(shards, results)
+
+def _overlapping_objects(values: List[str], other_ranges: List[Range], to_range: Callable[[str], Range]) -> List[str]:
+    return [value for value in values if range_overlaps_any(to_range(value), other_ranges)]
+
+def _overlapping_addresses(policy: Dict[str, Any], other_ranges: List[Range], field: str) -> List[str]:
+    values = policy.get(field) or ['any']
+    if is_negated(policy.get(f'negate_{field}', False)):
+        # 부정된 객체는 '!객체' 로 표시 (객체 밖의 주소가 겹침)
+        return [f"!{value}" for value in values] if ranges_overlap(complement_ranges(addresses_to_ranges(values)), other_ranges) else []
+    return _overlapping_objects(values, other_ranges, address_to_range)
+
+def overlap_details(policy: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, List[str]]:
+    """policy 의 객체 중 other 와 겹치는 출발지/목적지/서비스 객체"""
+    other_ranges = RuleRanges.from_policy(other)
+    return {
+        "overlapping_sources": _overlapping_addresses(policy, other_ranges.source, 'source'),
+        "overlapping_destinations": _overlapping_addresses(policy, other_ranges.destination, 'destination'),
+        "overlapping_services": _overlapping_objects(
+            policy.get('service') or ['any'], other_ranges.service, service_to_range)
+    }
+
+def build_shadow_entry(policy: Dict[str, Any], shadowing_policy: Dict[str, Any]) -> Dict[str, Any]:
+    """PolicyTable에서 사용하는 shadow 결과 형태로 변환"""
+    shadow_type = "Redundant" if policy['action'] == shadowing_policy['action'] else "Conflicting"
+    return {
+        **policy,
+        "shadowed_by": shadowing_policy['rulename'],
+        "shadowed_rule_number": shadowing_policy['seq'],
+        "shadow_type": shadow_type,
+        "shadow_details": overlap_details(policy, shadowing_policy)
+    }
+
+def build_shadow_entries(policies: List[Dict[str, Any]], pairs: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    return [build_shadow_entry(policies[position], policies[match]) for position, match in pairs]
+
+def analyze_shadow_policies(policies: List[Dict[str, Any]], engine: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Shadow 정책 분석 (CIDR/포트 범위 기반)"""
+    return build_shadow_entries(policies, find_shadow_pairs(policies, engine))
@@ -0,0 +1,242 @@
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+
+from shadow_analyzer import RuleRanges, RuleRangeIndex, is_enabled, is_negated
+from job_engine import TaskCancelled, check_cancelled, cancel_reason
+
+DEFAULT_VSYS = "default"
+# 증분 분석은 변경된 정책만 인덱스(RuleRangeIndex)로 다시 조회하므로 index 엔진에서만 사용
+INCREMENTAL_ENGINE = "index"
+# 그룹 분석에 필요한 정책 필드 (워커 프로세스로 보낼 때 나머지 필드는 제외)
+INCREMENTAL_FIELDS = ("rulename", "source", "destination", "service", "negate_source", "negate_destination")
+
+def vsys_key(vsys: Any) -> str:
+    return str(vsys) if vsys not in (None, "") else DEFAULT_VSYS
+
+def match_fingerprint(policy: Dict[str, Any]) -> str:
+    """Shadow 판정에 영향을 주는 필드(출발지/목적지/서비스와 부정 여부)의 지문"""
+    fields = [sorted(policy.get(field) or ['any']) for field in ('source', 'destination', 'service')]
+    negated = [field for field in ('negate_source', 'negate_destination') if is_negated(policy.get(field, False))]
+    # 부정 필드가 없는 정책은 이전에 저장한 지문과 같은 값을 유지
+    payload = json.dumps(fields + [negated] if negated else fields, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def _longest_increasing_subsequence(values: List[int]) -> List[int]:
+    """증가 부분 수열을 이루는 원소의 인덱스 목록 (순서가 유지된 정책 판별용)"""
+    tails: List[int] = []
+    tail_indexes: List[int] = []
+    parents = [-1] * len(values)
+    for index, value in enumerate(values):
+        offset = bisect_left(tails, value)
+        if offset == len(tails):
+            tails.append(value)
+            tail_indexes.append(index)
+        else:
+            tails[offset] = value
+            tail_indexes[offset] = index
+        parents[index] = tail_indexes[offset - 1] if offset > 0 else -1
+
+    result = []
+    index = tail_indexes[-1] if tail_indexes else -1
+    while index != -1:
+        result.append(index)
+        index = parents[index]
+    return result[::-1]
+
+def _analyze_group(names: List[str], fingerprints: List[str], rules: List[RuleRanges],
+                   state: Optional[Dict[str, Any]]) -> Tuple[List[Optional[int]], Dict[str, Any]]:
+    """vsys 그룹 하나를 이전 분석 상태와 비교하여 변경된 정책이 관련된 쌍만 재계산"""
+    count = len(names)
+    old_names = [name for name, _ in (state or {}).get("rules", [])]
+    # 정책명이 중복되면 이전 상태와 정책을 짝지을 수 없으므로 (현재/이전 어느 쪽이든) 전체 재계산
+    if state is None or len(set(names)) != count or len(set(old_names)) != len(old_names):
+        index = RuleRangeIndex(rules)
+        results = [index.first_overlap(rules[position], position) for position in range(count)]
+        return results, {"mode": "full", "recomputed": count}
+
+    old_fingerprints = {name: fingerprint for name, fingerprint in state.get("rules", [])}
+    old_order = {name: position for position, (name, _) in enumerate(state.get("rules", []))}
+    old_matches = state.get("matches", {})
+
+    # 지문이 같은 정책 중 상대 순서가 유지된 정책만 "변경 없음"으로 취급
+    same = [position for position in range(count) if old_fingerprints.get(names[position]) == fingerprints[position]]
+    stable = {same[index] for index in _longest_increasing_subsequence([old_order[names[position]] for position in same])}
+    changed = [position for position in range(count) if position not in stable]
+
+    current = set(names)
+    summary = {
+        "mode": "incremental",
+        "added": sum(1 for name in names if name not in old_fingerprints),
+        "removed": sum(1 for name in old_fingerprints if name not in current),
+        "modified": sum(1 for position in range(count)
+                        if names[position] in old_fingerprints and position not in stable and
+                        old_fingerprints[names[position]] != fingerprints[position]),
+        "reordered": len(same) - len(stable)
+    }
+
+    local_positions = {name: position for position, name in enumerate(names)}
+    changed_index = RuleRangeIndex(rules, changed) if changed else None
+    results: List[Optional[int]] = [None] * count
+    full_queries = list(changed)
+
+    for position in sorted(stable):
+        old_match = old_matches.get(names[position])
+        match_position = None
+        if old_match is not None:
+            match_position = local_positions.get(old_match)
+            if match_position is None or match_position not in stable:
+                # 이전에 겹치던 정책이 삭제/변경/이동된 경우 전체 재계산
+                full_queries.append(position)
+                continue
+
+        # 변경되지 않은 정책 사이의 관계는 그대로이므로 변경된 정책과의 쌍만 비교
+        changed_match = changed_index.first_overlap(rules[position], position) if changed_index else None
+        candidates = [value for value in (changed_match, match_position) if value is not None]
+        results[position] = min(candidates) if candidates else None
+
+    if full_queries:
+        full_index = RuleRangeIndex(rules)
+        for position in full_queries:
+            results[position] = full_index.first_overlap(rules[position], position)
+
+    summary["recomputed"] = len(full_queries)
+    return results, summary
+
+def incremental_groups(policies: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """vsys 그룹별 활성 정책 위치 (비활성 정책은 Shadow 분석에서 제외)"""
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for position, policy in enumerate(policies):
+        if is_enabled(policy):
+            groups[vsys_key(policy.get('vsys'))].append(position)
+    return dict(groups)
+
+def group_rows(policies: List[Dict[str, Any]], positions: List[int]) -> List[Dict[str, Any]]:
+    """그룹 분석에 필요한 필드만 남긴 정책 목록"""
+    return [{field: policies[position].get(field) for field in INCREMENTAL_FIELDS} for position in positions]
+
+def analyze_incremental_group(rows: List[Dict[str, Any]],
+                              state: Optional[Dict[str, Any]]) -> Tuple[List[Optional[int]], Dict[str, Any]]:
+    """vsys 그룹 하나를 증분 분석 (프로세스 풀 워커에서 실행 가능한 모듈 수준 함수)"""
+    names = [row['rulename'] for row in rows]
+    fingerprints = [match_fingerprint(row) for row in rows]
+    rules = [RuleRanges.from_policy(row) for row in rows]
+    return _analyze_group(names, fingerprints, rules, state)
+
+def _group_pairs(positions: List[int], results: List[Optional[int]]) -> List[Tuple[int, int]]:
+    return [(positions[local], positions[match]) for local, match in enumerate(results) if match is not None]
+
+def _check_engine(engine: Optional[str]) -> None:
+    if (engine or INCREMENTAL_ENGINE) != INCREMENTAL_ENGINE:
+        raise ValueError(f"Incremental shadow analysis only supports the '{INCREMENTAL_ENGINE}' engine, not '{engine}'")
+
+def incremental_shadow_pairs(policies: List[Dict[str, Any]], states: Dict[str, Dict[str, Any]],
+                             engine: Optional[str] = None) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
+    """이전 분석 상태(vsys별)를 기준으로 Shadow 쌍을 증분 계산
+
+    index 엔진만 지원하며, 다른 엔진은 ValueError (호출자가 전체 분석을 수행해야 함).
+    """
+    _check_engine(engine)
+    pairs = []
+    summaries = {}
+    for key, positions in incremental_groups(policies).items():
+        results, summaries[key] = analyze_incremental_group(group_rows(policies, positions), states.get(key))
+        pairs.extend(_group_pairs(positions, results))
+
+    pairs.sort()
+    return pairs, summaries
+
+async def incremental_shadow_pairs_grouped(policies: List[Dict[str, Any]], states: Dict[str, Dict[str, Any]], executor,
+                                           engine: Optional[str] = None,
+                                           on_progress: Optional[Callable[[int, int], None]] = None
+                                           ) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
+    """vsys 그룹별 증분 분석을 분석 실행기(executor)에서 병렬로 계산
+
+    on_progress(완료된 정책 수, 지금까지 찾은 shadow 쌍 수) 는 그룹이 끝날 때마다 호출되며,
+    그룹 사이마다 취소 요청을 확인한다. 취소되면 끝난 그룹의 쌍을 부분 결과로 전달한다.
+    """
+    _check_engine(engine)
+    groups = incremental_groups(policies)
+    finished: Dict[str, Tuple[List[Tuple[int, int]], Dict[str, Any]]] = {}
+    completed = {"rules": 0, "pairs": 0}
+
+    async def run_group(key: str, positions: List[int]) -> None:
+        check_cancelled()
+        results, summary = await executor.run(analyze_incremental_group, group_rows(policies, positions), states.get(key))
+        finished[key] = (_group_pairs(positions, results), summary)
+        completed["rules"] += len(positions)
+        completed["pairs"] += len(finished[key][0])
+        if on_progress is not None:
+            on_progress(completed["rules"], completed["pairs"])
+        check_cancelled()
+
+    try:
+        await asyncio.gather(*(run_group(key, positions) for key, positions in groups.items()))
+    except (asyncio.CancelledError, TaskCancelled) as e:
+        reason = e.reason if isinstance(e, TaskCancelled) else cancel_reason()
+        if reason is None:
+            raise
+        pairs = sorted(pair for group_pairs, _ in finished.values() for pair in group_pairs)
+        raise TaskCancelled(reason, partial={"pairs": pairs, "rules_compared": completed["rules"]}) from None
+
+    pairs = sorted(pair for group_pairs, _ in finished.values() for pair in group_pairs)
+    return pairs, {key: finished[key][1] for key in groups}
+
+def build_shadow_states(policies: List[Dict[str, Any]], pairs: List[Tuple[int, int]]) -> Dict[str, Dict[str, Any]]:
+    """다음 증분 분석을 위해 저장할 vsys별 분석 상태 구성 (분석 대상인 활성 정책만)"""
+    matches = dict(pairs)
+    states: Dict[str, Dict[str, Any]] = {}
+    analyzed_at = datetime.now().isoformat()
+    for position, policy in enumerate(policies):
+        if not is_enabled(policy):
+            continue
+        key = vsys_key(policy.get('vsys'))
+        state = states.setdefault(key, {"vsys": key, "analyzed_at": analyzed_at, "rules": [], "matches": {}})
+        state["rules"].append([policy['rulename'], match_fingerprint(policy)])
+        if position in matches:
+            state["matches"][policy['rulename']] = policies[matches[position]]['rulename']
+    return states
+
+class ShadowStateStore:
+    """방화벽(IP)과 vsys 별 마지막 Shadow 분석 상태 저장소"""
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+
+    @staticmethod
+    def _safe(value: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', value)
+
+    def _path(self, ip: str, key: str) -> Path:
+        return self.base_dir / f"{self._safe(ip)}__{self._safe(key)}.json"
+
+    def load(self, ip: str) -> Dict[str, Dict[str, Any]]:
+        states = {}
+        for path in self.base_dir.glob(f"{self._safe(ip)}__*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                states[state["vsys"]] = state
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Ignoring unreadable shadow analysis state {path}: {str(e)}")
+        return states
+
+    def save(self, ip: str, states: Dict[str, Dict[str, Any]]) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.base_dir.glob(f"{self._safe(ip)}__*.json"):
+            if path.name not in {self._path(ip, key).name for key in states}:
+                path.unlink()
+        for key, state in states.items():
+            path = self._path(ip, key)
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({**state, "ip": ip}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, path)
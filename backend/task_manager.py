@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterator
 import asyncio
 from datetime import datetime
 from enum import Enum
@@ -7,9 +7,26 @@ import json
 import os
 from pathlib import Path
 import sys
-from firewall_client import FirewallClient
+import threading
+from firewall_session import get_session_pool
 from uuid import uuid4
 from config import AppConfig
+from shadow_analyzer import find_shadow_pairs_sharded, build_shadow_entries
+from impact_analyzer import (
+    BLOCK_MODES, block_targets, impact_rows, find_block_impacts, build_impact_entries, summarize_impacts
+)
+from shadow_incremental import ShadowStateStore, INCREMENTAL_ENGINE, incremental_shadow_pairs_grouped, build_shadow_states
+from executor import get_analysis_executor
+from policy_table import PolicyTable
+from policy_store import (
+    get_policy_store, resolve_policies,
+    policy_ref, policy_ref_count, find_ref_policies, iter_ref_policies
+)
+from result_writer import write_result, read_result_meta, iter_result_rows, assemble_result
+from job_engine import report_progress, ProgressStage, TaskCancelled, check_cancelled, load_checkpoint, save_checkpoint
+from artifact_store import get_artifact_store
+from upload_store import get_upload_store
+from paloalto_parser import load_paloalto_objects, iter_paloalto_rules
 import logging
 # 로깅 초기화
 AppConfig.init_logging()
@@ -28,6 +45,7 @@ class TaskType(str, Enum):
     FIREWALL_CONNECTION = "firewall_connection"
     FIREWALL_TYPE_SELECTION = "firewall_type_selection"
     CONFIG_IMPORT = "config_import"
+    CONFIG_FILE_IMPORT = "config_file_import"
     POLICY_PROCESSING = "policy_processing"
     SHADOW_POLICY_PROCESSING = "shadow_policy_processing"
     RULE_DOWNLOAD = "rule_download"
@@ -49,6 +67,7 @@ class InputFormat(str, Enum):
     FIREWALL_TYPE = "FIREWALL_TYPE"
     NONE = "NONE"
     TARGET_RULES = "TARGET-RULES"
+    CONFIG_FILE = "CONFIG-FILE"
 
 # 입력 필드 정의
 INPUT_FORMATS = {
@@ -72,6 +91,17 @@ INPUT_FORMATS = {
             }
         ]
     },
+    InputFormat.CONFIG_FILE: {
+        "fields": [
+            {
+                "name": "upload_id",
+                "type": "file",
+                "accept": ".xml",
+                "upload_url": "/uploads",
+                "placeholder": "PAN-OS configuration (running-config.xml)"
+            }
+        ]
+    },
     InputFormat.TARGET_RULES: {
         "fields": [
             {
@@ -83,10 +113,42 @@ INPUT_FORMATS = {
     }
 }
 
-class TaskManager:
-    # 클라이언트 인스턴스 저장을 위한 딕셔너리
-    firewall_clients = {}
+class _PageBridge:
+    """이벤트 루프의 비동기 페이지 스트림을 작업 스레드에서 한 건씩 읽도록 연결
+
+    close() 하면 스레드가 기다리던 페이지 요청을 취소하여 스레드 쪽 저장도 중단된다.
+    """
+
+    def __init__(self, pages: AsyncIterator[List[Dict[str, Any]]], loop: asyncio.AbstractEventLoop):
+        self.pages = pages
+        self.loop = loop
+        self.pending = None
+        self.closed = False
+        self.lock = threading.Lock()
+
+    async def _next_page(self) -> List[Dict[str, Any]]:
+        return await self.pages.__anext__()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            check_cancelled()
+            with self.lock:
+                if self.closed:
+                    raise TaskCancelled()
+                self.pending = asyncio.run_coroutine_threadsafe(self._next_page(), self.loop)
+            try:
+                page = self.pending.result()
+            except StopAsyncIteration:
+                return
+            yield from page
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            if self.pending is not None:
+                self.pending.cancel()
 
+class TaskManager:
     @staticmethod
     async def handle_firewall_type_selection(params: Dict[str, Any], previous_result: Dict[str, Any] = None) -> Dict[str, Any]:
         fw_type = params.get('type')
@@ -107,14 +169,11 @@ class TaskManager:
         ip = params.get('ip')
         id = params.get('id')
         pw = params.get('pw')
+        vendor = params.get('type') or ((previous_result or {}).get('data') or {}).get('firewall_type')
         
         try:
-            # FirewallClient 인스턴스 생성
-            client = FirewallClient(ip, id, pw)
-            await client.get_api_key()  # API 키 획득
-            
-            # 성공하면 클라이언트 저장
-            TaskManager.firewall_clients[ip] = client
+            # 같은 방화벽/사용자의 로그인 세션은 프로젝트 간에 공유 (없으면 로그인)
+            await get_session_pool().acquire(ip, id, pw, vendor)
             logging.info(f"Successfully connected to firewall at {ip}")
             
             return {
@@ -124,6 +183,7 @@ class TaskManager:
                     "connection_info": {
                         "ip": ip,
                         "id": id,
+                        "vendor": vendor,
                         "connected_at": datetime.now().isoformat()
                     }
                 }
@@ -136,8 +196,56 @@ class TaskManager:
                 "data": {}
             }
 
+    @staticmethod
+    def _resumed_import(connection_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """중단 전에 저장을 마친 스냅샷이 있으면 다시 가져오지 않고 그 결과를 반환"""
+        checkpoint = load_checkpoint() or {}
+        if not checkpoint.get('snapshot_id') or not get_policy_store().snapshot_info(checkpoint['snapshot_id']):
+            return None
+        logging.info(f"Resuming config import from snapshot {checkpoint['snapshot_id']}")
+        return {
+            "success": True,
+            "message": f"Successfully extracted {checkpoint['total_policies']} policies",
+            "data": {
+                "snapshot_id": checkpoint['snapshot_id'],
+                "total_policies": checkpoint['total_policies'],
+                "connection_info": connection_info,
+                "extracted_at": checkpoint['extracted_at']
+            }
+        }
+
+    @staticmethod
+    def _import_result(snapshot_id: str, connection_info: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+        """저장한 스냅샷으로 가져오기 결과를 만들고 체크포인트 기록"""
+        info = get_policy_store().snapshot_info(snapshot_id)
+        total = info["rule_count"]
+        extracted_at = datetime.now().isoformat()
+        save_checkpoint(
+            {"snapshot_id": snapshot_id, "total_policies": total, "extracted_at": extracted_at}, force=True
+        )
+
+        data = {
+            "snapshot_id": snapshot_id,
+            "total_policies": total,
+            "connection_info": connection_info,
+            "extracted_at": extracted_at,
+            **extra
+        }
+        if info["changes"] is not None:
+            # 이전 가져오기 대비 변경 내역 (델타 스냅샷)
+            data["changes"] = {"base_snapshot_id": info["base_id"], **info["changes"]}
+        return {
+            "success": True,
+            "message": f"Successfully extracted {total} policies",
+            "data": data
+        }
+
     @staticmethod
     async def handle_config_import(params: Dict[str, Any], previous_result: Dict[str, Any]) -> Dict[str, Any]:
+        if params.get('upload_id'):
+            # 업로드한 설정 파일에서 가져오기 (방화벽 연결 불필요)
+            return await TaskManager._import_config_file(params)
+
         if not previous_result or not previous_result.get('success'):
             logging.warning("Valid firewall connection required for config import")
             raise ValueError("Valid firewall connection required")
@@ -148,25 +256,63 @@ class TaskManager:
             raise ValueError("Connection information not found")
 
         ip = connection_info.get('ip')
-        client = TaskManager.firewall_clients.get(ip)
-        if not client:
-            logging.error("Firewall client not found")
-            raise ValueError("Firewall client not found")
+        resumed = TaskManager._resumed_import(connection_info)
+        if resumed is not None:
+            return resumed
 
         try:
-            # 저장된 클라이언트를 사용하여 정책 조회
-            policies = await client.get_policies()
-            logging.info(f"Successfully extracted {len(policies)} policies from firewall at {ip}")
-            
-            return {
-                "success": True,
-                "message": f"Successfully extracted {len(policies)} policies",
-                "data": {
-                    "policies": policies,
-                    "total_policies": len(policies),
-                    "extracted_at": datetime.now().isoformat()
-                }
-            }
+            # 공유 세션을 빌려 정책 조회 (조회 중에는 세션이 정리되지 않음)
+            async with get_session_pool().lease(ip, connection_info.get('id'), connection_info.get('vendor')) as client:
+                if client is None:
+                    logging.error("Firewall session not found")
+                    raise ValueError("Firewall session not found or expired, please reconnect")
+                report_progress(0.1, "Extracting policies", stage="fetch")
+                fetch_stage = ProgressStage("fetch", 0.1, 1.0, total=await client.count_policies())
+                fetched = 0
+                vsys_timings: Dict[str, Dict[str, Any]] = {}
+                if AppConfig.FIREWALL_VSYS_IMPORT and connection_info.get('vendor') == 'paloalto' \
+                        and len(await client.list_vsys()) > 1:
+                    # vsys 별 동시 조회 후 seq 순서로 병합
+                    policy_pages = client.iter_vsys_policy_pages(
+                        AppConfig.FIREWALL_PAGE_SIZE, AppConfig.FIREWALL_VSYS_CONCURRENCY,
+                        AppConfig.FIREWALL_PAGE_PREFETCH, vsys_timings
+                    )
+                else:
+                    policy_pages = client.iter_policy_pages(AppConfig.FIREWALL_PAGE_SIZE, AppConfig.FIREWALL_PAGE_PREFETCH)
+
+                async def pages():
+                    nonlocal fetched
+                    async for page in policy_pages:
+                        fetched += len(page)
+                        fetch_stage.update(fetched, f"Fetched {fetched} policies", rules_fetched=fetched)
+                        yield page
+
+                # 페이지가 도착하는 대로 스냅샷 테이블에 저장 (전체 목록을 메모리에 모으지 않음)
+                bridge = _PageBridge(pages(), asyncio.get_running_loop())
+                try:
+                    snapshot_id = await asyncio.to_thread(
+                        get_policy_store().save_snapshot, bridge, params.get('project_id'), ip,
+                        AppConfig.SNAPSHOT_DELTA_IMPORT
+                    )
+                finally:
+                    bridge.close()
+                # 방금 가져온 정책이 최신이므로 이전에 캐시한 조회 결과는 버림
+                client.invalidate_policy_cache()
+            logging.info(f"Successfully extracted {fetched} policies from firewall at {ip}")
+
+            extra: Dict[str, Any] = {}
+            if vsys_timings:
+                # vsys 별 조회 시간 (느린 vsys 확인용)
+                extra["vsys_timings"] = [
+                    {"vsys": vsys, **{key: round(value, 3) if isinstance(value, float) else value
+                                      for key, value in timing.items()}}
+                    for vsys, timing in vsys_timings.items()
+                ]
+                slowest = max(extra["vsys_timings"], key=lambda timing: timing["seconds"])
+                logging.info(f"Fetched {len(vsys_timings)} vsys from {ip}, slowest {slowest['vsys']} ({slowest['seconds']}s)")
+            return TaskManager._import_result(snapshot_id, connection_info, **extra)
+        except TaskCancelled:
+            raise
         except Exception as e:
             logging.error(f"Failed to import configuration: {str(e)}")
             return {
@@ -175,19 +321,69 @@ class TaskManager:
                 "data": {}
             }
 
+    @staticmethod
+    async def _import_config_file(params: Dict[str, Any]) -> Dict[str, Any]:
+        """업로드한 PAN-OS 설정 XML 에서 보안 정책 가져오기 (iterparse 로 스트리밍 파싱)"""
+        upload_store = get_upload_store()
+        upload = upload_store.info(params['upload_id'])
+        path = str(upload_store.path(params['upload_id']))
+        connection_info = {
+            "ip": params.get('ip'),
+            "vendor": "paloalto",
+            "source": "file",
+            "upload_id": upload['upload_id'],
+            "filename": upload['filename']
+        }
+        resumed = TaskManager._resumed_import(connection_info)
+        if resumed is not None:
+            return resumed
+
+        try:
+            report_progress(0.1, "Reading address and service objects", stage="parse")
+            objects, hostname = await asyncio.to_thread(load_paloalto_objects, path)
+            # IP 를 주지 않으면 설정의 호스트명을 방화벽 키로 사용 (델타 스냅샷, 증분 분석 기준)
+            connection_info["ip"] = connection_info["ip"] or hostname
+            connection_info["hostname"] = hostname
+            report_progress(0.4, "Parsing security rules", stage="parse")
+            snapshot_id = await asyncio.to_thread(
+                get_policy_store().save_snapshot, iter_paloalto_rules(path, objects), params.get('project_id'),
+                connection_info["ip"], AppConfig.SNAPSHOT_DELTA_IMPORT
+            )
+            logging.info(f"Imported configuration file {upload['filename'] or upload['upload_id']}")
+            return TaskManager._import_result(snapshot_id, connection_info, objects=objects.counts())
+        except TaskCancelled:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to import configuration file: {str(e)}")
+            return {
+                "success": False,
+                "message": f"Failed to import configuration file: {str(e)}",
+                "data": {}
+            }
+
     @staticmethod
     async def handle_policy_processing(params: Dict[str, Any], previous_result: Dict[str, Any]) -> Dict[str, Any]:
         if not previous_result or not previous_result.get('success'):
             logging.warning("Configuration data required for policy processing")
             raise ValueError("Configuration data required")
         
-        policies = previous_result.get('data', {}).get('policies', [])
+        data = previous_result.get('data', {})
+        ref = policy_ref(data)
+        if ref is None:
+            # 정책이 직접 포함된 경우 아티팩트로 저장하고 핸들만 전달
+            ref = {"artifact": get_artifact_store().put(data.get('policies', []))}
+        total = data.get('total_policies')
+        if total is None:
+            total = policy_ref_count(ref)
         
         return {
             "success": True,
-            "message": f"Processed {len(policies)} policies",
+            "message": f"Processed {total} policies",
             "type": "policy",  # 결과 타입 명시
-            "data": policies   # 처리된 정책 데이터
+            "data": {          # 처리된 정책 데이터 (결과 조회 시 참조를 펼침)
+                **ref,
+                "total_policies": total
+            }
         }
 
     @staticmethod
@@ -196,65 +392,91 @@ class TaskManager:
             logging.warning("Policy data required for processing")
             raise ValueError("Policy data required")
 
-        policies = previous_result.get('data', {}).get('policies', [])
-        
-        # Shadow 정책 분석 로직 최적화
-        shadow_policies = []
+        report_progress(0.05, "Loading policies", stage="load")
+        policies = await asyncio.to_thread(resolve_policies, previous_result.get('data', {}))
         policy_count = len(policies)
-        
-        # 정책 비교를 위한 집합 미리 생성
-        policy_sets = [{
-            'source': set(policy['source']),
-            'destination': set(policy['destination']),
-            'service': set(policy['service'])
-        } for policy in policies]
-
-        for i in range(policy_count):
-            current_policy = policies[i]
-            current_sets = policy_sets[i]
-
-            # 현재 정책 이후의 정책들만 비교
-            for j in range(i + 1, policy_count):
-                next_policy = policies[j]
-                next_sets = policy_sets[j]
-
-                # 집합 연산으로 중복 확인
-                if (current_sets['source'] & next_sets['source'] and 
-                    current_sets['destination'] & next_sets['destination'] and 
-                    current_sets['service'] & next_sets['service']):
-                    
-                    # 정책 액션 비교
-                    if current_policy['action'] == next_policy['action']:
-                        shadow_type = "Redundant"
-                    else:
-                        shadow_type = "Conflicting"
-                    
-                    shadow_policies.append({
-                        **current_policy,
-                        "shadowed_by": next_policy['rulename'],
-                        "shadowed_rule_number": next_policy['seq'],
-                        "shadow_type": shadow_type,
-                        "shadow_details": {
-                            "overlapping_sources": list(current_sets['source'] & next_sets['source']),
-                            "overlapping_destinations": list(current_sets['destination'] & next_sets['destination']),
-                            "overlapping_services": list(current_sets['service'] & next_sets['service'])
-                        }
-                    })
-                    break  # 첫 번째 shadowing 정을 찾으면 중단
+        compare_stage = ProgressStage("compare", 0.2, 0.8, total=policy_count)
+        compare_stage.update(0, f"Analyzing {policy_count} policies")
+
+        # CIDR/포트 범위 인덱스 기반 Shadow 정책 분석 (워커 프로세스에서 샤드 단위 병렬 실행)
+        engine = params.get('engine') or AppConfig.SHADOW_ANALYSIS_ENGINE
+        executor = get_analysis_executor()
+        ip = (previous_result.get('data', {}).get('connection_info') or {}).get('ip')
+        state_store = ShadowStateStore(AppConfig.SHADOW_STATE_DIR)
+        # 증분 분석은 index 엔진에서만 사용 (다른 엔진을 선택하면 항상 전체 분석)
+        incremental = bool(ip) and AppConfig.SHADOW_INCREMENTAL and engine == INCREMENTAL_ENGINE
+        previous_states = await asyncio.to_thread(state_store.load, ip) if incremental else {}
+
+        incremental_summary = None
+        on_progress = lambda done, found: compare_stage.update(done, rules_compared=done, pairs_found=found)
+        try:
+            if previous_states:
+                # 같은 방화벽의 이전 분석 결과가 있으면 변경된 정책이 관련된 쌍만 재계산 (vsys 그룹별 병렬 실행)
+                pairs, incremental_summary = await incremental_shadow_pairs_grouped(
+                    policies, previous_states, executor, engine, on_progress=on_progress
+                )
+            else:
+                # 같은 입력에 대한 체크포인트가 있으면 끝난 샤드는 건너뜀 (재시작 후 이어서 실행)
+                source = policy_ref(previous_result.get('data', {}))
+                checkpoint_key = {"source": source, "engine": engine, "policy_count": policy_count}
+                checkpoint = load_checkpoint() or {}
+                if source is not None and checkpoint.get("key") == checkpoint_key:
+                    shard_count = checkpoint["shard_count"]
+                    done_shards = {int(index): result for index, result in checkpoint["shards"].items()}
+                    logging.info(f"Resuming shadow analysis from checkpoint ({len(done_shards)} shards done)")
+                else:
+                    # 체크포인트 단위를 위해 워커 수보다 잘게 나눔 (최소 샤드 크기는 유지)
+                    shard_count = max(executor.workers, AppConfig.SHADOW_CHECKPOINT_SHARDS)
+                    done_shards = {}
+
+                def on_shard(index: int, result: List[Optional[int]]) -> None:
+                    done_shards[index] = result
+                    if source is not None:
+                        save_checkpoint({"key": checkpoint_key, "shard_count": shard_count, "shards": done_shards})
+
+                pairs = await find_shadow_pairs_sharded(
+                    policies, engine, executor, AppConfig.SHADOW_SHARD_MIN_RULES, on_progress=on_progress,
+                    shard_count=shard_count, completed_shards=done_shards, on_shard=on_shard
+                )
+        except TaskCancelled as e:
+            # 중단 전까지 비교한 샤드(또는 vsys 그룹)의 결과를 부분 결과로 남김
+            partial = e.partial or {}
+            e.partial = await TaskManager._shadow_result_data(
+                policies, partial.get("pairs", []), partial.get("rules_compared", 0), engine, None, processed=False
+            )
+            raise
+        compare_stage.update(policy_count, rules_compared=policy_count, pairs_found=len(pairs))
+        report_progress(0.8, "Building shadow policy results", stage="build")
+
+        if ip and AppConfig.SHADOW_INCREMENTAL:
+            # 다른 엔진으로 분석한 결과도 저장하여 다음 index 엔진 실행의 기준으로 사용
+            states = await asyncio.to_thread(build_shadow_states, policies, pairs)
+            await asyncio.to_thread(state_store.save, ip, states)
+        data = await TaskManager._shadow_result_data(policies, pairs, policy_count, engine, incremental_summary)
 
         return {
             "success": True,
-            "message": f"Found {len(shadow_policies)} shadow policies",
-            "data": {
-                "policies": shadow_policies,
-                "total_policies": len(shadow_policies),
-                "processed": True,
-                "analysis_summary": {
-                    "total_analyzed": policy_count,
-                    "shadow_count": len(shadow_policies),
-                    "redundant_count": sum(1 for p in shadow_policies if p['shadow_type'] == 'Redundant'),
-                    "conflicting_count": sum(1 for p in shadow_policies if p['shadow_type'] == 'Conflicting')
-                }
+            "message": f"Found {data['total_policies']} shadow policies",
+            "data": data
+        }
+
+    @staticmethod
+    async def _shadow_result_data(policies, pairs, analyzed: int, engine: str,
+                                  incremental_summary: Optional[Dict[str, Any]], processed: bool = True) -> Dict[str, Any]:
+        """shadow 쌍으로 결과 data 구성 (결과 행은 아티팩트로 저장)"""
+        shadow_policies = await asyncio.to_thread(build_shadow_entries, policies, pairs)
+        artifact = await asyncio.to_thread(get_artifact_store().put, shadow_policies)
+        return {
+            "artifact": artifact,
+            "total_policies": len(shadow_policies),
+            "processed": processed,
+            "analysis_summary": {
+                "total_analyzed": analyzed,
+                "shadow_count": len(shadow_policies),
+                "redundant_count": sum(1 for p in shadow_policies if p['shadow_type'] == 'Redundant'),
+                "conflicting_count": sum(1 for p in shadow_policies if p['shadow_type'] == 'Conflicting'),
+                "engine": engine,
+                "incremental": incremental_summary
             }
         }
 
@@ -264,71 +486,101 @@ class TaskManager:
             logging.warning("Previous task result required")
             raise ValueError("Previous task result required")
         
-        # previous_result의 구조 확인
-        if isinstance(previous_result.get('data'), list):
-            # 데이터가 직접 리스트로 온 경우
-            policies = previous_result.get('data', [])
-        else:
-            # 데이터가 딕셔너리 안에 있는 경우
-            policies = previous_result.get('data', {}).get('policies', [])
-        
-        if not policies:
-            raise ValueError("No policy data available")
+        data = previous_result.get('data')
+        ref = policy_ref(data)
+        if ref is None:
+            # previous_result의 구조 확인
+            if isinstance(data, (list, PolicyTable)):
+                # 데이터가 직접 리스트로 온 경우
+                policies = data
+            else:
+                # 데이터가 딕셔너리 안에 있는 경우
+                policies = (data or {}).get('policies')
+            if policies is None:
+                raise ValueError("No policy data available")
+            ref = {"artifact": get_artifact_store().put(policies)}
+
+        # 정책을 다시 싣지 않고 스냅샷/아티팩트 참조만 전달
+        # (분석 결과가 0건이어도 성공한 결과이므로 0행 다운로드로 처리)
+        total = policy_ref_count(ref)
 
         return {
             "success": True,
-            "message": f"Rules ready for download ({len(policies)} policies)",
+            "message": f"Rules ready for download ({total} policies)",
             "type": "policy",
             "data": {
-                "policies": policies,
-                "total_count": len(policies),
+                **ref,
+                "total_count": total,
                 "download_timestamp": datetime.now().isoformat()
             }
         }
 
     @staticmethod
     async def save_task_result(task_id: str, result_data: dict) -> dict:
-        """태스크 결과를 저장하는 메서드"""
+        """태스크 결과를 저장하는 메서드 (NDJSON 스트리밍 기록, 이벤트 루프 밖에서 실행)"""
         try:
             # AppConfig에서 경로 가져오기
             task_dir = AppConfig.RESULT_DIR / task_id
-            task_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 결과 파일 저장
-            result_file = task_dir / "result.json"
-            with open(result_file, 'w', encoding='utf-8') as f:
-                json.dump(result_data.get("data", []), f, ensure_ascii=False, indent=2)
+            data = result_data.get("data", [])
+
+            # 스냅샷/아티팩트 참조는 전체 목록을 만들지 않고 행 단위로 읽으며 기록
+            ref = policy_ref(data)
+            rows = iter_ref_policies(ref) if ref else None
+            meta = await asyncio.to_thread(
+                write_result, task_dir, data, rows, AppConfig.RESULT_COMPRESSION
+            )
             
             return {
                 "success": True,
                 "message": "Result saved successfully",
-                "result_file": str(result_file),
-                "saved_at": datetime.now().isoformat()
+                "result_file": str(task_dir / meta["rows_file"]),
+                "row_count": meta["row_count"],
+                "saved_at": meta["saved_at"]
             }
         except Exception as e:
             logging.error(f"Failed to save task result: {str(e)}")
             raise
 
     @staticmethod
-    async def get_task_result(task_id: str) -> dict:
-        """태스크 결과를 조회하는 메서드"""
+    async def get_task_result(task_id: str, stream: bool = False) -> dict:
+        """태스크 결과를 조회하는 메서드
+
+        stream=True 이면 data 에는 행 이외의 필드만 담고, 행은 "rows" 이터레이터로 한 줄씩 읽는다.
+        """
         try:
-            result_file = AppConfig.RESULT_DIR / task_id / "result.json"
-            if not result_file.exists():
+            task_dir = AppConfig.RESULT_DIR / task_id
+            meta = read_result_meta(task_dir)
+            if meta is None:
+                legacy_file = task_dir / "result.json"
+                if legacy_file.exists():
+                    # 이전 버전에서 저장된 결과
+                    with open(legacy_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    return {
+                        "success": True,
+                        "data": data,
+                        "result_file": str(legacy_file)
+                    }
+
                 logging.warning(f"Result file not found for task ID: {task_id}")
                 return {
                     "success": False,
                     "message": "Result file not found",
                     "data": None
                 }
-            
-            with open(result_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return {
-                    "success": True,
-                    "data": data,
-                    "result_file": str(result_file)
-                }
+
+            rows = iter_result_rows(task_dir, meta)
+            result = {
+                "success": True,
+                "row_count": meta["row_count"],
+                "result_file": str(task_dir / meta["rows_file"])
+            }
+            if stream:
+                result["data"] = meta["fields"]
+                result["rows"] = rows
+            else:
+                result["data"] = await asyncio.to_thread(assemble_result, meta, rows)
+            return result
         except Exception as e:
             logging.error(f"Failed to get task result: {str(e)}")
             return {
@@ -359,14 +611,20 @@ class TaskManager:
             logging.warning("Please enter valid rule names separated by commas")
             raise ValueError("Please enter valid rule names separated by commas")
 
-        # 원본 정책 데이터 확인
-        original_policies = previous_result.get('data', {}).get('policies', [])
-        if not original_policies:
-            logging.warning("No policy data available for analysis")
-            raise ValueError("No policy data available")
+        # 원본 정책 데이터 확인 (정책 목록은 다시 싣지 않고 참조만 전달)
+        ref = policy_ref(previous_result.get('data', {}))
+        if ref is None:
+            original_policies = previous_result.get('data', {}).get('policies')
+            if not original_policies:
+                logging.warning("No policy data available for analysis")
+                raise ValueError("No policy data available")
+            ref = {"artifact": get_artifact_store().put(original_policies)}
+
+        # 입력된 정책명만 조회 (스냅샷은 정책명 인덱스 사용)
+        matched = await asyncio.to_thread(find_ref_policies, ref, rule_names)
+        existing_rule_names = {policy['rulename'] for policy in matched}
 
         # 입력된 정책명이 실제 존재하는지 확인
-        existing_rule_names = {policy['rulename'] for policy in original_policies}
         valid_rules = [name for name in rule_names if name in existing_rule_names]
         invalid_rules = [name for name in rule_names if name not in existing_rule_names]
 
@@ -389,7 +647,7 @@ class TaskManager:
             "message": message,
             "data": {
                 "rule_names": valid_rules,
-                "original_policies": original_policies,
+                **ref,
                 "validation_summary": {
                     "total_input": len(rule_names),
                     "valid_count": len(valid_rules),
@@ -405,35 +663,43 @@ class TaskManager:
             logging.warning("Target rules required for analysis")
             raise ValueError("Target rules required for analysis")
 
-        rule_names = previous_result.get('data', {}).get('rule_names', [])
-        all_policies = previous_result.get('data', {}).get('original_policies', [])
+        data = previous_result.get('data', {})
+        rule_names = data.get('rule_names', [])
+        mode = params.get('mode') or AppConfig.IMPACT_BLOCK_MODE
 
-        # 분석 대상 정책 찾기
-        target_policies = [
-            policy for policy in all_policies 
-            if policy['rulename'] in rule_names
-        ]
+        report_progress(0.05, "Loading policies", stage="load")
+        if policy_ref(data) is None and data.get('original_policies') is not None:
+            policies = data['original_policies']
+        else:
+            policies = await asyncio.to_thread(resolve_policies, data)
 
-        if not target_policies:
+        targets = await asyncio.to_thread(block_targets, policies, rule_names)
+        if not targets:
             logging.warning("No matching policies found")
             raise ValueError("No matching policies found")
-
-        # 결과를 단순화하여 PolicyTable에서 표시할 수 있는 형태로 변환
-        result_policies = []
-        for policy in target_policies:
-            result_policies.append({
-                **policy,  # 기존 정책 정보 유지
-                "analysis_type": "Target Rule",  # 분석 대상임을 표시
-                "impact_summary": "Sample Impact Analysis Result"  # 실제 분석 결과가 들어갈 자리
-            })
-
+        if mode not in BLOCK_MODES:
+            raise ValueError(f"Unknown block mode: {mode}")
+
+        # 주소/서비스 구간 인덱스로 대상 정책과 겹치는 정책만 찾아 차단 영향 분석 (워커 프로세스에서 실행)
+        report_progress(0.2, f"Analyzing block impact of {len(targets)} rules", stage="compare")
+        rows = await asyncio.to_thread(impact_rows, policies)
+        check_cancelled()
+        impacts = await get_analysis_executor().run(find_block_impacts, rows, targets, mode)
+        check_cancelled()
+
+        report_progress(0.8, "Building impact analysis results", stage="build")
+        max_affected = AppConfig.IMPACT_MAX_AFFECTED_RULES
+        result_policies = await asyncio.to_thread(build_impact_entries, policies, impacts, max_affected)
+        summary = summarize_impacts(result_policies, impacts, mode, max_affected)
+        artifact = await asyncio.to_thread(get_artifact_store().put, result_policies)
         return {
             "success": True,
-            "message": f"Analyzed impact for {len(target_policies)} rules",
+            "message": f"Analyzed impact for {summary['target_count']} rules ({summary['affected_count']} affected rules)",
             "type": "policy",  # PolicyTable에서 처리할 수 있도록 type을 policy로 설정
             "data": {
-                "policies": result_policies,
-                "total_count": len(result_policies)
+                "artifact": artifact,
+                "total_count": len(result_policies),
+                "analysis_summary": summary
             }
         }
 
@@ -510,7 +776,10 @@ class TaskManager:
             "data": previous_result.get('data', {})
         }
 
-# 태스크 타입과 핸들러 매핑
+# "timeout" 이 없는 태스크의 실행 시간 제한(초)
+DEFAULT_TASK_TIMEOUT = 300
+
+# 태스크 타입과 핸들러 매핑 ("timeout": 실행 시간 제한(초), None 이면 제한 없음)
 TASK_TYPE_HANDLERS = {
     TaskType.FIREWALL_TYPE_SELECTION: {
         "handler": TaskManager.handle_firewall_type_selection,
@@ -520,12 +789,20 @@ TASK_TYPE_HANDLERS = {
     TaskType.FIREWALL_CONNECTION: {
         "handler": TaskManager.handle_firewall_connection,
         "input_format": InputFormat.IP_ID_PW,
-        "requires_previous": True
+        "requires_previous": True,
+        "timeout": 60
     },
     TaskType.CONFIG_IMPORT: {
         "handler": TaskManager.handle_config_import,
         "input_format": InputFormat.NONE,
-        "requires_previous": True
+        "requires_previous": True,
+        "timeout": 900
+    },
+    TaskType.CONFIG_FILE_IMPORT: {
+        "handler": TaskManager.handle_config_import,
+        "input_format": InputFormat.CONFIG_FILE,
+        "requires_previous": False,
+        "timeout": 1800
     },
     TaskType.POLICY_PROCESSING: {
         "handler": TaskManager.handle_policy_processing,
@@ -535,7 +812,8 @@ TASK_TYPE_HANDLERS = {
     TaskType.SHADOW_POLICY_PROCESSING: {
         "handler": TaskManager.handle_shadow_policy_processing,
         "input_format": InputFormat.NONE,
-        "requires_previous": True
+        "requires_previous": True,
+        "timeout": 3600
     },
     TaskType.RULE_DOWNLOAD: {
         "handler": TaskManager.handle_rule_download,
@@ -550,7 +828,8 @@ TASK_TYPE_HANDLERS = {
     TaskType.IMPACT_ANALYSIS: {
         "handler": TaskManager.handle_impact_analysis,
         "input_format": InputFormat.NONE,
-        "requires_previous": True
+        "requires_previous": True,
+        "timeout": 1800
     },
     TaskType.PARSE_REQUEST_NUMBER: {
         "handler": TaskManager.handle_parse_request_number,
@@ -585,7 +864,8 @@ TASK_TYPE_HANDLERS = {
     TaskType.ANALYZE_DUPLICATE_POLICIES: {
         "handler": TaskManager.handle_analyze_duplicate_policies,
         "input_format": InputFormat.NONE,
-        "requires_previous": True
+        "requires_previous": True,
+        "timeout": 1800
     },
     TaskType.CLASSIFY_DUPLICATE_TASKS: {
         "handler": TaskManager.handle_classify_duplicate_tasks,
@@ -599,6 +879,9 @@ TASK_TYPE_HANDLERS = {
     }
 }
 
+def get_task_timeout(task_config: Dict[str, Any]) -> Optional[float]:
+    return task_config.get("timeout", DEFAULT_TASK_TIMEOUT)
+
 def get_task_type_info(task_type: TaskType) -> Dict:
     task_config = TASK_TYPE_HANDLERS.get(task_type)
     if not task_config:
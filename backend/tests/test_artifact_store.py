@@ -0,0 +1,60 @@
+import os
+import time
+
+from utils.firewall_utils import generate_random_policies
+from artifact_store import ArtifactStore, is_artifact_handle, iter_artifact_ids
+from policy_table import PolicyTable
+
+class TestArtifactStore:
+    def test_put_and_load(self, tmp_path):
+        store = ArtifactStore(tmp_path)
+        policies = generate_random_policies(100)
+        handle = store.put(policies)
+
+        assert is_artifact_handle(handle)
+        assert handle["rows"] == 100
+        assert handle["schema"] == list(policies[0])
+        assert list(store.iter_rows(handle)) == policies
+        assert store.load(handle).to_dicts() == policies
+
+    def test_content_addressed(self, tmp_path):
+        store = ArtifactStore(tmp_path)
+        policies = generate_random_policies(20)
+
+        first = store.put(policies)
+        second = store.put(PolicyTable.from_policies(policies))
+        other = store.put(policies[:10])
+
+        assert first == second
+        assert other["id"] != first["id"]
+        assert len(list(tmp_path.rglob("*.ndjson.gz"))) == 2
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_missing_artifact(self, tmp_path):
+        store = ArtifactStore(tmp_path)
+        try:
+            list(store.iter_rows("0" * 64))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("missing artifact should raise ValueError")
+
+    def test_iter_artifact_ids(self):
+        handle = {"id": "a" * 64, "rows": 1, "schema": []}
+        summary = {"data": {"artifact": handle, "nested": [{"artifact": {**handle, "id": "b" * 64}}]}, "message": "done"}
+        assert sorted(iter_artifact_ids([summary, None])) == ["a" * 64, "b" * 64]
+
+    def test_sweep_keeps_referenced_and_recent(self, tmp_path):
+        store = ArtifactStore(tmp_path)
+        kept = store.put(generate_random_policies(5))
+        dropped = store.put(generate_random_policies(6))
+        recent = store.put(generate_random_policies(7))
+        old = time.time() - 7200
+        for handle in (kept, dropped, recent):
+            os.utime(store.path(handle["id"]), (old, old))
+        # 다시 저장한 아티팩트는 유예 시간이 새로 적용됨
+        store.put(store.iter_rows(recent))
+
+        assert store.sweep({kept["id"]}, grace=3600) == 1
+        assert store.exists(kept["id"]) and store.exists(recent["id"])
+        assert not store.exists(dropped["id"])
@@ -0,0 +1,17 @@
+import pytest
+
+from credentials import validate_secret_ref, resolve_secret
+
+class TestCredentials:
+    def test_env_reference(self, monkeypatch):
+        monkeypatch.setenv("FW_EDGE_PW", "s3cret")
+        assert validate_secret_ref(" env:FW_EDGE_PW ") == "env:FW_EDGE_PW"
+        assert resolve_secret("env:FW_EDGE_PW") == "s3cret"
+
+    def test_invalid_or_missing(self, monkeypatch):
+        monkeypatch.delenv("FW_MISSING_PW", raising=False)
+        for ref in ("s3cret", "file:/etc/passwd", "env:"):
+            with pytest.raises(ValueError):
+                validate_secret_ref(ref)
+        with pytest.raises(ValueError):
+            resolve_secret("env:FW_MISSING_PW")
@@ -0,0 +1,69 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from db_writer import DbWriter
+
+class TestDbWriter:
+    def test_runs_in_order_off_event_loop(self):
+        calls = []
+        def write(value):
+            calls.append((value, threading.get_ident()))
+            return value * 2
+
+        async def run():
+            writer = DbWriter()
+            await writer.start()
+            for value in range(5):
+                writer.call(write, value)
+            result = await writer.run(write, 5)
+            writer.call(write, 6)
+            await writer.stop()
+            return result
+
+        loop_thread = threading.get_ident()
+        assert asyncio.run(run()) == 10
+        # 기다리지 않은 기록도 종료 전에 모두 요청 순서대로 실행
+        assert [value for value, _ in calls] == list(range(7))
+        assert all(thread != loop_thread for _, thread in calls)
+
+    def test_runs_in_caller_context(self):
+        current = contextvars.ContextVar("current", default=None)
+
+        async def run():
+            writer = DbWriter()
+            await writer.start()
+            try:
+                current.set("job-1")
+                return await writer.run(current.get)
+            finally:
+                await writer.stop()
+
+        assert asyncio.run(run()) == "job-1"
+
+    def test_errors(self):
+        def fail():
+            raise ValueError("broken")
+
+        async def run():
+            writer = DbWriter()
+            await writer.start()
+            writer.call(fail)
+            try:
+                with pytest.raises(ValueError):
+                    await writer.run(fail)
+                # 실패한 기록 뒤에도 계속 처리
+                assert await writer.run(lambda: "ok") == "ok"
+            finally:
+                await writer.stop()
+
+        asyncio.run(run())
+
+    def test_not_started(self):
+        calls = []
+        writer = DbWriter()
+        writer.call(calls.append, 1)
+        assert calls == [1]
+        assert asyncio.run(writer.run(lambda: 2)) == 2
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from firewall_client import FirewallClient
+
+class SlowPagesClient(FirewallClient):
+    mock_policy_count = 1050
+
+    def __init__(self):
+        super().__init__("1.1.1.1", "admin", "pw")
+        self.in_flight = 0
+        self.peak = 0
+        self.pages_fetched = 0
+
+    async def fetch_policy_page(self, offset, limit, vsys=None):
+        self.in_flight += 1
+        self.pages_fetched += 1
+        self.peak = max(self.peak, self.in_flight)
+        # 뒤 페이지가 먼저 도착해도 순서대로 반환되어야 함, vsys2 는 느린 vsys
+        await asyncio.sleep(0.03 if vsys == "vsys2" or (vsys is None and offset % 200 == 0) else 0.01)
+        self.in_flight -= 1
+        return await super().fetch_policy_page(offset, limit, vsys)
+
+class TestFirewallClient:
+    def test_paged_fetch_in_order_with_prefetch(self):
+        client = SlowPagesClient()
+
+        async def main():
+            await client.get_api_key()
+            sizes = [len(page) async for page in client.iter_policy_pages(page_size=100, prefetch=3)]
+            seqs = [policy["seq"] async for policy in client.iter_policies(page_size=100, prefetch=3)]
+            return sizes, seqs
+
+        sizes, seqs = asyncio.run(main())
+        assert sizes == [100] * 10 + [50]
+        assert seqs == [str(i + 1) for i in range(1050)]
+        assert client.peak == 4
+
+    def test_lookup_stops_early(self):
+        async def main():
+            client = FirewallClient("1.1.1.1", "admin", "pw")
+            await client.get_api_key()
+            return await client.get_policy_by_id("5"), await client.get_policy_by_id("missing")
+
+        found, missing = asyncio.run(main())
+        assert found["seq"] == "5" and missing is None
+
+    def test_policy_cache_and_batch_lookup(self):
+        client = SlowPagesClient()
+        client.cache_ttl = 60
+
+        async def main():
+            await client.get_api_key()
+            # 동시 조회도 정책 목록은 한 번만 가져옴
+            first, second = await asyncio.gather(client.get_policy_by_name("Rule_00001_ALLOW_HIGH_RISK"),
+                                                 client.get_policy_by_id(2))
+            found = await client.get_policies_by_names(["Rule_00003_ALLOW_LOW_RISK", "missing"])
+            vsys = await client.get_policies_by_vsys("vsys1")
+            fetched = client.pages_fetched
+            index = client._policy_index
+            client.invalidate_policy_cache()
+            await client.get_policy_by_id("1")
+            return first, second, found, vsys, index, fetched
+
+        first, second, found, vsys, index, fetched = asyncio.run(main())
+        assert first["seq"] == "1" and second["seq"] == "2"
+        assert list(found) == ["Rule_00003_ALLOW_LOW_RISK"]
+        assert len(vsys) == 350 and all(policy["vsys"] == "vsys1" for policy in vsys)
+        assert fetched == 2
+        assert client._policy_index is not index and client.pages_fetched == 4
+
+    def test_vsys_fetch_merges_in_seq_order(self):
+        client = SlowPagesClient()
+        timings = {}
+
+        async def main():
+            await client.get_api_key()
+            return [page async for page in client.iter_vsys_policy_pages(page_size=100, concurrency=2,
+                                                                         timings=timings)]
+
+        pages = asyncio.run(main())
+        assert [len(page) for page in pages] == [100] * 10 + [50]
+        assert [policy["seq"] for page in pages for policy in page] == [str(i + 1) for i in range(1050)]
+        assert client.peak == 2
+        assert list(timings) == ["vsys1", "vsys2", "vsys3"]
+        assert [timing["rules"] for timing in timings.values()] == [350, 350, 350]
+        assert max(timings, key=lambda vsys: timings[vsys]["fetch_seconds"]) == "vsys2"
+
+    def test_vsys_fetch_failure_is_raised(self):
+        class FailingClient(SlowPagesClient):
+            async def fetch_policy_page(self, offset, limit, vsys=None):
+                if vsys == "vsys3" and offset:
+                    raise ConnectionError("vsys3 page failed")
+                return await super().fetch_policy_page(offset, limit, vsys)
+
+        async def main():
+            client = FailingClient()
+            await client.get_api_key()
+            return [page async for page in client.iter_vsys_policy_pages(page_size=100)]
+
+        with pytest.raises(ConnectionError, match="vsys3"):
+            asyncio.run(main())
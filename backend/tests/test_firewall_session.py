@@ -0,0 +1,119 @@
+import asyncio
+
+from firewall_session import FirewallSessionPool
+
+class CountingClient:
+    logins = 0
+
+    def __init__(self, ip, id, pw):
+        self.ip = ip
+        self.id = id
+        self.pw = pw
+        self.connected = False
+        self.alive = True
+
+    async def get_api_key(self):
+        CountingClient.logins += 1
+        await asyncio.sleep(0.01)
+        if self.pw == "wrong":
+            raise ValueError("Authentication failed")
+        self.connected = True
+        self.alive = True
+        return "key"
+
+    async def keepalive(self):
+        return self.alive
+
+    def is_connected(self):
+        return self.connected
+
+    async def disconnect(self):
+        self.connected = False
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_pool(**kwargs):
+    CountingClient.logins = 0
+    clock = FakeClock()
+    return FirewallSessionPool(client_factory=CountingClient, clock=clock, **kwargs), clock
+
+class TestFirewallSessionPool:
+    def test_concurrent_acquire_logs_in_once(self):
+        pool, _ = make_pool()
+
+        async def main():
+            return await asyncio.gather(*(pool.acquire("1.1.1.1", "admin", "pw", "paloalto") for _ in range(50)))
+
+        clients = asyncio.run(main())
+        assert CountingClient.logins == 1
+        assert all(client is clients[0] for client in clients)
+        assert pool.get("1.1.1.1", "admin", "paloalto") is clients[0]
+        assert pool.get("1.1.1.1", "other", "paloalto") is None
+
+    def test_keyed_by_user_and_password_checked(self):
+        pool, _ = make_pool()
+
+        async def main():
+            first = await pool.acquire("1.1.1.1", "admin", "pw")
+            other_user = await pool.acquire("1.1.1.1", "audit", "pw")
+            assert other_user is not first and first.is_connected()
+            # 다른 비밀번호로는 기존 세션을 재사용하지 않음
+            relogin = await pool.acquire("1.1.1.1", "admin", "pw2")
+            assert relogin is not first and not first.is_connected()
+            try:
+                await pool.acquire("1.1.1.1", "admin", "wrong")
+            except ValueError:
+                pass
+            assert pool.get("1.1.1.1", "admin") is relogin
+
+        asyncio.run(main())
+
+    def test_lru_and_idle_eviction(self):
+        pool, clock = make_pool(max_size=2, idle_ttl=100, keepalive_interval=10)
+
+        async def main():
+            a = await pool.acquire("10.0.0.1", "admin", "pw")
+            await pool.acquire("10.0.0.2", "admin", "pw")
+            pool.get("10.0.0.1", "admin")
+            await pool.acquire("10.0.0.3", "admin", "pw")
+            # 가장 오래 사용하지 않은 세션(10.0.0.2)이 제거됨
+            assert pool.get("10.0.0.2", "admin") is None
+            assert pool.get("10.0.0.1", "admin") is a
+
+            # 세션이 만료되었으면 keepalive 때 다시 로그인
+            clock.now = 20
+            a.alive = False
+            logins = CountingClient.logins
+            assert await pool.maintain() == 0
+            assert CountingClient.logins == logins + 1
+
+            # 빌려 쓰는 동안에는 유휴 시간이 지나도 제거하지 않음
+            async with pool.lease("10.0.0.1", "admin") as leased:
+                clock.now = 500
+                assert await pool.maintain() == 1
+                assert leased.is_connected()
+            clock.now = 700
+            assert await pool.maintain() == 1
+            assert pool.stats()["sessions"] == 0
+
+        asyncio.run(main())
+
+    def test_relogin_while_leased_disconnects_on_release(self):
+        pool, _ = make_pool()
+
+        async def main():
+            first = await pool.acquire("1.1.1.1", "admin", "pw")
+            async with pool.lease("1.1.1.1", "admin") as leased:
+                relogin = await pool.acquire("1.1.1.1", "admin", "pw2")
+                # 사용 중인 세션은 교체되어도 lease 가 끝날 때까지 유지
+                assert leased is first and first.is_connected()
+            assert not first.is_connected()
+            assert pool.get("1.1.1.1", "admin") is relogin and relogin.is_connected()
+            assert pool.stats()["sessions"] == 1
+
+        asyncio.run(main())
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from fleet import (
+    parse_targets_csv, normalize_targets, split_vendor_steps, VendorRateLimiter, run_fleet, iter_fleet_rows
+)
+from task_manager import TaskType
+
+class TestTargets:
+    def test_parse_csv(self):
+        text = "Name,Type,IP,id,pw\nfw-a,paloalto,10.0.0.1,admin,secret\n\n,mf2,10.0.0.2,,\n"
+        targets = parse_targets_csv(text)
+        assert targets == [
+            {"name": "fw-a", "type": "paloalto", "ip": "10.0.0.1", "id": "admin", "pw": "secret"},
+            {"type": "mf2", "ip": "10.0.0.2"}
+        ]
+
+    def test_parse_csv_requires_header(self):
+        with pytest.raises(ValueError):
+            parse_targets_csv("10.0.0.1,admin\n")
+
+    def test_normalize(self):
+        targets = normalize_targets([{"type": "PaloAlto", "ip": " 10.0.0.1 ", "pw": ""}])
+        assert targets == [{"type": "paloalto", "ip": "10.0.0.1"}]
+        with pytest.raises(ValueError):
+            normalize_targets([{"type": "unknown", "ip": "10.0.0.1"}])
+        with pytest.raises(ValueError):
+            normalize_targets([{"type": "mf2", "ip": "10.0.0.1"}, {"type": "ngf", "ip": "10.0.0.1"}])
+        with pytest.raises(ValueError):
+            normalize_targets([])
+
+    def test_split_vendor_steps(self):
+        steps = [{"type": TaskType.FIREWALL_TYPE_SELECTION}, {"type": TaskType.FIREWALL_CONNECTION},
+                 {"type": TaskType.CONFIG_IMPORT}, {"type": TaskType.POLICY_PROCESSING}]
+        assert split_vendor_steps(steps) == 3
+        assert split_vendor_steps(steps[3:]) == 0
+
+class TestRunFleet:
+    def test_concurrency_and_vendor_limits(self):
+        running = {"total": 0, "paloalto": 0, "mf2": 0}
+        peak = {"total": 0, "paloalto": 0, "mf2": 0}
+        done = []
+
+        def enter(key):
+            running[key] += 1
+            peak[key] = max(peak[key], running[key])
+
+        async def run_target(target):
+            enter("total")
+            async with limiter.slot(target["type"]):
+                enter(target["type"])
+                await asyncio.sleep(0.01)
+                running[target["type"]] -= 1
+            running["total"] -= 1
+            if target["ip"] == "10.0.0.3":
+                raise ValueError("unreachable")
+            return {"success": True}
+
+        limiter = VendorRateLimiter({"paloalto": 2, "mf2": 1})
+        targets = [{"type": "paloalto" if i % 2 else "mf2", "ip": f"10.0.0.{i}"} for i in range(8)]
+        outcomes = asyncio.run(run_fleet(targets, run_target, 3, lambda index, target, outcome: done.append(index)))
+
+        assert peak["total"] <= 3
+        assert peak["paloalto"] <= 2
+        assert peak["mf2"] == 1
+        assert sorted(done) == list(range(8))
+        assert outcomes[3] == {"success": False, "message": "unreachable"}
+        assert all(outcome["success"] for index, outcome in enumerate(outcomes) if index != 3)
+
+    def test_stagger(self):
+        import time
+        starts = []
+
+        async def run_target(target):
+            starts.append(time.monotonic())
+            return {"success": True}
+
+        targets = [{"type": "ngf", "ip": f"10.0.0.{i}"} for i in range(3)]
+        asyncio.run(run_fleet(targets, run_target, 3, stagger=0.05))
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        assert all(gap >= 0.045 for gap in gaps)
+
+    def test_iter_fleet_rows(self):
+        rows = list(iter_fleet_rows([
+            ({"type": "mf2", "ip": "10.0.0.1"}, [{"rulename": "a"}]),
+            ({"type": "ngf", "ip": "10.0.0.2"}, [{"rulename": "b"}, {"rulename": "c"}])
+        ]))
+        assert [row["firewall"] for row in rows] == ["10.0.0.1", "10.0.0.2", "10.0.0.2"]
+        assert rows[0] == {"firewall": "10.0.0.1", "firewall_type": "mf2", "rulename": "a"}
@@ -0,0 +1,135 @@
+import pytest
+import random
+
+from utils.range_utils import address_to_range, complement_ranges, ranges_cover, ranges_overlap, IPV6_BASE, NAMED_BASE
+from shadow_analyzer import RuleRanges
+from impact_analyzer import (
+    analyze_block_impact,
+    find_block_impacts,
+    IMPACT_BYPASS,
+    IMPACT_SHADOWED,
+    IMPACT_PARTIAL,
+    IMPACT_RECEIVES
+)
+
+def make_policy(name: str, source: list, destination: list, service: list, action: str = "allow",
+                vsys: str = "vsys1", enable: bool = True) -> dict:
+    return {
+        "vsys": vsys,
+        "rulename": name,
+        "enable": enable,
+        "action": action,
+        "source": source,
+        "destination": destination,
+        "service": service
+    }
+
+POLICIES = [
+    make_policy("early_deny", ["10.0.0.0/8"], ["any"], ["any"], action="deny"),
+    make_policy("early_https", ["10.0.0.0/8"], ["any"], ["tcp/443"]),
+    make_policy("target", ["10.1.0.0/16"], ["192.168.1.0/24"], ["tcp/1-1024"]),
+    make_policy("inside", ["10.1.2.0/24"], ["192.168.1.10"], ["tcp/443"]),
+    make_policy("web_deny", ["10.1.0.0/16"], ["any"], ["tcp/80"], action="deny"),
+    make_policy("other_net", ["172.16.0.0/12"], ["192.168.1.0/24"], ["tcp/443"]),
+    make_policy("disabled", ["any"], ["any"], ["any"], enable=False),
+    make_policy("other_vsys", ["any"], ["any"], ["any"], vsys="vsys2")
+]
+
+def named(policies, impacts):
+    return [(policies[position]["rulename"], kind, full) for position, kind, full in impacts]
+
+class TestBlockImpact:
+    def test_ranges_cover(self):
+        halves = sorted([address_to_range("10.0.0.0/9"), address_to_range("10.128.0.0/9")])
+        assert ranges_cover(halves, [address_to_range("10.0.0.0/8")])
+        assert not ranges_cover(halves, [address_to_range("11.0.0.0/24")])
+
+    def test_complement_ranges(self):
+        inner = [address_to_range("10.0.0.0/8"), address_to_range("10.1.0.0/16"), address_to_range("2001:db8::/32")]
+        outside = complement_ranges(sorted(inner))
+        assert outside[:2] == [(0, address_to_range("10.0.0.0/8")[0] - 1), (address_to_range("10.0.0.0/8")[1] + 1, IPV6_BASE - 1)]
+        assert not ranges_overlap(outside, inner)
+        assert ranges_cover(sorted(outside + inner), [(0, NAMED_BASE - 1)])
+        assert complement_ranges([address_to_range("any")]) == []
+
+    def test_negated_source(self):
+        policies = [
+            make_policy("not_target_net", ["10.1.0.0/16"], ["any"], ["any"]),
+            make_policy("target", ["10.1.2.0/24"], ["192.168.1.0/24"], ["tcp/443"]),
+            make_policy("not_inside", ["10.1.2.0/24"], ["192.168.1.0/24"], ["tcp/443"], action="deny"),
+            make_policy("after", ["10.1.2.0/25"], ["192.168.1.0/24"], ["tcp/443"])
+        ]
+        policies[0]["negate_source"] = True
+        policies[2]["negate_source"] = True
+        # 부정된 출발지는 대상의 출발지를 포함하지 않으므로 우회/인계 정책이 아님
+        assert named(policies, find_block_impacts(policies, [1], "deny")[1]) == [("after", IMPACT_SHADOWED, True)]
+        rules = RuleRanges.from_policy(policies[0])
+        assert not ranges_overlap(rules.source, [address_to_range("10.1.2.0/24")])
+
+    def test_deny_mode(self):
+        impacts = find_block_impacts(POLICIES, [2], "deny")
+        assert named(POLICIES, impacts[2]) == [
+            ("early_https", IMPACT_BYPASS, False),
+            ("inside", IMPACT_SHADOWED, True),
+            ("web_deny", IMPACT_PARTIAL, False)
+        ]
+
+    def test_remove_mode(self):
+        impacts = find_block_impacts(POLICIES, [2], "remove")
+        assert named(POLICIES, impacts[2]) == [
+            ("early_https", IMPACT_BYPASS, False),
+            ("inside", IMPACT_BYPASS, True),
+            ("web_deny", IMPACT_RECEIVES, False)
+        ]
+
+    def test_result_rows_and_summary(self):
+        policies = [make_policy("allow_all", ["any"], ["any"], ["any"])] + POLICIES
+        rows, summary = analyze_block_impact(policies, ["target", "inside", "missing"], max_affected=1)
+
+        # 함께 차단하는 정책은 서로 영향 정책으로 보지 않음
+        assert [(row["rulename"], row["analysis_type"]) for row in rows] == [
+            ("target", "Target Rule"), ("allow_all", "Affected Rule"),
+            ("inside", "Target Rule"), ("allow_all", "Affected Rule")
+        ]
+        assert rows[0]["fully_bypassed_by"] == "allow_all"
+        assert rows[0]["affected_count"] == 3
+        assert rows[1]["target_rule"] == "target"
+        assert rows[1]["impact_details"]["overlapping_sources"] == ["any"]
+        assert summary["target_count"] == 2
+        assert summary["fully_bypassed_targets"] == 2
+        assert summary["truncated_targets"] == 2
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            find_block_impacts(POLICIES, [2], "drop")
+
+    def test_index_matches_full_scan(self):
+        random.seed(11)
+        networks = ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24", "10.1.2.3", "172.16.0.0/12",
+                    "any", "obj_web", "2001:db8::/32", "10.2.0.0-10.2.0.255"]
+        services = ["any", "tcp/80", "tcp/1-1024", "udp/53", "tcp", "application-default"]
+        policies = [
+            make_policy(
+                f"Rule_{i:04d}",
+                random.sample(networks, random.randint(1, 2)),
+                random.sample(networks, random.randint(1, 2)),
+                random.sample(services, random.randint(1, 2)),
+                action=random.choice(["allow", "deny"]),
+                vsys=random.choice(["vsys1", "vsys2"]),
+                enable=random.random() > 0.1
+            )
+            for i in range(500)
+        ]
+        targets = random.sample(range(len(policies)), 20)
+        impacts = find_block_impacts(policies, targets)
+
+        rules = [RuleRanges.from_policy(policy) for policy in policies]
+        for target in targets:
+            expected = [
+                position for position, policy in enumerate(policies)
+                if position not in targets and policy["enable"] and policy["vsys"] == policies[target]["vsys"]
+                and (position > target or policy["action"] == "allow")
+                and all(ranges_overlap(getattr(rules[target], dimension), getattr(rules[position], dimension))
+                        for dimension in ("source", "destination", "service"))
+            ]
+            assert [position for position, _, _ in impacts[target]] == expected
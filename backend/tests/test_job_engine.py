@@ -0,0 +1,192 @@
+import asyncio
+import time
+
+import pytest
+
+from job_engine import (
+    JobEngine, ProgressStage, set_job_engine, report_progress, progress_scope, estimate_eta,
+    run_with_budget, check_cancelled, TaskCancelled, checkpoint_scope, load_checkpoint, save_checkpoint, JOB_COMPLETED, JOB_ERROR, JOB_CANCELLED, JOB_TIMEOUT, FINISHED_STATUSES
+)
+from progress_events import ProgressBroker, format_sse
+
+def run_jobs(engine, jobs):
+    async def main():
+        await engine.start()
+        for job_id, key, factory in jobs:
+            await engine.submit(job_id, key, factory)
+        while any(engine.state(job_id)["status"] not in FINISHED_STATUSES for job_id, _, _ in jobs):
+            await asyncio.sleep(0.01)
+        await engine.stop()
+    asyncio.run(main())
+
+class TestJobEngine:
+    def test_per_key_limit(self):
+        running = {}
+        peak = {}
+
+        def make_job(key):
+            async def job():
+                running[key] = running.get(key, 0) + 1
+                peak[key] = max(peak.get(key, 0), running[key])
+                await asyncio.sleep(0.02)
+                running[key] -= 1
+                return {"success": True}
+            return job
+
+        engine = JobEngine(workers=4, per_key_limit=1)
+        jobs = [(f"job-{i}", f"fw-{i % 2}", make_job(f"fw-{i % 2}")) for i in range(8)]
+        run_jobs(engine, jobs)
+
+        assert peak == {"fw-0": 1, "fw-1": 1}
+        assert all(engine.state(job_id)["status"] == JOB_COMPLETED for job_id, _, _ in jobs)
+
+    def test_errors_and_progress_updates(self):
+        updates = []
+
+        async def ok():
+            report_progress(0.5, "half")
+            ProgressStage("compare", 0.5, 1.0, total=10).update(5, rules_compared=5)
+            return {"success": True}
+
+        async def failed():
+            return {"success": False, "message": "bad input"}
+
+        async def broken():
+            raise ValueError("boom")
+
+        engine = JobEngine(workers=2, per_key_limit=2, on_update=lambda job_id, fields: updates.append((job_id, fields)))
+        set_job_engine(engine)
+        try:
+            run_jobs(engine, [("ok", "fw", ok), ("failed", "fw", failed), ("broken", "fw", broken)])
+        finally:
+            set_job_engine(None)
+
+        assert engine.state("ok")["status"] == JOB_COMPLETED
+        assert ("ok", {"progress": 0.5, "message": "half", "metrics": {}}) in updates
+        stage_update = next(fields for job_id, fields in updates if fields.get("metrics", {}).get("stage") == "compare")
+        assert stage_update["progress"] == 0.75
+        assert stage_update["metrics"]["rules_compared"] == 5
+        assert engine.state("failed")["status"] == JOB_ERROR
+        assert engine.state("failed")["error"] == "bad input"
+        assert engine.state("broken")["error"] == "boom"
+
+    def test_progress_scope(self):
+        updates = []
+
+        async def pipeline():
+            for index in range(2):
+                with progress_scope(index / 2, (index + 1) / 2, step_index=index):
+                    report_progress(0.5)
+            return {"success": True}
+
+        engine = JobEngine(workers=1, per_key_limit=1, on_update=lambda job_id, fields: updates.append(fields))
+        set_job_engine(engine)
+        try:
+            run_jobs(engine, [("pipeline", "fw", pipeline)])
+        finally:
+            set_job_engine(None)
+
+        progress = [(fields["progress"], fields["metrics"]["step_index"]) for fields in updates if "metrics" in fields]
+        assert progress == [(0.25, 0), (0.75, 1)]
+
+    def test_cancel(self):
+        async def slow():
+            await asyncio.sleep(10)
+            return {"success": True}
+
+        async def main():
+            engine = JobEngine(workers=1, per_key_limit=1)
+            await engine.start()
+            await engine.submit("running", "fw", slow)
+            await engine.submit("queued", "fw", slow)
+            while engine.state("running")["status"] != "Running":
+                await asyncio.sleep(0.01)
+            assert engine.cancel("queued")
+            assert engine.cancel("running")
+            while engine.state("running")["status"] not in FINISHED_STATUSES:
+                await asyncio.sleep(0.01)
+            assert not engine.cancel("running")
+            await engine.stop()
+            return engine
+
+        engine = asyncio.run(main())
+        assert engine.state("running")["status"] == JOB_CANCELLED
+        assert engine.state("queued")["status"] == JOB_CANCELLED
+
+    def test_estimate_eta(self):
+        from datetime import datetime, timedelta
+        now = datetime.now()
+        state = {"status": "Running", "progress": 0.25, "started_at": now - timedelta(seconds=10)}
+        assert estimate_eta(state, now) == 30.0
+        assert estimate_eta({**state, "progress": 0}, now) is None
+
+class TestProgressBroker:
+    def test_publish_and_snapshot(self):
+        async def main():
+            broker = ProgressBroker(queue_size=2)
+            queue = broker.subscribe("p1")
+            broker.publish("p1", {"type": "job", "job_id": "a", "progress": 0.1})
+            broker.publish("p1", {"type": "job", "job_id": "a", "progress": 0.2})
+            broker.publish("p1", {"type": "job", "job_id": "b", "progress": 0.5})
+            broker.publish("p2", {"type": "job", "job_id": "c", "progress": 0.5})
+
+            # 큐가 가득 차면 오래된 이벤트부터 버림
+            received = [queue.get_nowait()["progress"] for _ in range(queue.qsize())]
+            assert received == [0.2, 0.5]
+            assert [event["progress"] for event in broker.snapshot("p1")] == [0.2, 0.5]
+
+            broker.publish("p1", {"type": "job", "job_id": "a", "finished": True})
+            assert [event["job_id"] for event in broker.snapshot("p1")] == ["b"]
+
+            broker.unsubscribe("p1", queue)
+            assert format_sse({"id": 3, "type": "job"}).startswith("id: 3\nevent: job\ndata: ")
+        asyncio.run(main())
+
+class TestTimeBudget:
+    def test_timeout(self):
+        async def hung():
+            await asyncio.sleep(10)
+
+        with pytest.raises(TaskCancelled) as info:
+            asyncio.run(run_with_budget(hung(), 0.05))
+        assert info.value.reason == JOB_TIMEOUT
+        assert "0.05s" in str(info.value)
+
+    def test_thread_loop_stops_cooperatively(self):
+        stopped = []
+
+        def hot_loop():
+            try:
+                while True:
+                    check_cancelled()
+                    time.sleep(0.001)
+            except TaskCancelled as e:
+                stopped.append(e.reason)
+                raise
+
+        with pytest.raises(TaskCancelled):
+            asyncio.run(run_with_budget(asyncio.to_thread(hot_loop), 0.05))
+        time.sleep(0.05)
+        assert stopped == [JOB_TIMEOUT]
+
+    def test_within_budget(self):
+        async def quick():
+            return 42
+
+        assert asyncio.run(run_with_budget(quick(), 1)) == 42
+        assert asyncio.run(run_with_budget(quick(), None)) == 42
+
+class TestCheckpoint:
+    def test_save_is_throttled(self):
+        saved = []
+        with checkpoint_scope({"done": 1}, saved.append, interval=60):
+            assert load_checkpoint() == {"done": 1}
+            save_checkpoint({"done": 2})
+            save_checkpoint({"done": 3})
+            save_checkpoint({"done": 4}, force=True)
+            assert load_checkpoint() == {"done": 4}
+        assert saved == [{"done": 2}, {"done": 4}]
+
+        # 단계 밖에서는 저장하지 않음
+        save_checkpoint({"done": 5})
+        assert load_checkpoint() is None
@@ -0,0 +1,328 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import artifact_store
+import executor
+import firewall_client
+import firewall_session
+import main
+import policy_store
+import upload_store
+from config import AppConfig
+from job_engine import FINISHED_STATUSES
+
+DIRECTORIES = {
+    "APP_DIR": "", "STORAGE_DIR": "storage", "RESULT_DIR": "storage/results",
+    "SHADOW_STATE_DIR": "storage/shadow_state", "ARTIFACT_DIR": "storage/artifacts",
+    "UPLOAD_DIR": "storage/uploads", "DB_DIR": "database", "LOG_DIR": "logs"
+}
+
+def rule(name: str, source: str, destination: str, service: str = "tcp/443", action: str = "allow", extra: str = "") -> str:
+    return (f'<entry name="{name}"><source><member>{source}</member></source>'
+            f'<destination><member>{destination}</member></destination>'
+            f'<service><member>{service}</member></service><action>{action}</action>{extra}</entry>')
+
+def config_xml(*rules: str) -> str:
+    return ('<config><devices><entry name="localhost.localdomain">'
+            '<deviceconfig><system><hostname>fw-test</hostname></system></deviceconfig>'
+            '<vsys><entry name="vsys1"><rulebase><security><rules>'
+            + "".join(rules) +
+            '</rules></security></rulebase></entry></vsys></entry></devices></config>')
+
+@pytest.fixture
+def app_env(tmp_path, monkeypatch):
+    """임시 디렉토리와 DB 로 main 앱을 구성 (분석은 같은 프로세스에서 실행)"""
+    for name, relative in DIRECTORIES.items():
+        monkeypatch.setattr(AppConfig, name, tmp_path / relative)
+    monkeypatch.setattr(AppConfig, "ANALYSIS_EXECUTOR", "inline")
+    monkeypatch.setattr(AppConfig, "SCHEDULER_ENABLED", False)
+    monkeypatch.setattr(AppConfig, "CHECKPOINT_INTERVAL", 0.0)
+    for module, name in ((policy_store, "_policy_store"), (artifact_store, "_artifact_store"),
+                         (upload_store, "_upload_store"), (executor, "_analysis_executor"),
+                         (firewall_session, "_session_pool")):
+        monkeypatch.setattr(module, name, None)
+
+    (tmp_path / "database").mkdir(parents=True)
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'database' / 'firewall_policies.db'}",
+        json_serializer=lambda value: json.dumps(value, default=main.policy_json_default)
+    )
+    monkeypatch.setattr(main, "engine", engine)
+    monkeypatch.setattr(main, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    return tmp_path
+
+def create_project(client: TestClient, template_name: str) -> str:
+    template = next(item for item in main.project_templates if item["name"] == template_name)
+    tasks = [{"name": task["name"], "type": task["type"]} for task in template["tasks"]]
+    assert client.post("/projects", json={"name": template_name, "tasks": tasks}).status_code == 200
+    return client.get("/projects").json()[0]["id"]
+
+def wait_job(client: TestClient, job_id: str, timeout: float = 30.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in FINISHED_STATUSES:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def run_task(client: TestClient, project_id: str, task_name: str, **params) -> dict:
+    response = client.post("/update-task", json={"project_id": project_id, "task_name": task_name, **params})
+    assert response.status_code == 200, response.text
+    return wait_job(client, response.json()["job_id"])
+
+def upload(client: TestClient, text: str) -> str:
+    response = client.post("/uploads?filename=running-config.xml", content=text.encode("utf-8"))
+    assert response.status_code == 200, response.text
+    return response.json()["upload_id"]
+
+def task_statuses(client: TestClient, project_id: str) -> dict:
+    project = next(item for item in client.get("/projects").json() if item["id"] == project_id)
+    return {task["name"]: task["status"] for task in project["tasks"]}
+
+def step_marker(project_id: str, task_name: str) -> dict:
+    with main.get_db() as db:
+        task = db.query(main.Task).filter(main.Task.project_id == project_id, main.Task.name == task_name).first()
+        return task.intermediate_result or {}
+
+def wait_until(condition, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not met")
+        time.sleep(0.02)
+
+def block_shards(monkeypatch, allowed: int) -> dict:
+    """처음 allowed 개 샤드만 실행하고 나머지는 취소될 때까지 멈춤 (limit 를 None 으로 바꾸면 모두 실행)"""
+    run = executor.InlineExecutor.run
+    shards = {"limit": allowed, "started": 0}
+
+    async def blocking_run(self, func, *args):
+        if func.__name__ == "run_shadow_shard":
+            shards["started"] += 1
+            if shards["limit"] is not None and shards["started"] > shards["limit"]:
+                await asyncio.Event().wait()
+        return await run(self, func, *args)
+
+    monkeypatch.setattr(executor.InlineExecutor, "run", blocking_run)
+    return shards
+
+def shadow_config(count: int) -> str:
+    # 마지막 규칙이 앞의 규칙과 모두 겹침 (shadow 쌍 count 개)
+    return config_xml(*(rule(f"r{index}", f"10.0.{index}.0/24", "192.168.1.0/24") for index in range(count)),
+                      rule("wide", "10.0.0.0/8", "any", "any", "deny"))
+
+class TestPipeline:
+    def test_shadow_pipeline_without_shadows_downloads_zero_rows(self, app_env):
+        with TestClient(main.app) as client:
+            project_id = create_project(client, "Offline Shadow Policy Analysis")
+            upload_id = upload(client, config_xml(
+                rule("web", "10.0.0.0/24", "192.168.1.0/24"),
+                rule("db", "10.0.1.0/24", "192.168.2.0/24", "tcp/5432")
+            ))
+            job = run_task(client, project_id, "Upload Configuration", upload_id=upload_id)
+
+            # 분석 결과가 0건이어도 다운로드 단계까지 성공
+            assert job["status"] == "Completed", job["error"]
+            assert task_statuses(client, project_id) == {
+                "Upload Configuration": "Completed", "Process Shadow Policies": "Completed", "Download Rules": "Completed"
+            }
+            result = client.get(f"/task-result/{project_id}/Download Rules").json()["result"]
+            assert result["data"]["total_count"] == 0
+            assert client.get(f"/task-result/{project_id}/Download Rules/rows").json()["total"] == 0
+
+    def test_repeated_shadow_analysis_is_incremental(self, app_env):
+        rules = [rule("web", "10.0.0.0/24", "192.168.1.0/24"), rule("wide", "10.0.0.0/8", "any", "any", "deny")]
+        with TestClient(main.app) as client:
+            summaries = []
+            for _ in range(2):
+                project_id = create_project(client, "Offline Shadow Policy Analysis")
+                job = run_task(client, project_id, "Upload Configuration", upload_id=upload(client, config_xml(*rules)))
+                assert job["status"] == "Completed", job["error"]
+                result = client.get(f"/task-result/{project_id}/Process Shadow Policies").json()["result"]
+                summaries.append(result["data"]["analysis_summary"])
+
+        assert [summary["shadow_count"] for summary in summaries] == [1, 1]
+        assert summaries[0]["incremental"] is None
+        assert summaries[1]["incremental"]["vsys1"] == {
+            "mode": "incremental", "added": 0, "removed": 0, "modified": 0, "reordered": 0, "recomputed": 0
+        }
+
+    def test_firewall_pipeline_runs_every_step(self, app_env):
+        with TestClient(main.app) as client:
+            project_id = create_project(client, "Export Security Rules")
+            assert run_task(client, project_id, "Select a Firewall Type", type="paloalto")["status"] == "Completed"
+            job = run_task(client, project_id, "Connect to Firewall", ip="10.1.1.1", id="admin", pw="secret")
+
+            assert job["status"] == "Completed", job["error"]
+            assert set(task_statuses(client, project_id).values()) == {"Completed"}
+            rows = client.get(f"/task-result/{project_id}/Download Rules/rows").json()
+            assert rows["total"] == firewall_client.FirewallClient.mock_policy_count
+            # 비밀번호는 실행 표시나 결과에 남지 않음
+            assert "secret" not in json.dumps(client.get("/projects").json())
+
+class TestResume:
+    def test_shadow_step_resumes_from_shard_checkpoint(self, app_env, monkeypatch):
+        monkeypatch.setattr(AppConfig, "SHADOW_SHARD_MIN_RULES", 1)
+        shards = block_shards(monkeypatch, 3)
+        with TestClient(main.app) as client:
+            project_id = create_project(client, "Offline Shadow Policy Analysis")
+            response = client.post("/update-task", json={
+                "project_id": project_id, "task_name": "Upload Configuration", "upload_id": upload(client, shadow_config(15))
+            })
+            assert response.status_code == 200
+            wait_until(lambda: len((step_marker(project_id, "Process Shadow Policies").get("checkpoint") or {}).get("shards", {})) == 3)
+        # 서버 종료: 실행 중이던 단계의 실행 표시와 체크포인트가 남음
+        marker = step_marker(project_id, "Process Shadow Policies")
+        assert marker["running"] and marker["checkpoint"]["shard_count"] > 3
+        assert step_marker(project_id, "Upload Configuration")["success"]
+
+        shards.update(limit=None, started=0)
+        with TestClient(main.app) as client:
+            with main.get_db() as db:
+                job_id = db.query(main.Job).filter(main.Job.message == "Resumed after server restart").one().id
+            job = wait_job(client, job_id)
+
+            assert job["status"] == "Completed", job["error"]
+            # 끝난 샤드는 다시 계산하지 않고, 먼저 끝난 단계도 확정됨
+            assert shards["started"] == marker["checkpoint"]["shard_count"] - 3
+            assert set(task_statuses(client, project_id).values()) == {"Completed"}
+            result = client.get(f"/task-result/{project_id}/Process Shadow Policies").json()["result"]
+            assert result["data"]["analysis_summary"]["shadow_count"] == 15
+
+    def test_interrupted_firewall_import_is_not_resumed(self, app_env, monkeypatch):
+        async def blocked_count(self, vsys=None):
+            await asyncio.Event().wait()
+        monkeypatch.setattr(firewall_client.FirewallClient, "count_policies", blocked_count)
+
+        with TestClient(main.app) as client:
+            project_id = create_project(client, "Export Security Rules")
+            run_task(client, project_id, "Select a Firewall Type", type="paloalto")
+            response = client.post("/update-task", json={
+                "project_id": project_id, "task_name": "Connect to Firewall", "ip": "10.1.1.1", "id": "admin", "pw": "secret"
+            })
+            assert response.status_code == 200
+            wait_until(lambda: step_marker(project_id, "Import Configuration").get("running"))
+
+        # 재시작 후에는 로그인 세션이 없으므로 이어서 실행하지 않고 오류로 표시
+        with TestClient(main.app) as client:
+            with main.get_db() as db:
+                assert db.query(main.Job).filter(main.Job.message == "Resumed after server restart").count() == 0
+            statuses = task_statuses(client, project_id)
+            assert statuses["Import Configuration"] == "Error"
+            assert statuses["Download Rules"] == "Waiting"
+            assert step_marker(project_id, "Import Configuration") == {}
+
+class TestJobs:
+    def test_cancel_running_job(self, app_env, monkeypatch):
+        monkeypatch.setattr(AppConfig, "SHADOW_SHARD_MIN_RULES", 1)
+        block_shards(monkeypatch, 0)
+        with TestClient(main.app) as client:
+            project_id = create_project(client, "Offline Shadow Policy Analysis")
+            response = client.post("/update-task", json={
+                "project_id": project_id, "task_name": "Upload Configuration", "upload_id": upload(client, shadow_config(5))
+            })
+            job_id = response.json()["job_id"]
+            wait_until(lambda: step_marker(project_id, "Process Shadow Policies").get("running"))
+
+            assert client.post(f"/jobs/{job_id}/cancel").status_code == 200
+            job = wait_job(client, job_id)
+            assert job["status"] == "Cancelled"
+            assert task_statuses(client, project_id) == {
+                "Upload Configuration": "Completed", "Process Shadow Policies": "Cancelled", "Download Rules": "Waiting"
+            }
+            assert client.post(f"/jobs/{job_id}/cancel").status_code == 409
+            assert client.post("/jobs/unknown/cancel").status_code == 404
+
+class TestFleets:
+    def test_fleet_runs_every_target_and_consolidates(self, app_env):
+        targets = [{"type": "paloalto", "ip": ip, "id": "admin", "pw": "secret"} for ip in ("10.1.1.1", "10.1.1.2")]
+        with TestClient(main.app) as client:
+            response = client.post("/fleets", json={"name": "nightly", "template": "Export Security Rules", "targets": targets})
+            assert response.status_code == 200, response.text
+            fleet_id = response.json()["fleet"]["id"]
+            assert wait_job(client, response.json()["job_id"])["status"] == "Completed"
+
+            fleet = client.get(f"/fleets/{fleet_id}").json()
+            assert fleet["status"] == "Completed"
+            assert [target["status"] for target in fleet["targets"]] == ["Completed", "Completed"]
+            total = 2 * firewall_client.FirewallClient.mock_policy_count
+            assert fleet["result"]["total_policies"] == total
+            assert client.get(f"/fleets/{fleet_id}/rows").json()["total"] == total
+
+    def test_fleet_rejects_upload_template(self, app_env):
+        with TestClient(main.app) as client:
+            response = client.post("/fleets", json={
+                "name": "offline", "template": "Offline Shadow Policy Analysis", "targets": [{"type": "paloalto", "ip": "10.1.1.1"}]
+            })
+            assert response.status_code == 400
+
+class TestSchedules:
+    def create_schedule(self, client: TestClient) -> str:
+        response = client.post("/targets", json={"type": "paloalto", "ip": "10.1.1.1", "id": "admin", "pw_ref": "env:FW_TEST_PW"})
+        assert response.status_code == 200, response.text
+        response = client.post("/schedules", json={
+            "name": "nightly", "template": "Export Security Rules", "cron": "0 2 * * *",
+            "target_ids": [response.json()["id"]], "jitter_seconds": 0, "stagger_seconds": 0
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    def test_run_schedule_reads_password_ref(self, app_env, monkeypatch):
+        with TestClient(main.app) as client:
+            schedule_id = self.create_schedule(client)
+            # 비밀번호 참조의 값이 없으면 실행하지 않음
+            assert client.post(f"/schedules/{schedule_id}/run").status_code == 400
+
+            monkeypatch.setenv("FW_TEST_PW", "secret")
+            response = client.post(f"/schedules/{schedule_id}/run")
+            assert response.status_code == 200, response.text
+            assert wait_job(client, response.json()["job_id"])["status"] == "Completed"
+            assert client.get(f"/fleets/{response.json()['fleet_id']}").json()["status"] == "Completed"
+            assert client.get(f"/schedules/{schedule_id}").json()["last_fleet_id"] == response.json()["fleet_id"]
+
+    def test_due_schedule_runs_once(self, app_env, monkeypatch):
+        monkeypatch.setenv("FW_TEST_PW", "secret")
+        with TestClient(main.app) as client:
+            schedule_id = self.create_schedule(client)
+            next_run_at = datetime.fromisoformat(client.get(f"/schedules/{schedule_id}").json()["next_run_at"])
+
+            client.portal.call(main._run_due_schedules, next_run_at - timedelta(seconds=1))
+            assert client.get(f"/schedules/{schedule_id}").json()["last_fleet_id"] is None
+
+            client.portal.call(main._run_due_schedules, next_run_at)
+            schedule = client.get(f"/schedules/{schedule_id}").json()
+            assert schedule["last_fleet_id"] is not None
+            assert datetime.fromisoformat(schedule["next_run_at"]) > next_run_at
+            fleet = client.get(f"/fleets/{schedule['last_fleet_id']}").json()
+            assert wait_job(client, fleet["job_id"])["status"] == "Completed"
+
+class TestProjectStorage:
+    def test_delete_project_removes_results_and_artifacts(self, app_env, monkeypatch):
+        monkeypatch.setattr(AppConfig, "ARTIFACT_SWEEP_GRACE", 0.0)
+        with TestClient(main.app) as client:
+            projects = []
+            for name in ("first", "second"):
+                project_id = create_project(client, "Offline Shadow Policy Analysis")
+                xml = config_xml(rule(name, "10.0.0.0/24", "192.168.1.0/24"), rule("wide", "10.0.0.0/8", "any", "any", "deny"))
+                assert run_task(client, project_id, "Upload Configuration", upload_id=upload(client, xml))["status"] == "Completed"
+                projects.append(project_id)
+
+            artifacts = lambda: sorted(path.name for path in AppConfig.ARTIFACT_DIR.rglob("*.ndjson.gz"))
+            result_dirs = lambda: sorted(path.name for path in AppConfig.RESULT_DIR.iterdir())
+            assert len(artifacts()) == 2 and len(result_dirs()) == 2
+
+            assert client.delete(f"/delete-project/{projects[0]}").status_code == 200
+            # 남은 프로젝트의 결과와 아티팩트만 유지
+            remaining = client.get(f"/task-result/{projects[1]}/Process Shadow Policies").json()["result"]
+            assert artifacts() == [f"{remaining['data']['artifact']['id']}.ndjson.gz"]
+            with main.get_db() as db:
+                task_ids = [task.id for task in db.query(main.Task).filter(main.Task.project_id == projects[1])]
+            assert set(result_dirs()) <= set(task_ids) and len(result_dirs()) == 1
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from mf2_parser import iter_mf2_policies, iter_mf2_file, aiter_mf2_channel, load_mf2_table, MF2_PROMPT
+from mock_firewall import MockFirewall, MockFirewallSettings, start_mf2_server
+from utils.firewall_utils import build_mock_policy
+
+FIELDS = ("seq", "rulename", "vsys", "action", "source", "destination", "service", "description")
+
+def expected(count):
+    return [{field: build_mock_policy(i)[field] for field in FIELDS} for i in range(count)]
+
+class TestMf2Parser:
+    def test_parse_dump_file(self, tmp_path):
+        firewall = MockFirewall(MockFirewallSettings(rules=50))
+        path = tmp_path / "policy.txt"
+        path.write_text("MF2> show policy\n" + "".join(firewall.iter_mf2_blocks()) + MF2_PROMPT)
+
+        assert list(iter_mf2_file(str(path))) == expected(50)
+        table = load_mf2_table(str(path))
+        assert table.to_dicts() == expected(50)
+
+    def test_continuation_and_extra_fields(self):
+        dump = (
+            "[Rule 7]\n"
+            "  name        : wrapped\n"
+            "  source      : 10.0.0.0/8\n"
+            "                172.16.0.0/12 fe80::1/64\n"
+            "  hit-count   : 42\n"
+            "  description : first line\n"
+            "                second: line\n"
+            "[Rule 8]\r\n"
+            "  name        : last\r\n"
+        )
+        assert list(iter_mf2_policies(dump.splitlines(keepends=True))) == [
+            {"seq": "7", "rulename": "wrapped", "source": ["10.0.0.0/8", "172.16.0.0/12", "fe80::1/64"],
+             "hit_count": 42, "description": "first line second: line"},
+            {"seq": "8", "rulename": "last"}
+        ]
+
+    def test_cli_error_is_raised(self):
+        with pytest.raises(ValueError, match="connection reset"):
+            list(iter_mf2_policies(["[Rule 1]\n", "  name : a\n", "% Error: connection reset by peer\n"]))
+        with pytest.raises(ValueError, match="no name"):
+            list(iter_mf2_policies(["[Rule 1]\n", "  action : allow\n"]))
+
+    def test_parse_ssh_channel(self):
+        firewall = MockFirewall(MockFirewallSettings(rules=2500, page_size=500))
+
+        async def main():
+            server = await start_mf2_server(firewall, port=0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                await reader.readuntil(b"login: ")
+                writer.write(b"admin\n")
+                await reader.readuntil(b"Password: ")
+                writer.write(b"1234\n")
+                await reader.readuntil(MF2_PROMPT.encode())
+                writer.write(b"show policy\n")
+                pages = [page async for page in aiter_mf2_channel(reader.read, chunk_size=4096, page_size=1000)]
+                writer.write(b"exit\n")
+                await reader.read()
+                writer.close()
+                return pages
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        pages = asyncio.run(main())
+        assert all(len(page) >= 1000 for page in pages[:-1])
+        assert [policy for page in pages for policy in page] == expected(2500)
+
+    def test_channel_split_multibyte_characters(self):
+        dump = "[Rule 1]\n  name        : 정책_한글\n".encode("utf-8") + MF2_PROMPT.encode()
+        chunks = [dump[i:i + 3] for i in range(0, len(dump), 3)]
+
+        async def main():
+            async def read(size):
+                return chunks.pop(0) if chunks else b""
+            return [page async for page in aiter_mf2_channel(read)]
+
+        assert asyncio.run(main()) == [[{"seq": "1", "rulename": "정책_한글"}]]
@@ -0,0 +1,127 @@
+import asyncio
+import xml.etree.ElementTree as ET
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from firewall_client import HttpFirewallClient, retry_after_seconds
+from mock_firewall import MockFirewall, MockFirewallSettings, create_app, start_mf2_server, MF2_PROMPT
+
+def make_client(firewall, pw="1234"):
+    client = HttpFirewallClient("10.0.0.1", "admin", pw, "http://{ip}", cache_ttl=0,
+                                transport=httpx.ASGITransport(app=create_app(firewall)))
+    client.retry_backoff = 0.001
+    return client
+
+def fetch_all(client, page_size=250):
+    async def main():
+        await client.get_api_key()
+        try:
+            return [policy async for policy in client.iter_policies(page_size=page_size, prefetch=2)]
+        finally:
+            await client.disconnect()
+    return asyncio.run(main())
+
+class TestMockFirewall:
+    def test_paged_fetch_through_http_client(self):
+        firewall = MockFirewall(MockFirewallSettings(rules=1234, page_size=100))
+        policies = fetch_all(make_client(firewall))
+        assert [policy["seq"] for policy in policies] == [str(i + 1) for i in range(1234)]
+        # 요청한 페이지가 서버 최대 페이지보다 크면 나누어 조회
+        assert firewall.stats["rules_served"] == 1234
+        assert not firewall.keys
+
+    def test_vsys_fetch_through_http_client(self):
+        firewall = MockFirewall(MockFirewallSettings(rules=1000, page_size=100))
+        client = make_client(firewall)
+        timings = {}
+
+        async def main():
+            await client.get_api_key()
+            try:
+                return [policy async for page in client.iter_vsys_policy_pages(page_size=150, timings=timings)
+                        for policy in page]
+            finally:
+                await client.disconnect()
+
+        policies = asyncio.run(main())
+        assert [policy["seq"] for policy in policies] == [str(i + 1) for i in range(1000)]
+        assert {vsys: timing["rules"] for vsys, timing in timings.items()} == {"vsys1": 334, "vsys2": 333, "vsys3": 333}
+
+    def test_wrong_password(self):
+        firewall = MockFirewall(MockFirewallSettings(rules=10))
+        with pytest.raises(Exception, match="Authentication failed"):
+            fetch_all(make_client(firewall, pw="wrong"))
+
+    def test_errors_and_rate_limit_are_retried(self):
+        firewall = MockFirewall(MockFirewallSettings(rules=2000, page_size=100, error_rate=0.2, rate_limit=10, seed=7))
+        client = make_client(firewall)
+        client.retries = 10
+        policies = fetch_all(client, page_size=100)
+        assert len(policies) == 2000
+        assert firewall.stats["errors"] > 0
+        assert firewall.stats["rate_limited"] > 0
+
+    def test_retry_after_http_date(self):
+        assert retry_after_seconds("2") == 2.0
+        assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert retry_after_seconds("soon") is None
+
+        responses = iter([
+            httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+            httpx.Response(200, json={"token": "key"}),
+            httpx.Response(500, text="down")
+        ])
+        client = HttpFirewallClient("10.0.0.1", "admin", "1234", "http://{ip}", retries=1,
+                                    transport=httpx.MockTransport(lambda request: next(responses)))
+
+        async def main():
+            assert await client.get_api_key() == "key"
+            # 다시 로그인하다 실패하면 연결이 끊긴 상태
+            with pytest.raises(Exception, match="500"):
+                await client.get_api_key()
+            assert not client.is_connected() and client.api_key is None
+
+        asyncio.run(main())
+
+    def test_paloalto_xml(self):
+        firewall = MockFirewall(MockFirewallSettings(rules=30))
+        with TestClient(create_app(firewall)) as http:
+            assert http.get("/api/", params={"type": "keygen", "user": "admin", "password": "bad"}).status_code == 403
+            key = ET.fromstring(http.get("/api/", params={"type": "keygen", "user": "admin", "password": "1234"}).text)
+            response = http.get("/api/", params={"type": "config", "action": "get", "key": key.findtext("result/key")})
+        root = ET.fromstring(response.text)
+        vsys = root.findall("result/config/devices/entry/vsys/entry")
+        assert [entry.get("name") for entry in vsys] == ["vsys1", "vsys2", "vsys3"]
+        rules = vsys[0].findall("rulebase/security/rules/entry")
+        assert len(rules) == 10
+        assert rules[0].get("name") == firewall.policy(0)["rulename"]
+        assert [member.text for member in rules[0].findall("source/member")] == firewall.policy(0)["source"]
+
+    def test_mf2_session(self):
+        firewall = MockFirewall(MockFirewallSettings(rules=25, page_size=10))
+
+        async def main():
+            server = await start_mf2_server(firewall, port=0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                await reader.readuntil(b"login: ")
+                writer.write(b"admin\n")
+                await reader.readuntil(b"Password: ")
+                writer.write(b"1234\n")
+                await reader.readuntil(MF2_PROMPT.encode())
+                writer.write(b"show policy\n")
+                output = (await reader.readuntil(MF2_PROMPT.encode())).decode()
+                writer.write(b"exit\n")
+                await reader.read()
+                writer.close()
+                return output
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        output = asyncio.run(main())
+        assert output.count("[Rule ") == 25
+        assert f"  name        : {firewall.policy(24)['rulename']}" in output
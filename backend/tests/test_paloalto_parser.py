@@ -0,0 +1,136 @@
+import tracemalloc
+
+import pytest
+
+from mock_firewall import MockFirewall, MockFirewallSettings
+from paloalto_parser import iter_paloalto_rules, load_paloalto_objects
+from shadow_analyzer import SHADOW_ENGINES, analyze_shadow_policies, find_shadow_pairs
+from shadow_incremental import build_shadow_states, incremental_shadow_pairs
+
+CONFIG = """<?xml version="1.0"?>
+<config version="10.1.0">
+  <shared>
+    <address><entry name="dns-srv"><ip-netmask>10.0.0.53</ip-netmask></entry></address>
+    <service><entry name="dns"><protocol><udp><port>53</port></udp></protocol></entry></service>
+  </shared>
+  <devices><entry name="localhost.localdomain">
+    <deviceconfig><system><hostname>fw-edge-01</hostname></system></deviceconfig>
+    <vsys><entry name="vsys1">
+      <rulebase><security><rules>
+        <entry name="allow-web">
+          <from><member>trust</member></from><to><member>untrust</member></to>
+          <source><member>web-servers</member></source>
+          <destination><member>any</member></destination>
+          <service><member>web</member><member>service-https</member></service>
+          <application><member>ssl</member></application>
+          <action>allow</action>
+          <description>web out</description>
+          <tag><member>prod</member></tag>
+        </entry>
+        <entry name="dns">
+          <source><member>10.1.0.0/16</member></source>
+          <destination><member>dns-srv</member></destination>
+          <service><member>dns</member></service>
+          <action>deny</action><disabled>yes</disabled><negate-source>yes</negate-source>
+        </entry>
+      </rules></security></rulebase>
+      <address>
+        <entry name="web-1"><ip-netmask>10.1.1.10/32</ip-netmask></entry>
+        <entry name="web-range"><ip-range>10.1.2.1-10.1.2.9</ip-range></entry>
+        <entry name="dns-srv"><ip-netmask>10.9.9.53</ip-netmask></entry>
+      </address>
+      <address-group>
+        <entry name="web-servers"><static><member>web-1</member><member>more-web</member></static></entry>
+        <entry name="more-web"><static><member>web-range</member><member>web-servers</member></static></entry>
+      </address-group>
+      <service>
+        <entry name="http-alt"><protocol><tcp><port>8080,8000-8010</port></tcp></protocol></entry>
+      </service>
+      <service-group>
+        <entry name="web"><members><member>http-alt</member><member>service-http</member></members></entry>
+      </service-group>
+    </entry>
+    <entry name="vsys2">
+      <rulebase><security><rules>
+        <entry name="dns"><destination><member>dns-srv</member></destination><action>allow</action></entry>
+      </rules></security></rulebase>
+    </entry></vsys>
+  </entry></devices>
+</config>
+"""
+
+class TestPaloaltoParser:
+    def test_rules_resolve_objects(self, tmp_path):
+        path = tmp_path / "running-config.xml"
+        path.write_text(CONFIG)
+
+        objects, hostname = load_paloalto_objects(str(path))
+        assert hostname == "fw-edge-01"
+        assert objects.counts() == {"address": 4, "address_group": 2, "service": 2, "service_group": 1}
+
+        rules = list(iter_paloalto_rules(str(path)))
+        assert rules[0] == {
+            "vsys": "vsys1", "seq": "1", "rulename": "allow-web", "enable": True, "action": "allow",
+            "from": ["trust"], "to": ["untrust"],
+            "source": ["10.1.1.10/32", "10.1.2.1-10.1.2.9"],
+            "user": ["any"], "destination": ["any"],
+            "service": ["tcp/8080", "tcp/8000-8010", "tcp/80", "tcp/443"],
+            "application": ["ssl"], "description": "web out", "tags": ["prod"]
+        }
+        # vsys 객체가 shared 객체보다 우선
+        assert rules[1]["enable"] is False and rules[1]["negate_source"] is True
+        assert rules[1]["destination"] == ["10.9.9.53"] and rules[1]["service"] == ["udp/53"]
+        assert (rules[2]["vsys"], rules[2]["seq"], rules[2]["destination"]) == ("vsys2", "3", ["10.0.0.53"])
+
+    @pytest.mark.parametrize("engine", sorted(SHADOW_ENGINES))
+    def test_negated_rules_in_shadow_analysis(self, tmp_path, engine):
+        def entry(name, source, action, negate=""):
+            return (f'<entry name="{name}"><source><member>{source}</member></source>'
+                    f'<destination><member>any</member></destination><service><member>any</member></service>'
+                    f'<action>{action}</action>{negate}</entry>')
+        path = tmp_path / "running-config.xml"
+        path.write_text(
+            '<config><devices><entry name="localhost.localdomain"><vsys><entry name="vsys1">'
+            '<rulebase><security><rules>'
+            + entry("other", "172.16.0.0/16", "allow")
+            + entry("r1", "10.0.0.0/24", "allow")
+            + entry("r2", "10.0.0.0/24", "deny", "<negate-source>yes</negate-source>")
+            + entry("r3", "10.0.0.0/8", "allow")
+            + '</rules></security></rulebase></entry></vsys></entry></devices></config>'
+        )
+        policies = list(iter_paloalto_rules(str(path)))
+
+        # r2 는 10.0.0.0/24 밖의 출발지에만 일치하므로 r1 과 겹치지 않음
+        assert find_shadow_pairs(policies, engine) == [(0, 2), (1, 3), (2, 3)]
+        entries = {entry["rulename"]: entry for entry in analyze_shadow_policies(policies, engine)}
+        assert entries["r1"]["shadowed_by"] == "r3" and entries["r1"]["shadow_type"] == "Redundant"
+        assert entries["other"]["shadowed_by"] == "r2"
+        assert entries["r2"]["shadow_details"]["overlapping_sources"] == ["!10.0.0.0/24"]
+
+        # 부정 여부만 바뀌어도 증분 분석이 다시 계산
+        states = build_shadow_states(policies, find_shadow_pairs(policies))
+        policies[2].pop("negate_source")
+        assert incremental_shadow_pairs(policies, states)[0] == find_shadow_pairs(policies) == [(1, 2), (2, 3)]
+
+    def test_mock_firewall_export_with_flat_memory(self, tmp_path):
+        firewall = MockFirewall(MockFirewallSettings(rules=6000))
+        path = tmp_path / "config.xml"
+        with open(path, "w") as output:
+            for part in firewall.iter_paloalto_xml():
+                output.write(part)
+
+        # 모의 방화벽은 정책을 vsys1, vsys2, vsys3 순서로 index % 3 에 따라 나누어 출력
+        order = [index for vsys_index in range(3) for index in range(vsys_index, 6000, 3)]
+
+        tracemalloc.start()
+        count = 0
+        for rule, index in zip(iter_paloalto_rules(str(path)), order):
+            expected = firewall.policy(index)
+            for key in ("rulename", "action", "source", "destination", "service"):
+                assert rule[key] == expected[key]
+            count += 1
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert count == 6000
+        # 파일 전체를 트리로 만들지 않음
+        assert peak < path.stat().st_size / 10
@@ -0,0 +1,151 @@
+from utils.firewall_utils import generate_random_policies
+from policy_store import PolicySnapshotStore
+from policy_table import PolicyTable
+
+class TestPolicySnapshotStore:
+    def make_store(self, tmp_path, **kwargs):
+        return PolicySnapshotStore(f"sqlite:///{tmp_path}/policies.db", **kwargs)
+
+    def test_roundtrip(self, tmp_path):
+        store = self.make_store(tmp_path, batch_size=64)
+        policies = generate_random_policies(300)
+        snapshot_id = store.save_snapshot(policies, project_id="1", ip="10.0.0.1")
+
+        assert store.snapshot_info(snapshot_id)["rule_count"] == 300
+        assert list(store.iter_policies(snapshot_id)) == policies
+
+        table = store.load_snapshot(snapshot_id)
+        assert isinstance(table, PolicyTable)
+        assert table.to_dicts() == policies
+
+    def test_find_policies(self, tmp_path):
+        store = self.make_store(tmp_path)
+        policies = generate_random_policies(100)
+        snapshot_id = store.save_snapshot(policies)
+
+        names = [policies[3]["rulename"], policies[50]["rulename"], "missing"]
+        assert store.find_policies(snapshot_id, rulenames=names) == [policies[3], policies[50]]
+        assert store.find_policies(snapshot_id, rulenames=[]) == []
+
+        vsys = policies[0]["vsys"]
+        assert store.find_policies(snapshot_id, vsys=vsys) == [p for p in policies if p["vsys"] == vsys]
+
+        value = policies[7]["source"][0]
+        assert store.find_policies(snapshot_id, member=("source", value)) == [
+            p for p in policies if value in p["source"]
+        ]
+
+    def test_delete_project_snapshots(self, tmp_path):
+        store = self.make_store(tmp_path)
+        snapshot_id = store.save_snapshot(generate_random_policies(10), project_id="7")
+        kept_id = store.save_snapshot(generate_random_policies(10), project_id="8")
+
+        store.delete_project_snapshots("7")
+        assert store.snapshot_info(snapshot_id) is None
+        assert list(store.iter_policies(snapshot_id)) == []
+        assert store.snapshot_info(kept_id)["rule_count"] == 10
+
+    def test_failed_stream_leaves_no_snapshot(self, tmp_path):
+        store = self.make_store(tmp_path, batch_size=16)
+        policies = generate_random_policies(100)
+
+        def stream():
+            yield from policies[:50]
+            raise ConnectionError("page fetch failed")
+
+        try:
+            store.save_snapshot(stream(), project_id="1")
+        except ConnectionError:
+            pass
+        connection = store._raw_connection()
+        try:
+            cursor = connection.cursor()
+            assert cursor.execute("SELECT COUNT(*) FROM policy_snapshot").fetchone()[0] == 0
+            assert cursor.execute("SELECT COUNT(*) FROM policy_rule").fetchone()[0] == 0
+        finally:
+            connection.close()
+
+    def rule_rows(self, store, snapshot_id):
+        connection = store._raw_connection()
+        try:
+            return connection.cursor().execute(
+                "SELECT COUNT(*) FROM policy_rule WHERE snapshot_id = ?", (snapshot_id,)
+            ).fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_delta_snapshot_stores_only_changes(self, tmp_path):
+        store = self.make_store(tmp_path, batch_size=32)
+        policies = generate_random_policies(200)
+        base_id = store.save_snapshot(policies, project_id="1", ip="10.0.0.1", delta=True)
+        assert store.snapshot_info(base_id)["base_id"] is None
+        assert self.rule_rows(store, base_id) == 200
+
+        # 중간 삽입(뒤 정책들의 seq 변경), 내용 변경, 삭제
+        changed = [dict(policy) for policy in policies[:150] if policy["rulename"] != "Rule_00010"]
+        changed.insert(5, {**policies[0], "rulename": "Rule_new", "seq": 0})
+        changed[20] = {**changed[20], "action": "deny" if changed[20]["action"] != "deny" else "allow"}
+        for seq, policy in enumerate(changed, 1):
+            policy["seq"] = seq
+        delta_id = store.save_snapshot(changed, project_id="2", ip="10.0.0.1", delta=True)
+
+        info = store.snapshot_info(delta_id)
+        assert info["base_id"] == base_id and info["depth"] == 1
+        assert info["changes"] == {"added": 1, "modified": 1, "deleted": 51}
+        assert self.rule_rows(store, delta_id) == 2
+        assert list(store.iter_policies(delta_id)) == changed
+        assert store.load_snapshot(delta_id).to_dicts() == changed
+
+        names = [changed[5]["rulename"], changed[20]["rulename"], policies[3]["rulename"]]
+        assert store.find_policies(delta_id, rulenames=names) == [changed[3], changed[5], changed[20]]
+        value = changed[7]["source"][0]
+        assert store.find_policies(delta_id, member=("source", value)) == [
+            p for p in changed if value in p["source"]
+        ]
+
+    def test_full_snapshot_interval(self, tmp_path, monkeypatch):
+        from config import AppConfig
+        monkeypatch.setattr(AppConfig, "SNAPSHOT_FULL_INTERVAL", 3)
+        store = self.make_store(tmp_path)
+        policies = generate_random_policies(20)
+        depths = [
+            store.snapshot_info(store.save_snapshot(policies, ip="10.0.0.1", delta=True))["depth"]
+            for _ in range(5)
+        ]
+        assert depths == [0, 1, 2, 0, 1]
+
+    def test_delete_keeps_referenced_base(self, tmp_path):
+        store = self.make_store(tmp_path)
+        policies = generate_random_policies(30)
+        base_id = store.save_snapshot(policies, project_id="1", ip="10.0.0.1", delta=True)
+        delta_id = store.save_snapshot(policies[:-1], project_id="2", ip="10.0.0.1", delta=True)
+
+        store.delete_project_snapshots("1")
+        assert store.snapshot_info(base_id)["project_id"] is None
+        assert list(store.iter_policies(delta_id)) == policies[:-1]
+
+        store.delete_project_snapshots("2")
+        connection = store._raw_connection()
+        try:
+            assert connection.cursor().execute("SELECT COUNT(*) FROM policy_snapshot").fetchone()[0] == 0
+        finally:
+            connection.close()
+
+    def test_migrates_old_schema(self, tmp_path):
+        import sqlite3
+        connection = sqlite3.connect(tmp_path / "policies.db")
+        connection.execute(
+            "CREATE TABLE policy_snapshot (id TEXT PRIMARY KEY, project_id TEXT, ip TEXT, "
+            "created_at TEXT NOT NULL, rule_count INTEGER NOT NULL DEFAULT 0)"
+        )
+        connection.execute(
+            "INSERT INTO policy_snapshot VALUES ('old', '1', '10.0.0.1', '2024-01-01T00:00:00', 0)"
+        )
+        connection.commit()
+        connection.close()
+
+        store = self.make_store(tmp_path)
+        policies = generate_random_policies(10)
+        snapshot_id = store.save_snapshot(policies, ip="10.0.0.1", delta=True)
+        assert store.snapshot_info(snapshot_id)["base_id"] is None
+        assert list(store.iter_policies(snapshot_id)) == policies
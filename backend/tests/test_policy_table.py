@@ -0,0 +1,54 @@
+import json
+import pickle
+
+from utils.firewall_utils import generate_random_policies
+from policy_table import PolicyTable, to_json_compatible, policy_json_default
+from shadow_analyzer import analyze_shadow_policies
+
+class TestPolicyTable:
+    def test_roundtrip(self):
+        policies = generate_random_policies(200)
+        table = PolicyTable.from_policies(policies)
+
+        assert len(table) == 200
+        assert table.to_dicts() == policies
+        assert dict(table[0]) == policies[0]
+        assert table[-1]["rulename"] == policies[-1]["rulename"]
+
+    def test_row_view_behaves_like_dict(self):
+        table = PolicyTable.from_policies(generate_random_policies(3))
+        row = table[1]
+
+        assert row.get("missing") is None
+        assert "source" in row
+        assert {**row, "extra": 1}["extra"] == 1
+        assert isinstance(row["source"], list)
+
+    def test_missing_keys_and_mixed_types(self):
+        policies = [
+            {"rulename": "a", "seq": 1, "tags": ["x"]},
+            {"rulename": "b", "seq": None, "comment": "new column"},
+            {"rulename": None, "tags": "not-a-list"}
+        ]
+        table = PolicyTable.from_policies(policies)
+
+        assert table.to_dicts() == policies
+        assert "comment" not in table[0]
+        assert table.column("seq") == [1, None, None]
+
+    def test_serialization(self):
+        policies = generate_random_policies(50)
+        table = PolicyTable.from_policies(policies)
+
+        assert json.loads(json.dumps({"policies": table}, default=policy_json_default)) == {"policies": policies}
+        assert to_json_compatible({"data": {"policies": table}}) == {"data": {"policies": policies}}
+        assert pickle.loads(pickle.dumps(table)).to_dicts() == policies
+
+    def test_strings_are_interned(self):
+        policies = [{"source": ["10.0.0.0/8", "any"]} for _ in range(100)]
+        table = PolicyTable.from_policies(policies)
+        assert len(table._pool) == 2
+
+    def test_shadow_analysis_accepts_table(self):
+        policies = generate_random_policies(300)
+        assert analyze_shadow_policies(PolicyTable.from_policies(policies)) == analyze_shadow_policies(policies)
@@ -0,0 +1,62 @@
+import pytest
+
+from utils.firewall_utils import generate_random_policies
+from result_query import ResultView, query_result
+
+def make_policies(count=500):
+    policies = generate_random_policies(count)
+    for index, policy in enumerate(policies):
+        policy["shadow_type"] = "Redundant" if index % 3 else "Conflicting"
+        policy["risk_level"] = ["low", "medium", "high"][index % 3]
+    return policies
+
+class TestResultQuery:
+    def test_filters_and_facets(self):
+        policies = make_policies()
+        page = query_result(ResultView(policies), filters={"shadow_type": "Conflicting", "action": "allow"}, limit=1000)
+
+        expected = [p for p in policies if p["shadow_type"] == "Conflicting" and p["action"] == "allow"]
+        assert page["policies"] == expected
+        assert page["total"] == len(expected)
+        assert page["total_unfiltered"] == 500
+        assert page["facets"]["shadow_type"] == {"Conflicting": len(expected)}
+
+    def test_search_and_sort(self):
+        policies = make_policies()
+        view = ResultView(policies)
+        needle = policies[10]["source"][0]
+
+        page = query_result(view, search=needle.upper(), sort="-seq", limit=1000)
+        expected = sorted(
+            (p for p in policies if any(needle.lower() in str(v).lower() for value in p.values()
+                                        for v in (value if isinstance(value, list) else [value]))),
+            key=lambda p: p["seq"], reverse=True
+        )
+        assert page["policies"] == expected
+
+        page = query_result(view, sort="action,-seq", limit=1000)
+        assert page["policies"] == sorted(sorted(policies, key=lambda p: -p["seq"]), key=lambda p: p["action"])
+
+    def test_cursor_pagination(self):
+        policies = make_policies(250)
+        view = ResultView(policies)
+
+        collected, cursor = [], None
+        while True:
+            page = query_result(view, filters={"vsys": policies[0]["vsys"]}, limit=40, cursor=cursor)
+            collected.extend(page["policies"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert collected == [p for p in policies if p["vsys"] == policies[0]["vsys"]]
+        assert query_result(view, offset=240, limit=40)["policies"] == policies[240:]
+
+    def test_invalid_requests(self):
+        view = ResultView(make_policies(10))
+        cursor = query_result(view, limit=2)["next_cursor"]
+        with pytest.raises(ValueError):
+            query_result(view, sort="seq", cursor=cursor)
+        with pytest.raises(ValueError):
+            query_result(view, filters={"rulename": "x"})
+        with pytest.raises(ValueError):
+            query_result(view, limit=0)
@@ -0,0 +1,76 @@
+import asyncio
+import gzip
+import os
+
+import pytest
+
+from utils.firewall_utils import generate_random_policies
+from config import AppConfig
+from policy_table import PolicyTable
+from result_writer import write_result, read_result_meta, iter_result_rows, assemble_result
+from task_manager import TaskManager
+
+class TestResultWriter:
+    def test_dict_roundtrip(self, tmp_path):
+        policies = generate_random_policies(50)
+        data = {"policies": PolicyTable.from_policies(policies), "total_count": 50}
+        meta = write_result(tmp_path, data)
+
+        assert meta["row_count"] == 50
+        assert meta["rows_file"].endswith(".ndjson.gz")
+        with gzip.open(tmp_path / meta["rows_file"], "rt", encoding="utf-8") as f:
+            assert sum(1 for _ in f) == 50
+
+        loaded = read_result_meta(tmp_path)
+        assert list(iter_result_rows(tmp_path, loaded)) == policies
+        assert assemble_result(loaded, iter_result_rows(tmp_path, loaded)) == {"policies": policies, "total_count": 50}
+
+    def test_list_and_plain_layouts(self, tmp_path):
+        policies = generate_random_policies(5)
+        meta = write_result(tmp_path / "a", policies, compress=False)
+        assert assemble_result(meta, iter_result_rows(tmp_path / "a", meta)) == policies
+        assert (tmp_path / "a" / meta["rows_file"]).exists() and meta["rows_file"].endswith(".ndjson")
+
+        meta = write_result(tmp_path / "b", {"message": "done"})
+        assert assemble_result(meta, iter_result_rows(tmp_path / "b", meta)) == {"message": "done"}
+
+    def test_rewrite_leaves_no_temp_files(self, tmp_path):
+        write_result(tmp_path, generate_random_policies(3), compress=False)
+        meta = write_result(tmp_path, generate_random_policies(4))
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == sorted(["result.meta.json", meta["rows_file"]])
+
+    def test_meta_is_commit_point(self, tmp_path, monkeypatch):
+        import result_writer
+
+        policies = generate_random_policies(3)
+        write_result(tmp_path, policies)
+
+        # 새 행 파일을 기록한 뒤 meta 를 교체하기 전에 중단되어도 이전 결과가 그대로 유지됨
+        replace = os.replace
+        def crash_on_meta(src, dst):
+            if str(dst).endswith(result_writer.META_FILE):
+                raise OSError("crash")
+            replace(src, dst)
+        monkeypatch.setattr(result_writer.os, "replace", crash_on_meta)
+        with pytest.raises(OSError):
+            write_result(tmp_path, generate_random_policies(5))
+        monkeypatch.undo()
+
+        meta = read_result_meta(tmp_path)
+        assert list(iter_result_rows(tmp_path, meta)) == policies
+
+        # 행 파일이 meta 의 기록과 다르면 완료된 결과로 보지 않음
+        with open(tmp_path / meta["rows_file"], "ab") as f:
+            f.write(b"x")
+        assert read_result_meta(tmp_path) is None
+
+    def test_task_manager_stream(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(AppConfig, "RESULT_DIR", tmp_path)
+        policies = generate_random_policies(20)
+        asyncio.run(TaskManager.save_task_result("task-1", {"data": {"policies": policies}}))
+
+        result = asyncio.run(TaskManager.get_task_result("task-1", stream=True))
+        assert result["row_count"] == 20
+        assert list(result["rows"]) == policies
+        assert asyncio.run(TaskManager.get_task_result("task-1"))["data"]["policies"] == policies
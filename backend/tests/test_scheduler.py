@@ -0,0 +1,47 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from scheduler import (
+    CronExpression, next_run_time, overlap_action,
+    OVERLAP_SKIP, OVERLAP_COALESCE, ACTION_RUN, ACTION_SKIP, ACTION_DEFER
+)
+
+class TestCronExpression:
+    def test_next_after(self):
+        cron = CronExpression("*/15 2 * * *")
+        assert cron.next_after(datetime(2024, 5, 1, 1, 50)) == datetime(2024, 5, 1, 2, 0)
+        assert cron.next_after(datetime(2024, 5, 1, 2, 0)) == datetime(2024, 5, 1, 2, 15)
+        assert cron.next_after(datetime(2024, 5, 1, 2, 45)) == datetime(2024, 5, 2, 2, 0)
+
+    def test_month_and_year_rollover(self):
+        assert CronExpression("@monthly").next_after(datetime(2024, 12, 15, 8, 0)) == datetime(2025, 1, 1, 0, 0)
+        assert CronExpression("0 0 29 2 *").next_after(datetime(2025, 1, 1)) == datetime(2028, 2, 29, 0, 0)
+
+    def test_weekday(self):
+        # 2024-05-01 은 수요일, 0 과 7 은 일요일
+        assert CronExpression("30 3 * * 1-5").next_after(datetime(2024, 5, 3, 4, 0)) == datetime(2024, 5, 6, 3, 30)
+        assert CronExpression("0 0 * * 7").next_after(datetime(2024, 5, 1)) == datetime(2024, 5, 5, 0, 0)
+        # 일과 요일이 모두 지정되면 둘 중 하나만 맞아도 실행
+        assert CronExpression("0 0 10 * 0").next_after(datetime(2024, 5, 1)) == datetime(2024, 5, 5, 0, 0)
+
+    @pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "a * * * *"])
+    def test_invalid(self, expression):
+        with pytest.raises(ValueError):
+            CronExpression(expression)
+
+def test_next_run_time_jitter():
+    after = datetime(2024, 5, 1, 1, 0)
+    scheduled = next_run_time("0 2 * * *", after, 60, random.Random(1))
+    assert datetime(2024, 5, 1, 2, 0) <= scheduled <= datetime(2024, 5, 1, 2, 1)
+    assert next_run_time("0 2 * * *", after) == datetime(2024, 5, 1, 2, 0)
+
+def test_overlap_action():
+    assert overlap_action(True, False, False, OVERLAP_SKIP) == ACTION_RUN
+    assert overlap_action(True, False, True, OVERLAP_SKIP) == ACTION_SKIP
+    assert overlap_action(True, False, True, OVERLAP_COALESCE) == ACTION_DEFER
+    # 이전 실행이 끝나면 합쳐진 실행을 한 번 수행
+    assert overlap_action(False, True, False, OVERLAP_COALESCE) == ACTION_RUN
+    assert overlap_action(False, True, True, OVERLAP_COALESCE) is None
+    assert overlap_action(False, False, False, OVERLAP_COALESCE) is None
@@ -0,0 +1,156 @@
+import pytest
+import asyncio
+import random
+
+from utils.firewall_utils import generate_random_policies
+from utils.range_utils import address_to_range, service_to_range, ranges_overlap
+from shadow_analyzer import SHADOW_ENGINES, analyze_shadow_policies, find_shadow_pairs, find_shadow_pairs_sharded
+from executor import ProcessPoolAnalysisExecutor
+
+def make_policy(seq: int, source: list, destination: list, service: list, action: str = "allow", vsys: str = "vsys1") -> dict:
+    return {
+        "vsys": vsys,
+        "seq": seq,
+        "rulename": f"Rule_{seq:05d}",
+        "action": action,
+        "source": source,
+        "destination": destination,
+        "service": service
+    }
+
+class TestRangeUtils:
+    def test_cidr_containment_overlaps(self):
+        assert ranges_overlap([address_to_range("10.0.0.0/8")], [address_to_range("10.1.0.0/24")])
+        assert not ranges_overlap([address_to_range("10.0.0.0/8")], [address_to_range("172.16.0.0/12")])
+
+    def test_any_overlaps_everything(self):
+        assert ranges_overlap([address_to_range("any")], [address_to_range("2001:db8::/32")])
+        assert ranges_overlap([service_to_range("any")], [service_to_range("udp/53")])
+
+    def test_port_ranges(self):
+        assert ranges_overlap([service_to_range("tcp/1-1024")], [service_to_range("tcp/443")])
+        assert not ranges_overlap([service_to_range("tcp/1-1024")], [service_to_range("udp/53")])
+
+    def test_named_objects_match_by_name(self):
+        assert address_to_range("obj_web") == address_to_range("obj_web")
+        assert not ranges_overlap([address_to_range("obj_web")], [address_to_range("obj_db")])
+
+class TestShadowAnalyzer:
+    def test_cidr_aware_shadow(self):
+        policies = [
+            make_policy(1, ["10.1.0.0/24"], ["192.168.1.10"], ["tcp/443"]),
+            make_policy(2, ["10.0.0.0/8"], ["192.168.0.0/16"], ["tcp/1-1024"], action="deny")
+        ]
+        result = analyze_shadow_policies(policies)
+
+        assert len(result) == 1
+        assert result[0]["shadowed_by"] == "Rule_00002"
+        assert result[0]["shadowed_rule_number"] == 2
+        assert result[0]["shadow_type"] == "Conflicting"
+        assert result[0]["shadow_details"]["overlapping_sources"] == ["10.1.0.0/24"]
+
+    def test_different_vsys_not_compared(self):
+        policies = [
+            make_policy(1, ["any"], ["any"], ["any"], vsys="vsys1"),
+            make_policy(2, ["any"], ["any"], ["any"], vsys="vsys2")
+        ]
+        assert analyze_shadow_policies(policies) == []
+
+    def test_disabled_rules_not_compared(self):
+        policies = [
+            make_policy(1, ["10.0.0.0/24"], ["any"], ["tcp/443"]),
+            make_policy(2, ["10.0.0.0/8"], ["any"], ["any"]),
+            make_policy(3, ["any"], ["any"], ["any"]),
+            make_policy(4, ["any"], ["any"], ["any"])
+        ]
+        policies[1]["enable"] = False
+        policies[2]["enable"] = "disabled"
+        # 비활성 정책은 가리는 정책으로도, 가려진 정책으로도 보고하지 않음
+        assert find_shadow_pairs(policies) == [(0, 3)]
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            find_shadow_pairs([], engine="unknown")
+
+    @pytest.mark.parametrize("engine", sorted(SHADOW_ENGINES))
+    def test_engines_match_reference(self, engine):
+        random.seed(7)
+        networks = ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24", "10.1.2.3", "172.16.0.0/12",
+                    "192.168.0.0/16", "any", "obj_web", "2001:db8::/32", "10.2.0.0-10.2.0.255"]
+        services = ["any", "tcp/80", "tcp/1-1024", "udp/53", "tcp", "application-default", "tcp/8000-9000"]
+        policies = [
+            make_policy(
+                i + 1,
+                random.sample(networks, random.randint(1, 2)),
+                random.sample(networks, random.randint(1, 2)),
+                random.sample(services, random.randint(1, 2)),
+                vsys=random.choice(["vsys1", "vsys2"])
+            )
+            for i in range(400)
+        ]
+        assert find_shadow_pairs(policies, engine) == find_shadow_pairs(policies, "naive")
+
+    def test_bitmap_rows_match_dense_encoding(self):
+        np = pytest.importorskip("numpy")
+        from shadow_analyzer import ObjectBitmap
+
+        rule_ranges = [[address_to_range(value) for value in values] for values in
+                       [["10.0.0.0/8"], ["10.1.0.0/16", "obj_web"], []] + [[f"10.9.{i}.0/24"] for i in range(10)]]
+        bitmap = ObjectBitmap(rule_ranges)
+        dense = np.zeros((len(rule_ranges), len(bitmap.starts)), dtype=bool)
+        for position, ids in enumerate(bitmap.rule_objects):
+            dense[position, ids] = True
+        assert np.array_equal(bitmap.rows, np.packbits(dense, axis=1))
+        # 10.0.0.0/8 은 10.1.0.0/16 과 10.9.x.0/24 와 겹치고 obj_web 과는 겹치지 않음
+        assert np.unpackbits(bitmap.closure(0))[:len(bitmap.starts)].tolist() == [True, True, False] + [True] * 10
+
+    def test_generated_policies(self):
+        policies = generate_random_policies(500)
+        result = analyze_shadow_policies(policies)
+        assert all(p["shadow_type"] in ("Redundant", "Conflicting") for p in result)
+
+    def test_sharded_matches_sequential(self):
+        policies = generate_random_policies(2000)
+        executor = ProcessPoolAnalysisExecutor(workers=3)
+        try:
+            pairs = asyncio.run(find_shadow_pairs_sharded(policies, "index", executor))
+        finally:
+            executor.shutdown()
+        assert pairs == find_shadow_pairs(policies, "index")
+
+    def test_sharded_cancel_keeps_finished_shards(self):
+        from executor import InlineExecutor
+        from job_engine import CancelToken, TaskCancelled, _cancel_token
+
+        policies = generate_random_policies(600)
+        executor = InlineExecutor(workers=3)
+        token = CancelToken()
+
+        async def run():
+            _cancel_token.set(token)
+            # 첫 샤드가 끝나면 취소 요청
+            return await find_shadow_pairs_sharded(policies, "index", executor, on_progress=lambda done, found: token.cancel())
+
+        with pytest.raises(TaskCancelled) as info:
+            asyncio.run(run())
+        partial = info.value.partial
+        assert 0 < partial["rules_compared"] < len(policies)
+        assert set(partial["pairs"]) <= set(find_shadow_pairs(policies, "index"))
+
+    def test_sharded_resume_from_completed_shards(self):
+        from executor import InlineExecutor
+
+        policies = generate_random_policies(600)
+        executor = InlineExecutor()
+        saved = {}
+        asyncio.run(find_shadow_pairs_sharded(policies, "index", executor, shard_count=4,
+                                              on_shard=lambda index, result: saved.setdefault(index, result)))
+        assert len(saved) >= 4
+
+        # 체크포인트에 남은 샤드는 다시 계산하지 않음
+        computed = []
+        completed = {index: result for index, result in saved.items() if index % 2 == 0}
+        pairs = asyncio.run(find_shadow_pairs_sharded(policies, "index", executor, shard_count=4, completed_shards=completed,
+                                                      on_shard=lambda index, result: computed.append(index)))
+        assert sorted(computed) == [index for index in sorted(saved) if index % 2 == 1]
+        assert pairs == find_shadow_pairs(policies, "index")
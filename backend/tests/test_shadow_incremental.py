@@ -0,0 +1,141 @@
+import asyncio
+import copy
+import random
+
+import pytest
+
+from shadow_analyzer import find_shadow_pairs
+from shadow_incremental import (
+    ShadowStateStore, build_shadow_states, incremental_shadow_pairs, incremental_shadow_pairs_grouped, INCREMENTAL_FIELDS
+)
+from executor import InlineExecutor
+from job_engine import CancelToken, TaskCancelled, _cancel_token
+
+NETWORKS = ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24", "172.16.0.0/12", "obj_web"] + [f"10.9.{i}.0/24" for i in range(50)]
+SERVICES = ["tcp/80", "tcp/1-1024", "udp/53"] + [f"tcp/{port}" for port in range(2000, 2050)]
+
+def make_policy(index: int) -> dict:
+    return {
+        "vsys": random.choice(["vsys1", "vsys2"]),
+        "seq": index,
+        "rulename": f"Rule_{index:07d}",
+        "action": random.choice(["allow", "deny"]),
+        "source": random.sample(NETWORKS, 1),
+        "destination": random.sample(NETWORKS, 1),
+        "service": random.sample(SERVICES, 1)
+    }
+
+class TestIncrementalShadow:
+    def test_matches_full_analysis_after_changes(self):
+        random.seed(11)
+        for _ in range(20):
+            old = [make_policy(i) for i in range(300)]
+            states = build_shadow_states(old, find_shadow_pairs(old))
+
+            new = copy.deepcopy(old)
+            for step in range(8):
+                position = random.randrange(len(new))
+                operation = step % 4
+                if operation == 0:
+                    new.insert(position, make_policy(100000 + random.randrange(10 ** 6)))
+                elif operation == 1:
+                    new.pop(position)
+                elif operation == 2:
+                    new[position]["source"] = random.sample(NETWORKS, 1)
+                else:
+                    new.insert(random.randrange(len(new)), new.pop(position))
+
+            pairs, summary = incremental_shadow_pairs(new, states)
+            assert pairs == find_shadow_pairs(new)
+            assert all(group["mode"] == "incremental" for group in summary.values())
+
+    def test_unchanged_snapshot_recomputes_nothing(self):
+        random.seed(5)
+        policies = [make_policy(i) for i in range(200)]
+        states = build_shadow_states(policies, find_shadow_pairs(policies))
+
+        pairs, summary = incremental_shadow_pairs(policies, states)
+        assert pairs == find_shadow_pairs(policies)
+        assert sum(group["recomputed"] for group in summary.values()) == 0
+
+    def test_duplicate_names_in_stored_state_recompute(self):
+        random.seed(3)
+        old = [make_policy(i) for i in range(100)]
+        old[10]["rulename"] = old[11]["rulename"]
+        old[10]["vsys"] = old[11]["vsys"]
+        states = build_shadow_states(old, find_shadow_pairs(old))
+
+        new = [make_policy(i) for i in range(100)]
+        pairs, summary = incremental_shadow_pairs(new, states)
+        assert pairs == find_shadow_pairs(new)
+        assert summary[old[11]["vsys"]]["mode"] == "full"
+
+    def test_toggled_enable_matches_full_analysis(self):
+        random.seed(9)
+        old = [make_policy(i) for i in range(200)]
+        states = build_shadow_states(old, find_shadow_pairs(old))
+
+        new = copy.deepcopy(old)
+        for position in random.sample(range(len(new)), 20):
+            new[position]["enable"] = False
+        pairs, _ = incremental_shadow_pairs(new, states)
+        assert pairs == find_shadow_pairs(new)
+
+    def test_grouped_matches_sequential(self):
+        random.seed(13)
+        old = [make_policy(i) for i in range(300)]
+        states = build_shadow_states(old, find_shadow_pairs(old))
+        new = copy.deepcopy(old)
+        for position in random.sample(range(len(new)), 10):
+            new[position]["source"] = random.sample(NETWORKS, 1)
+            new[position]["description"] = "x" * 1000
+
+        sent = []
+        class RecordingExecutor(InlineExecutor):
+            async def run(self, func, *args):
+                sent.append(args[0])
+                return await super().run(func, *args)
+
+        progress = []
+        pairs, summary = asyncio.run(incremental_shadow_pairs_grouped(
+            new, states, RecordingExecutor(), on_progress=lambda done, found: progress.append(done)
+        ))
+        assert (pairs, summary) == incremental_shadow_pairs(new, states)
+        # vsys 그룹마다 한 번씩, 필요한 필드만 워커로 전달
+        assert len(sent) == 2 and all(set(row) == set(INCREMENTAL_FIELDS) for rows in sent for row in rows)
+        assert sorted(progress)[-1] == len(new)
+
+    def test_grouped_cancel_keeps_finished_groups(self):
+        random.seed(17)
+        policies = [make_policy(i) for i in range(200)]
+        states = build_shadow_states(policies, find_shadow_pairs(policies))
+        token = CancelToken()
+
+        async def run():
+            _cancel_token.set(token)
+            # 첫 그룹이 끝나면 취소 요청
+            return await incremental_shadow_pairs_grouped(policies, states, InlineExecutor(), on_progress=lambda done, found: token.cancel())
+
+        with pytest.raises(TaskCancelled) as info:
+            asyncio.run(run())
+        partial = info.value.partial
+        assert 0 < partial["rules_compared"] < len(policies)
+        assert set(partial["pairs"]) <= set(find_shadow_pairs(policies))
+
+    def test_only_index_engine(self):
+        policies = [make_policy(i) for i in range(10)]
+        with pytest.raises(ValueError):
+            incremental_shadow_pairs(policies, {}, engine="bitmap")
+
+    def test_state_store_roundtrip(self, tmp_path):
+        random.seed(1)
+        policies = [make_policy(i) for i in range(50)]
+        states = build_shadow_states(policies, find_shadow_pairs(policies))
+
+        store = ShadowStateStore(tmp_path)
+        store.save("10.0.0.1", states)
+        loaded = store.load("10.0.0.1")
+
+        assert set(loaded) == set(states)
+        assert loaded["vsys1"]["matches"] == states["vsys1"]["matches"]
+        assert store.load("10.0.0.2") == {}
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+import pytest
+
+from upload_store import UploadStore, UploadTooLarge
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+class TestUploadStore:
+    def test_save_stream(self, tmp_path):
+        store = UploadStore(tmp_path, max_bytes=100, ttl=60)
+        info = asyncio.run(store.save_stream(chunks(b"<config>", b"</config>"), filename="../fw/running-config.xml"))
+
+        assert info["size"] == 17 and info["filename"] == "running-config.xml"
+        assert store.path(info["upload_id"]).read_bytes() == b"<config></config>"
+        assert store.info(info["upload_id"]) == info
+
+        store.delete(info["upload_id"])
+        with pytest.raises(ValueError):
+            store.path(info["upload_id"])
+
+    def test_rejects_oversized_and_invalid(self, tmp_path):
+        store = UploadStore(tmp_path, max_bytes=10, ttl=60)
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(store.save_stream(chunks(b"x" * 6, b"x" * 6)))
+        # 중단된 업로드는 남지 않음
+        assert list(tmp_path.iterdir()) == []
+        with pytest.raises(ValueError):
+            store.path("../../etc/passwd")
+
+    def test_cleanup_expired(self, tmp_path):
+        store = UploadStore(tmp_path, max_bytes=100, ttl=60)
+        info = asyncio.run(store.save_stream(chunks(b"data")))
+        assert store.cleanup(now=time.time()) == 0
+        assert store.cleanup(now=time.time() + 120) == 2
+        with pytest.raises(ValueError):
+            store.path(info["upload_id"])
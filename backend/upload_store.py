@@ -0,0 +1,95 @@
+from typing import Dict, Any, Optional, AsyncIterator
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID, uuid4
+import json
+import logging
+import time
+
+from config import AppConfig
+
+class UploadTooLarge(ValueError):
+    pass
+
+class UploadStore:
+    """업로드한 설정 파일을 요청 본문 그대로 디스크에 스트리밍하여 보관
+
+    파일은 <id>.part 로 기록한 뒤 완료되면 <id> 로 rename 하고, 원래 파일명 등은 <id>.json 에 둔다.
+    ttl 초가 지난 업로드는 cleanup() 에서 삭제한다.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        self.base_dir = Path(base_dir or AppConfig.UPLOAD_DIR)
+        self.max_bytes = AppConfig.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttl = AppConfig.UPLOAD_TTL if ttl is None else ttl
+
+    def path(self, upload_id: str) -> Path:
+        """업로드 파일 경로 (ID 형식이 잘못되었거나 없으면 ValueError)"""
+        try:
+            upload_id = str(UUID(str(upload_id)))
+        except ValueError:
+            raise ValueError(f"Invalid upload id: {upload_id}")
+        path = self.base_dir / upload_id
+        if not path.exists():
+            raise ValueError(f"Upload not found: {upload_id}")
+        return path
+
+    def info(self, upload_id: str) -> Dict[str, Any]:
+        path = self.path(upload_id)
+        return json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+
+    async def save_stream(self, chunks: AsyncIterator[bytes], filename: Optional[str] = None) -> Dict[str, Any]:
+        """본문 chunk 를 받는 대로 파일에 기록 (max_bytes 를 넘으면 UploadTooLarge)"""
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.cleanup()
+        upload_id = str(uuid4())
+        partial = self.base_dir / f"{upload_id}.part"
+        size = 0
+        try:
+            with open(partial, "wb") as output:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+                    output.write(chunk)
+            info = {
+                "upload_id": upload_id,
+                "filename": Path(filename).name if filename else None,
+                "size": size,
+                "uploaded_at": datetime.now().isoformat()
+            }
+            (self.base_dir / f"{upload_id}.json").write_text(json.dumps(info), encoding="utf-8")
+            partial.rename(self.base_dir / upload_id)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        logging.info(f"Stored upload {upload_id} ({size} bytes)")
+        return info
+
+    def delete(self, upload_id: str) -> None:
+        path = self.path(upload_id)
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """유지 시간이 지난 업로드(중단된 .part 포함) 삭제, 삭제한 파일 수 반환"""
+        if not self.base_dir.exists():
+            return 0
+        now = time.time() if now is None else now
+        removed = 0
+        for path in self.base_dir.iterdir():
+            try:
+                if now - path.stat().st_mtime > self.ttl:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+_upload_store: Optional[UploadStore] = None
+
+def get_upload_store() -> UploadStore:
+    global _upload_store
+    if _upload_store is None:
+        _upload_store = UploadStore()
+    return _upload_store
@@ -45,6 +45,56 @@ def generate_random_policies(count: int = 30000) -> List[Dict[str, Any]]:
     
     return policies
 
+def build_mock_policy(i: int) -> Dict[str, Any]:
+    """i 번째 임시 정책 (같은 i 에는 항상 같은 정책, 모의 방화벽과 임시 클라이언트에서 사용)"""
+    return {
+        "vsys": f"vsys{i%3 + 1}",
+        "seq": f"{i+1}",
+        "rulename": f"Rule_{i+1:05d}_{'ALLOW' if i % 2 == 0 else 'DENY'}_{'HIGH' if i % 3 == 0 else 'LOW'}_RISK",
+        "action": "allow" if i % 2 == 0 else "deny",
+        "source": [
+            f"10.{i%256}.{(i//256)%256}.0/24",
+            f"10.{i%256}.{(i//256)%256}.1/24",
+            f"10.{i%256}.{(i//256)%256}.2/24",
+            f"172.16.{i%256}.0/24"
+        ],
+        "destination": [
+            f"192.168.{i%256}.0/24",
+            f"192.168.{i%256}.1/24",
+            f"192.168.{i%256}.2/24",
+            f"203.0.{i%256}.0/24",
+            f"203.0.{i%256}.1/24"
+        ],
+        "service": [
+            "tcp/80",
+            "tcp/443",
+            "tcp/8080",
+            "tcp/8443",
+            f"tcp/{1000 + i%1000}",
+            "udp/53",
+            "udp/123",
+            f"udp/{2000 + i%1000}"
+        ],
+        "risk_level": "high" if i % 3 == 0 else ("medium" if i % 3 == 1 else "low"),
+        "description": f"This is a very long description for rule number {i+1}. "
+                     f"This rule is created for testing purposes and includes multiple lines of text. "
+                     f"The rule is {'allowing' if i % 2 == 0 else 'denying'} traffic from multiple source networks "
+                     f"to multiple destination networks using various services. "
+                     f"Risk level is {'HIGH' if i % 3 == 0 else ('MEDIUM' if i % 3 == 1 else 'LOW')}.",
+        "last_hit": f"2024-{(i%12)+1:02d}-{(i%28)+1:02d} {(i%24):02d}:{(i%60):02d}:{(i%60):02d}",
+        "hit_count": i * 100,
+        "created_by": f"admin_{i%5 + 1}",
+        "created_date": f"2023-{(i%12)+1:02d}-{(i%28)+1:02d}",
+        "modified_by": f"admin_{i%3 + 1}",
+        "modified_date": f"2024-{(i%12)+1:02d}-{(i%28)+1:02d}",
+        "tags": [
+            f"tag_{i%10 + 1}",
+            f"department_{i%5 + 1}",
+            f"project_{i%8 + 1}",
+            f"environment_{i%3 + 1}"
+        ]
+    }
+
 # 방화벽 연결 시뮬레이션 함수
 def simulate_firewall_connection(ip: str, id: str, pw: str, fw_type: str) -> bool:
     # 테스트용 자격증명
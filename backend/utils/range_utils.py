@@ -0,0 +1,195 @@
+from typing import List, Tuple
+from functools import lru_cache
+import hashlib
+import ipaddress
+
+# 주소/서비스 객체를 하나의 정수 구간 (start, end)으로 변환하기 위한 공간 정의
+#   [0, 2^32)                   : IPv4
+#   [2^32, 2^32 + 2^128)        : IPv6
+#   [NAMED_BASE, NAMED_BASE+2^64): 해석할 수 없는 객체명 (이름 해시로 한 점에 매핑)
+IPV4_BITS = 32
+IPV6_BITS = 128
+IPV6_BASE = 1 << IPV4_BITS
+NAMED_BASE = IPV6_BASE + (1 << IPV6_BITS)
+ADDRESS_MAX = NAMED_BASE + (1 << 64) - 1
+
+# 서비스 공간: 프로토콜 번호 * 65536 + 포트, 이름 객체는 SERVICE_NAMED_BASE 이후
+PORT_SPACE = 1 << 16
+SERVICE_NAMED_BASE = 256 * PORT_SPACE
+SERVICE_MAX = SERVICE_NAMED_BASE + (1 << 64) - 1
+
+PROTOCOL_NUMBERS = {
+    "icmp": 1,
+    "tcp": 6,
+    "udp": 17,
+    "icmp6": 58,
+    "sctp": 132
+}
+
+ANY_VALUES = {"any", "all", "*"}
+
+Range = Tuple[int, int]
+
+def _named_point(base: int, name: str) -> Range:
+    """해석할 수 없는 객체명을 이름 공간의 한 점으로 매핑"""
+    digest = hashlib.sha1(name.encode("utf-8")).digest()
+    point = base + int.from_bytes(digest[:8], "big")
+    return (point, point)
+
+@lru_cache(maxsize=65536)
+def address_to_range(value: str) -> Range:
+    """주소 객체 문자열(CIDR, 호스트, a-b 범위, any)을 정수 구간으로 변환"""
+    text = str(value).strip().lower()
+    if text in ANY_VALUES:
+        return (0, ADDRESS_MAX)
+
+    try:
+        if "-" in text:
+            start_text, end_text = (part.strip() for part in text.split("-", 1))
+            start = ipaddress.ip_address(start_text)
+            end = ipaddress.ip_address(end_text)
+            if start.version != end.version or int(start) > int(end):
+                raise ValueError(f"Invalid address range: {value}")
+            base = 0 if start.version == 4 else IPV6_BASE
+            return (base + int(start), base + int(end))
+
+        network = ipaddress.ip_network(text, strict=False)
+        base = 0 if network.version == 4 else IPV6_BASE
+        return (base + int(network.network_address), base + int(network.broadcast_address))
+    except ValueError:
+        return _named_point(NAMED_BASE, str(value).strip())
+
+@lru_cache(maxsize=65536)
+def service_to_range(value: str) -> Range:
+    """서비스 객체 문자열(tcp/80, udp/1000-2000, tcp, any)을 정수 구간으로 변환"""
+    text = str(value).strip().lower()
+    if text in ANY_VALUES:
+        return (0, SERVICE_MAX)
+
+    protocol, _, ports = text.partition("/")
+    protocol_number = PROTOCOL_NUMBERS.get(protocol)
+    if protocol_number is None:
+        return _named_point(SERVICE_NAMED_BASE, str(value).strip())
+
+    base = protocol_number * PORT_SPACE
+    if not ports or ports in ANY_VALUES:
+        return (base, base + PORT_SPACE - 1)
+
+    try:
+        if "-" in ports:
+            start_text, end_text = ports.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = end = int(ports)
+    except ValueError:
+        return _named_point(SERVICE_NAMED_BASE, str(value).strip())
+
+    if not (0 <= start <= end < PORT_SPACE):
+        return _named_point(SERVICE_NAMED_BASE, str(value).strip())
+    return (base + start, base + end)
+
+def addresses_to_ranges(values: List[str]) -> List[Range]:
+    """주소 객체 목록을 정렬된 구간 목록으로 변환"""
+    return sorted(address_to_range(value) for value in values)
+
+def services_to_ranges(values: List[str]) -> List[Range]:
+    """서비스 객체 목록을 정렬된 구간 목록으로 변환"""
+    return sorted(service_to_range(value) for value in values)
+
+# 부정(negate) 주소의 보수를 계산하는 IP 공간 (IPv4, IPv6). 이름 객체 공간은 보수에 포함하지 않음
+IP_SPACES: Tuple[Range, ...] = ((0, IPV6_BASE - 1), (IPV6_BASE, NAMED_BASE - 1))
+
+def complement_ranges(ranges: List[Range], spaces: Tuple[Range, ...] = IP_SPACES) -> List[Range]:
+    """정렬된 구간 목록이 덮지 않는 나머지 구간 (negate-source/destination 정책의 실제 일치 범위)"""
+    result: List[Range] = []
+    for space_start, space_end in spaces:
+        cursor = space_start
+        for start, end in ranges:
+            if end < cursor or start > space_end:
+                continue
+            if start > cursor:
+                result.append((cursor, start - 1))
+            cursor = max(cursor, end + 1)
+            if cursor > space_end:
+                break
+        if cursor <= space_end:
+            result.append((cursor, space_end))
+    return result
+
+def ranges_overlap(left: List[Range], right: List[Range]) -> bool:
+    """정렬된 두 구간 목록 사이에 겹치는 구간이 있는지 확인"""
+    i = j = 0
+    while i < len(left) and j < len(right):
+        left_start, left_end = left[i]
+        right_start, right_end = right[j]
+        if left_start <= right_end and right_start <= left_end:
+            return True
+        if left_end < right_end:
+            i += 1
+        else:
+            j += 1
+    return False
+
+def ranges_cover(outer: List[Range], inner: List[Range]) -> bool:
+    """정렬된 구간 목록 outer 가 inner 의 모든 구간을 포함하는지 확인 (outer 의 이어지는 구간은 합쳐서 비교)"""
+    merged: List[List[int]] = []
+    for start, end in outer:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    j = 0
+    for start, end in inner:
+        while j < len(merged) and merged[j][1] < start:
+            j += 1
+        if j == len(merged) or merged[j][0] > start or merged[j][1] < end:
+            return False
+    return True
+
+def range_overlaps_any(target: Range, ranges: List[Range]) -> bool:
+    """단일 구간이 구간 목록 중 하나와 겹치는지 확인"""
+    start, end = target
+    return any(start <= other_end and other_start <= end for other_start, other_end in ranges)
+
+# 서비스 공간을 접두사로 분해할 때 사용하는 비트 폭 (프로토콜 8비트 + 포트 16비트)
+SERVICE_BITS = 24
+
+def _aligned_blocks(start: int, end: int, bits: int) -> List[Tuple[int, int]]:
+    """[start, end] 구간을 2의 거듭제곱 크기로 정렬된 (prefixlen, network) 블록으로 분해"""
+    blocks = []
+    while start <= end:
+        size = start & -start if start else 1 << bits
+        while size > end - start + 1:
+            size >>= 1
+        blocks.append((bits - size.bit_length() + 1, start))
+        start += size
+    return blocks
+
+@lru_cache(maxsize=65536)
+def range_to_prefixes(target: Range) -> Tuple[Tuple[int, int, int], ...]:
+    """주소 구간을 (version, prefixlen, network) 접두사 목록으로 분해
+
+    전체 구간(any)은 version 0 으로 표시하며, IP 공간 밖의 구간(이름 객체 등)은
+    빈 튜플을 반환한다.
+    """
+    start, end = target
+    if start == 0 and end == ADDRESS_MAX:
+        return ((0, 0, 0),)
+    if end < IPV6_BASE:
+        return tuple((4, prefixlen, network) for prefixlen, network in _aligned_blocks(start, end, IPV4_BITS))
+    if start >= IPV6_BASE and end < NAMED_BASE:
+        return tuple(
+            (6, prefixlen, network)
+            for prefixlen, network in _aligned_blocks(start - IPV6_BASE, end - IPV6_BASE, IPV6_BITS)
+        )
+    return ()
+
+@lru_cache(maxsize=65536)
+def service_range_to_prefixes(target: Range) -> Tuple[Tuple[int, int, int], ...]:
+    """서비스 구간을 (space, prefixlen, network) 접두사 목록으로 분해 (any 는 space 0)"""
+    start, end = target
+    if start == 0 and end == SERVICE_MAX:
+        return ((0, 0, 0),)
+    if end < SERVICE_NAMED_BASE:
+        return tuple((1, prefixlen, network) for prefixlen, network in _aligned_blocks(start, end, SERVICE_BITS))
+    return ()
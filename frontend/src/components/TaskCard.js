@@ -4,9 +4,77 @@ import React, { useState, useEffect, useCallback } from "react";
 // import ProjectResultCard from "./ProjectResultCard";
 import { createPortal } from "react-dom";
 
+const API_URL = "http://127.0.0.1:8000";
+const FINISHED_STATUSES = ['Completed', 'Error', 'Cancelled', 'Timeout'];
+
+const fetchJobResult = async (jobId) => {
+    const resultResponse = await fetch(`${API_URL}/jobs/${jobId}/result`);
+    const result = await resultResponse.json();
+    if (!resultResponse.ok) {
+        throw new Error(result.detail || 'Task failed');
+    }
+    return result;
+};
+
+// 프로젝트 진행 이벤트(SSE)를 구독하여 작업이 끝나면 결과를 반환
+const waitForJob = (jobId, projectId, onProgress) => new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_URL}/projects/${projectId}/events`);
+    let done = false;
+
+    const finish = () => {
+        if (done) return;
+        done = true;
+        source.close();
+        fetchJobResult(jobId).then(resolve, reject);
+    };
+
+    // 구독 전에 이미 끝난 작업인지 확인
+    const checkStatus = async () => {
+        try {
+            const response = await fetch(`${API_URL}/jobs/${jobId}`);
+            if (response.ok) {
+                const job = await response.json();
+                if (FINISHED_STATUSES.includes(job.status)) {
+                    finish();
+                }
+            }
+        } catch (error) {
+            console.error("Error fetching job status:", error);
+        }
+    };
+
+    source.onopen = checkStatus;
+    source.onerror = checkStatus;
+    source.addEventListener('job', (e) => {
+        const event = JSON.parse(e.data);
+        if (event.job_id !== jobId) return;
+        onProgress(event);
+        if (event.finished) {
+            finish();
+        }
+    });
+});
+
+const cancelJob = async (jobId) => {
+    try {
+        await fetch(`${API_URL}/jobs/${jobId}/cancel`, { method: "POST" });
+    } catch (error) {
+        console.error("Error cancelling job:", error);
+    }
+};
+
+const formatProgress = (event) => {
+    if (!event) return null;
+    const percent = Math.round((event.progress || 0) * 100);
+    const throughput = event.metrics?.throughput;
+    return `${percent}% ${event.message || event.status}` +
+        (throughput ? ` (${Math.round(throughput)} ${event.metrics.unit || 'items'}/s)` : '');
+};
+
 const TaskCard = ({ task, projectId, previousTask, onUpdate ,index}) => {
     const [isOpen, setIsOpen] = useState(false);
     const [loading, setLoading] = useState(false);
+    const [progress, setProgress] = useState(null);
     const [error, setError] = useState(null);
     const [showErrorModal, setShowErrorModal] = useState(false);
     const [formData, setFormData] = useState({});
@@ -33,6 +101,29 @@ const TaskCard = ({ task, projectId, previousTask, onUpdate ,index}) => {
         }));
     };
 
+    // 설정 파일은 요청 본문 그대로 업로드하고, 받은 upload_id 를 작업 입력으로 사용
+    const handleFileUpload = async (field, file) => {
+        if (!file) return;
+        setLoading(true);
+        setError(null);
+        try {
+            const response = await fetch(
+                `${API_URL}${field.upload_url || '/uploads'}?filename=${encodeURIComponent(file.name)}`,
+                { method: "POST", headers: { "Content-Type": "application/octet-stream" }, body: file }
+            );
+            const data = await response.json();
+            if (!response.ok) {
+                throw new Error(data.detail || `Upload failed: ${response.status}`);
+            }
+            handleInputChange(field.name, data.upload_id);
+        } catch (error) {
+            console.error("Error uploading file:", error);
+            setError(error.message);
+        } finally {
+            setLoading(false);
+        }
+    };
+
     const renderInputField = (field) => {
         if (!field || !field.name) return null;
 
@@ -101,6 +192,18 @@ const TaskCard = ({ task, projectId, previousTask, onUpdate ,index}) => {
                         value={formData[field.name] || ''}
                     />
                 );
+            case 'file':
+                return (
+                    <input
+                        type="file"
+                        accept={field.accept}
+                        title={field.placeholder}
+                        className="flex-1 text-sm text-gray-700 dark:text-gray-300
+                                 file:mr-3 file:px-3 file:py-2 file:rounded-lg file:border-0
+                                 file:bg-blue-50 dark:file:bg-gray-700 file:text-blue-700 dark:file:text-gray-100"
+                        onChange={(e) => handleFileUpload(field, e.target.files[0])}
+                    />
+                );
             default:
                 return null;
         }
@@ -147,13 +250,19 @@ const TaskCard = ({ task, projectId, previousTask, onUpdate ,index}) => {
                 throw new Error(errorData.detail || 'Failed to update task');
             }
 
-            const data = await response.json();
+            // 백그라운드 작업이 끝날 때까지 진행 이벤트 표시
+            const { job_id: jobId } = await response.json();
+            const data = await waitForJob(jobId, projectId, setProgress);
             if (data.task) {
                 await onUpdate(
                     task.name, 
                     data.task.status, 
                     data.project?.status
                 );
+                // 같은 작업에서 이어서 실행된 (입력이 없는) 태스크들의 상태 반영
+                for (const step of (data.pipeline || []).slice(1)) {
+                    await onUpdate(step.name, step.status, data.project?.status);
+                }
 
                 if (data.task.status === 'Completed') {
                     setIsOpen(false);  // 태스크 완료 시 접기
@@ -173,6 +282,7 @@ const TaskCard = ({ task, projectId, previousTask, onUpdate ,index}) => {
             setShowErrorModal(true);
         } finally {
             setLoading(false);
+            setProgress(null);
         }
     }, [projectId, task.name, formData, onUpdate, previousTask]);
 
@@ -379,6 +489,28 @@ const TaskCard = ({ task, projectId, previousTask, onUpdate ,index}) => {
                         </div>
                     )}
                     
+                    {loading && progress && (
+                        <div className="px-3 pb-3">
+                            <div className="w-full h-1.5 bg-gray-100 dark:bg-gray-700 rounded-full overflow-hidden">
+                                <div
+                                    className="h-full bg-blue-500 dark:bg-blue-400 transition-all duration-300"
+                                    style={{ width: `${Math.round((progress.progress || 0) * 100)}%` }}
+                                />
+                            </div>
+                            <div className="mt-1 flex items-center justify-between">
+                                <p className="text-xs text-gray-500 dark:text-gray-400">
+                                    {formatProgress(progress)}
+                                </p>
+                                <button
+                                    onClick={() => cancelJob(progress.job_id)}
+                                    className="text-xs text-red-500 hover:text-red-600 dark:text-red-400"
+                                >
+                                    Cancel
+                                </button>
+                            </div>
+                        </div>
+                    )}
+
                     {task.name !== "Download Rules" && task.result && (
                         <div className="px-3 pb-3">
                             <p className="text-sm text-gray-600 dark:text-gray-300">